@@ -4,6 +4,7 @@ from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from finance_management.utils.currencies import get_fav_currency, get_allowed_currencies
+from finance_management.utils.user_cache import bump_user_data_version
 from datetime import datetime
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
@@ -108,6 +109,8 @@ class ChangeFavCurrencyApi(APIView):
             user = request.user
             user.favorite_currency = serializer.validated_data['fav_currency']
             user.save()
+            # Cached amounts are converted to the favorite currency
+            bump_user_data_version(user)
         except Exception:
                 return Response(
                     {'error': f'Failed to save transaction'},
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from unfold.admin import ModelAdmin
-from .models import BaseExchangeRate
+from .models import BaseExchangeRate, DailyExchangeRate
 
 @admin.register(BaseExchangeRate)
 class BaseExchangeRateAdmin(ModelAdmin):
@@ -8,6 +8,12 @@ class BaseExchangeRateAdmin(ModelAdmin):
     readonly_fields = ('last_updated',)
     fields = ('base_currency', 'rates', 'last_updated')
 
+@admin.register(DailyExchangeRate)
+class DailyExchangeRateAdmin(ModelAdmin):
+    list_display = ('base_currency', 'currency', 'date', 'rate')
+    list_filter = ('base_currency', 'currency')
+    date_hierarchy = 'date'
+
 # Register your models here.
 # Note: Models have been moved to their respective apps:
 # - Transactions, NetWorth -> transaction_management
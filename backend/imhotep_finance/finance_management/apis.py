@@ -6,15 +6,19 @@ from drf_spectacular.utils import extend_schema
 from django.db import transaction
 from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework.exceptions import ValidationError as DRFValidationError
-from transaction_management.services import create_transaction
+from transaction_management.services import create_transfer
 from transaction_management.models import NetWorth
+from transaction_management.utils.networth_snapshots import clear_networth_snapshots
 from datetime import date
-from finance_management.utils.currencies import get_or_update_rates
+from finance_management.utils.currencies import get_rates
+from finance_management.utils.dashboard import DASHBOARD_SECTIONS
+from finance_management.utils.user_cache import cached_user_response, bump_user_data_version
 from finance_management.services import (
     get_user_networth_service,
     get_user_networth_details_service,
     get_user_categories_service,
-    get_user_places_service
+    get_user_places_service,
+    get_dashboard_service
 )
 from finance_management.serializers import (
     NetworthResponseSerializer,
@@ -25,7 +29,9 @@ from finance_management.serializers import (
     PlaceResponseSerializer,
     MoveMoneyRequestSerializer,
     ConvertCurrencyRequestSerializer,
-    DeleteNetworthRequestSerializer
+    DeleteNetworthRequestSerializer,
+    DashboardQuerySerializer,
+    DashboardResponseSerializer
 )
 
 
@@ -41,7 +47,7 @@ class GetNetworthApi(APIView):
     def get(self, request):
         """Get current authenticated user total netWorth"""
         user = request.user
-        networth = get_user_networth_service(user)
+        networth = cached_user_response(user, 'networth', lambda: get_user_networth_service(user))
         
         return Response({
             'id': user.id,
@@ -61,7 +67,9 @@ class GetNetworthDetailsApi(APIView):
     def get(self, request):
         """Get current authenticated user netWorth details"""
         user = request.user
-        networth_details = get_user_networth_details_service(user)
+        networth_details = cached_user_response(
+            user, 'networth_details', lambda: get_user_networth_details_service(user)
+        )
         
         return Response({
             'id': user.id,
@@ -69,6 +77,36 @@ class GetNetworthDetailsApi(APIView):
         }, status=status.HTTP_200_OK)
 
 
+class DashboardApi(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        tags=['Finance Management'],
+        description="Get the dashboard sections (networth, details, places, categories, score, recent transactions) in one request.",
+        parameters=[DashboardQuerySerializer],
+        responses={200: DashboardResponseSerializer},
+        operation_id='get_dashboard'
+    )
+    def get(self, request):
+        """Get the current authenticated user's dashboard.
+        Optional query param: ?include=networth,categories,...
+        """
+        query_serializer = DashboardQuerySerializer(data=request.query_params)
+        if not query_serializer.is_valid():
+            return Response({'error': query_serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+        
+        user = request.user
+        sections = query_serializer.validated_data.get('include', list(DASHBOARD_SECTIONS))
+        # The score is for the current month, so the month is part of the key
+        today = date.today()
+        dashboard = cached_user_response(
+            user, 'dashboard', lambda: get_dashboard_service(user, sections),
+            params={'include': ','.join(sections), 'month': today.month, 'year': today.year}
+        )
+        
+        return Response(dashboard, status=status.HTTP_200_OK)
+
+
 class GetCategoryApi(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -81,12 +119,16 @@ class GetCategoryApi(APIView):
     )
     def get(self, request):
         """Get current authenticated user's most frequently used categories.
-        Optional query param: ?status=Deposit|Withdraw|ANY
+        Optional query params: ?status=Deposit|Withdraw|ANY&weighting=frequency|recency
         """
         user = request.user
         status_param = request.query_params.get('status', 'ANY')
+        weighting_param = request.query_params.get('weighting', 'frequency')
         
-        categories = get_user_categories_service(user, status_param)
+        categories = cached_user_response(
+            user, 'categories', lambda: get_user_categories_service(user, status_param, weighting_param),
+            params={'status': status_param, 'weighting': weighting_param}
+        )
         
         return Response({
             'id': user.id,
@@ -110,7 +152,10 @@ class GetPlacesApi(APIView):
         user = request.user
         currency_param = request.query_params.get('currency', 'ANY')
         
-        places = get_user_places_service(user, currency=currency_param)
+        places = cached_user_response(
+            user, 'places', lambda: get_user_places_service(user, currency=currency_param),
+            params={'currency': currency_param}
+        )
         
         return Response({
             'id': user.id,
@@ -143,39 +188,15 @@ class MoveMoneyApi(APIView):
         if source_place == target_place:
             raise DRFValidationError("Source and target places must be different.")
             
-        # Check if the source place and currency combination is available
-        source_networth = NetWorth.objects.filter(user=user, currency=currency, place=source_place).first()
-        if not source_networth:
-            raise DRFValidationError(f"Source place '{source_place}' with currency '{currency}' does not exist.")
-            
-        if source_networth.total < amount:
-            raise DRFValidationError(f"Insufficient funds in '{source_place}'. Available: {source_networth.total} {currency}.")
-            
         try:
-            with transaction.atomic():
-                # 1. Create withdraw transaction from source place
-                withdraw_trans = create_transaction(
-                    user=user,
-                    amount=amount,
-                    currency=currency,
-                    trans_details=f"Transfer to {target_place}",
-                    category="Transfer",
-                    trans_status="Withdraw",
-                    transaction_date=date.today(),
-                    place=source_place
-                )
-                
-                # 2. Create deposit transaction to target place
-                deposit_trans = create_transaction(
-                    user=user,
-                    amount=amount,
-                    currency=currency,
-                    trans_details=f"Transfer from {source_place}",
-                    category="Transfer",
-                    trans_status="Deposit",
-                    transaction_date=date.today(),
-                    place=target_place
-                )
+            create_transfer(
+                user=user,
+                amount=amount,
+                currency=currency,
+                place=source_place,
+                target_place=target_place,
+                category="Transfer",
+            )
         except DjangoValidationError as e:
             raise DRFValidationError(e.message)
         except Exception as e:
@@ -193,7 +214,7 @@ class GetExchangeRatesApi(APIView):
         operation_id='get_exchange_rates'
     )
     def get(self, request):
-        rates = get_or_update_rates()
+        rates = get_rates()
         if rates:
             return Response(rates, status=status.HTTP_200_OK)
         return Response({"error": "Failed to fetch exchange rates."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -226,39 +247,16 @@ class ConvertCurrencyApi(APIView):
         if source_currency == target_currency:
             raise DRFValidationError("Source and target currencies must be different.")
             
-        # Check if the source place and currency combination is available
-        source_networth = NetWorth.objects.filter(user=user, currency=source_currency, place=place).first()
-        if not source_networth:
-            raise DRFValidationError(f"Place '{place}' with currency '{source_currency}' does not exist.")
-            
-        if source_networth.total < amount:
-            raise DRFValidationError(f"Insufficient funds in '{place}'. Available: {source_networth.total} {source_currency}.")
-            
         try:
-            with transaction.atomic():
-                # 1. Create withdraw transaction
-                withdraw_trans = create_transaction(
-                    user=user,
-                    amount=amount,
-                    currency=source_currency,
-                    trans_details=f"Currency Conversion to {target_currency}",
-                    category="Conversion",
-                    trans_status="Withdraw",
-                    transaction_date=date.today(),
-                    place=place
-                )
-                
-                # 2. Create deposit transaction
-                deposit_trans = create_transaction(
-                    user=user,
-                    amount=target_amount,
-                    currency=target_currency,
-                    trans_details=f"Currency Conversion from {source_currency}",
-                    category="Conversion",
-                    trans_status="Deposit",
-                    transaction_date=date.today(),
-                    place=place
-                )
+            create_transfer(
+                user=user,
+                amount=amount,
+                currency=source_currency,
+                place=place,
+                target_currency=target_currency,
+                target_amount=target_amount,
+                category="Conversion",
+            )
         except DjangoValidationError as e:
             raise DRFValidationError(e.message)
         except Exception as e:
@@ -294,7 +292,10 @@ class DeleteNetworthApi(APIView):
         if networth_record.total != 0.0:
             raise DRFValidationError("Only net worth records with a balance of zero can be deleted.")
 
-        networth_record.delete()
+        with transaction.atomic():
+            networth_record.delete()
+            clear_networth_snapshots(user, networth_record.currency, networth_record.place or 'General')
+        bump_user_data_version(user)
 
         return Response({"message": "Net worth record deleted successfully"}, status=status.HTTP_200_OK)
 
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from transaction_management.models import Transactions
+from scheduled_trans_management.models import ScheduledTransaction
+from finance_management.utils.blind_index import category_blind_index
+
+
+class Command(BaseCommand):
+    help = "Fill the category blind index on transactions and scheduled transactions"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Rows decrypted and updated per batch",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Recompute every row instead of only rows without an index (needed after changing BLIND_INDEX_KEY)",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        for model in (Transactions, ScheduledTransaction):
+            queryset = model.objects.all()
+            if not options["all"]:
+                queryset = queryset.filter(category_index__isnull=True)
+
+            updated = 0
+            batch = []
+            for pk, category in queryset.order_by("pk").values_list("pk", "category").iterator(chunk_size=batch_size):
+                batch.append(model(pk=pk, category_index=category_blind_index(category)))
+                if len(batch) >= batch_size:
+                    model.objects.bulk_update(batch, ["category_index"])
+                    updated += len(batch)
+                    batch = []
+            if batch:
+                model.objects.bulk_update(batch, ["category_index"])
+                updated += len(batch)
+
+            self.stdout.write(self.style.SUCCESS(f"{model.__name__}: indexed {updated} rows."))
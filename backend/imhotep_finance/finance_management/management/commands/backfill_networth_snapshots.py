@@ -0,0 +1,27 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from transaction_management.utils.networth_snapshots import backfill_networth_snapshots
+
+
+class Command(BaseCommand):
+    help = "Backfill the end-of-day net worth snapshots behind the net worth series"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            type=int,
+            default=None,
+            help="Only backfill this user's snapshots",
+        )
+
+    def handle(self, *args, **options):
+        users = get_user_model().objects.all()
+        if options["user"]:
+            users = users.filter(pk=options["user"])
+
+        backfilled_users = rows = 0
+        for user in users.order_by("pk").iterator():
+            rows += backfill_networth_snapshots(user)
+            backfilled_users += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Backfilled {rows} net worth snapshots for {backfilled_users} users."))
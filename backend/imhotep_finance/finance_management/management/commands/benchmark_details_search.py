@@ -0,0 +1,52 @@
+import time
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from transaction_management.models import Transactions
+from transaction_management.selectors import get_transactions_for_user, matches_encrypted_filters
+
+
+class Command(BaseCommand):
+    help = "Compare the indexed trans_details search with a full decrypt-and-scan of the same range"
+
+    def add_arguments(self, parser):
+        parser.add_argument("user_id", type=int, help="User whose transactions are searched")
+        parser.add_argument("query", type=str, help="Search term, as sent in details_search")
+        parser.add_argument("--start-date", type=str, default="1900-01-01", help="Range start (YYYY-MM-DD)")
+        parser.add_argument("--end-date", type=str, default="2999-12-31", help="Range end (YYYY-MM-DD)")
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per strategy; the best time is reported")
+
+    def handle(self, *args, **options):
+        user = get_user_model().objects.filter(id=options["user_id"]).first()
+        if not user:
+            raise CommandError(f"User {options['user_id']} not found")
+        query = options["query"]
+        start_date, end_date = options["start_date"], options["end_date"]
+
+        def full_scan():
+            # The previous implementation: decrypt every row of the range and substring-match in Python
+            rows = Transactions.objects.filter(
+                user=user, date__gte=start_date, date__lte=end_date
+            ).values_list("id", "trans_details")
+            return {
+                trans_id for trans_id, details in rows
+                if matches_encrypted_filters(category_value=None, details_value=details, details_search=query)
+            }
+
+        def indexed():
+            queryset, _, _ = get_transactions_for_user(
+                user=user, start_date=start_date, end_date=end_date, details_search=query
+            )
+            return set(queryset.values_list("id", flat=True))
+
+        results = {}
+        for name, strategy in (("full scan", full_scan), ("indexed", indexed)):
+            timings = []
+            for _ in range(options["repeat"]):
+                started = time.perf_counter()
+                results[name] = strategy()
+                timings.append(time.perf_counter() - started)
+            self.stdout.write(f"{name:>10}: {min(timings) * 1000:.1f} ms best of {len(timings)}, {len(results[name])} matches")
+
+        if results["full scan"] != results["indexed"]:
+            raise CommandError("Indexed search returned different transactions than the full scan")
+        self.stdout.write(self.style.SUCCESS("Both strategies returned the same transactions."))
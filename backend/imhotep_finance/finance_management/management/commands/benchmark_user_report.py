@@ -0,0 +1,102 @@
+import random
+import time
+from datetime import date, timedelta
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from transaction_management.models import Transactions
+from finance_management.utils.blind_index import category_blind_index
+from finance_management.utils.currencies import convert_to_fav_currency
+from user_reports.utils.calculate_user_report import calculate_user_report
+
+CATEGORIES = ["Food", "Rent", "Salary", "Travel", "Health", "Transfer", "Gifts", "Utilities"]
+PLACES = ["General", "Bank", "Wallet", "Savings"]
+CURRENCIES = ["USD", "EUR", "GBP", "EGP"]
+
+
+def per_row_report(start_date, end_date, user):
+    """The previous engine: two queries, every row decrypted and converted on its own."""
+    totals = {}
+    for trans_status in ("withdraw", "deposit"):
+        rows = Transactions.objects.filter(
+            user=user, trans_status__iexact=trans_status, date__range=(start_date, end_date)
+        ).values("amount", "currency", "category", "place")
+        total = 0.0
+        for row in rows:
+            if row["category"] and str(row["category"]).strip().title() in ["Transfer", "Conversion"]:
+                continue
+            converted, _ = convert_to_fav_currency(user, {row["currency"]: float(row["amount"])})
+            total += converted or 0
+        totals[trans_status] = total
+    return totals["withdraw"], totals["deposit"]
+
+
+class Command(BaseCommand):
+    help = "Time the grouped report engine against the per-row engine on synthetic months of growing size"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            type=str,
+            default="100,1000,5000",
+            help="Comma separated transaction counts to benchmark",
+        )
+        parser.add_argument("--repeat", type=int, default=3, help="Runs per engine; the best time is reported")
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options["sizes"].split(",")]
+        except ValueError:
+            raise CommandError("--sizes must be a comma separated list of integers")
+
+        start_date = date(2000, 1, 1)
+        end_date = date(2000, 1, 31)
+        rng = random.Random(42)
+
+        # Everything is written in one transaction and rolled back at the end
+        with transaction.atomic():
+            user = get_user_model().objects.create_user(username=f"report-benchmark-{time.time_ns()}", password=None)
+            created = 0
+            for size in sorted(sizes):
+                rows = []
+                for _ in range(size - created):
+                    category = rng.choice(CATEGORIES)
+                    rows.append(Transactions(
+                        user=user,
+                        amount=round(rng.uniform(1, 500), 2),
+                        currency=rng.choice(CURRENCIES),
+                        trans_status=rng.choice(["deposit", "withdraw"]),
+                        category=category,
+                        category_index=category_blind_index(category),
+                        place=rng.choice(PLACES),
+                        date=start_date + timedelta(days=rng.randrange(31)),
+                    ))
+                Transactions.objects.bulk_create(rows, batch_size=1000)
+                created = size
+
+                timings = {}
+                results = {}
+                for name, engine in (
+                    ("per-row", lambda: per_row_report(start_date, end_date, user)),
+                    ("grouped", lambda: calculate_user_report(start_date, end_date, user)[4:]),
+                ):
+                    runs = []
+                    for _ in range(options["repeat"]):
+                        started = time.perf_counter()
+                        results[name] = engine()
+                        runs.append(time.perf_counter() - started)
+                    timings[name] = min(runs)
+
+                self.stdout.write(
+                    f"{size:>7} transactions: per-row {timings['per-row'] * 1000:8.1f} ms, "
+                    f"grouped {timings['grouped'] * 1000:8.1f} ms "
+                    f"({timings['per-row'] / max(timings['grouped'], 1e-9):.1f}x)"
+                )
+                if any(abs(old - new) > 0.01 for old, new in zip(results["per-row"], results["grouped"])):
+                    self.stdout.write(self.style.WARNING(
+                        "  totals differ; expected only when daily rate history differs from the latest rates"
+                    ))
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS("Benchmark data rolled back."))
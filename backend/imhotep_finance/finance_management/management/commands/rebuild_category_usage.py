@@ -0,0 +1,27 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from transaction_management.utils.category_usage import rebuild_category_usage
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-user category usage counters behind the category suggestions"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            type=int,
+            default=None,
+            help="Only rebuild this user's counters",
+        )
+
+    def handle(self, *args, **options):
+        users = get_user_model().objects.all()
+        if options["user"]:
+            users = users.filter(pk=options["user"])
+
+        rebuilt_users = rows = 0
+        for user in users.order_by("pk").iterator():
+            rows += rebuild_category_usage(user)
+            rebuilt_users += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} category usage counters for {rebuilt_users} users."))
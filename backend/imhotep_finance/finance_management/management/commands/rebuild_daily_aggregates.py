@@ -0,0 +1,27 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from transaction_management.utils.daily_aggregates import rebuild_daily_aggregates
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-day transaction aggregates behind the time-series report"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            type=int,
+            default=None,
+            help="Only rebuild this user's aggregates",
+        )
+
+    def handle(self, *args, **options):
+        users = get_user_model().objects.all()
+        if options["user"]:
+            users = users.filter(pk=options["user"])
+
+        rebuilt_users = rows = 0
+        for user in users.order_by("pk").iterator():
+            rows += rebuild_daily_aggregates(user)
+            rebuilt_users += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} daily aggregates for {rebuilt_users} users."))
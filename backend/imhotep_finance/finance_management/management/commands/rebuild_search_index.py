@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from transaction_management.models import Transactions
+from transaction_management.utils.search_index import index_transaction_details
+
+
+class Command(BaseCommand):
+    help = "Rebuild the trans_details search tokens of transactions"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Transactions decrypted and indexed per batch",
+        )
+        parser.add_argument(
+            "--user",
+            type=int,
+            default=None,
+            help="Only rebuild this user's transactions",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Rebuild every transaction instead of only unindexed ones (needed after changing BLIND_INDEX_KEY)",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        queryset = Transactions.objects.all()
+        if options["user"]:
+            queryset = queryset.filter(user_id=options["user"])
+        if not options["all"]:
+            queryset = queryset.filter(details_indexed=False)
+
+        indexed = tokens = 0
+        batch = []
+        for trans in queryset.order_by("pk").only("id", "user_id", "trans_details").iterator(chunk_size=batch_size):
+            batch.append(trans)
+            if len(batch) >= batch_size:
+                tokens += index_transaction_details(batch)
+                indexed += len(batch)
+                batch = []
+        if batch:
+            tokens += index_transaction_details(batch)
+            indexed += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} transactions ({tokens} search tokens)."))
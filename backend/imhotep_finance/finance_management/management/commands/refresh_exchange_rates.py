@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+from finance_management.utils.currencies import BASE_CURRENCY
+from finance_management.utils.rate_providers import RatesProviderError, get_rates_provider
+from finance_management.utils.rates_refresh import refresh_exchange_rates
+
+
+class Command(BaseCommand):
+    help = "Fetch the latest exchange rates when the stored ones are stale (run from cron)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--base",
+            default=BASE_CURRENCY,
+            help="Base currency to refresh",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Refresh even if the stored rates are less than a day old",
+        )
+        parser.add_argument(
+            "--provider",
+            default=None,
+            help="Dotted path of a provider class overriding EXCHANGE_RATES_PROVIDER, "
+                 "e.g. finance_management.utils.rate_providers.FixtureRatesProvider",
+        )
+
+    def handle(self, *args, **options):
+        provider = get_rates_provider(options["provider"])
+        try:
+            updated, message = refresh_exchange_rates(options["base"], provider=provider, force=options["force"])
+        except RatesProviderError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(message) if updated else message)
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from finance_management.utils.user_cache import get_response_cache_stats
+
+
+class Command(BaseCommand):
+    help = "Show hit/miss counters of the per-user response cache (needs a shared cache backend)"
+
+    def handle(self, *args, **options):
+        for name, counters in get_response_cache_stats().items():
+            hits, misses = counters['hits'], counters['misses']
+            total = hits + misses
+            ratio = f"{hits / total * 100:.1f}%" if total else "-"
+            self.stdout.write(f"{name:<24} hits={hits:<8} misses={misses:<8} hit rate={ratio}")
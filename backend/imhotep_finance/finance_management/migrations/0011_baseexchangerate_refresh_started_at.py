@@ -0,0 +1,18 @@
+# Generated by Django 5.2.14 on 2026-10-18 18:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance_management', '0010_baseexchangerate_delete_currencyexchangerate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='baseexchangerate',
+            name='refresh_started_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.14 on 2026-10-18 18:21
+
+from django.db import migrations, models
+
+
+def seed_daily_rates(apps, schema_editor):
+    """Start the history with the rates already stored, dated by their last update."""
+    BaseExchangeRate = apps.get_model('finance_management', 'BaseExchangeRate')
+    DailyExchangeRate = apps.get_model('finance_management', 'DailyExchangeRate')
+    for rate_obj in BaseExchangeRate.objects.all():
+        DailyExchangeRate.objects.bulk_create(
+            [
+                DailyExchangeRate(base_currency=rate_obj.base_currency, currency=currency, date=rate_obj.last_updated.date(), rate=float(rate))
+                for currency, rate in (rate_obj.rates or {}).items()
+                if rate is not None
+            ],
+            ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance_management', '0011_baseexchangerate_refresh_started_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyExchangeRate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('base_currency', models.CharField(default='USD', max_length=10)),
+                ('currency', models.CharField(max_length=10)),
+                ('date', models.DateField()),
+                ('rate', models.FloatField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['base_currency', 'date'], name='daily_rate_base_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('base_currency', 'currency', 'date'), name='unique_daily_exchange_rate')],
+            },
+        ),
+        migrations.RunPython(seed_daily_rates, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,7 @@
-from django.db import models
+from django.db import models, transaction
 from accounts.models import User
 from django.utils import timezone
+from finance_management.utils.rates_cache import invalidate_rates
 
 # Create your models here.
 #for the old models that have been moved to the respective apps
@@ -14,6 +15,34 @@ class BaseExchangeRate(models.Model):
     base_currency = models.CharField(max_length=10, default='USD', unique=True)
     rates = models.JSONField(default=dict)  # {'EUR': 0.92, 'GBP': 0.73, ...}
     last_updated = models.DateTimeField(auto_now=True)
+    # Lease taken by the process currently fetching new rates (single-flight refresh)
+    refresh_started_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Drop cached copies now and again on commit, so a rolled back refresh isn't served
+        base_currency = self.base_currency
+        invalidate_rates(base_currency)
+        transaction.on_commit(lambda: invalidate_rates(base_currency))
+
+    def __str__(self):
+        return f"Exchange rates for {self.base_currency} (updated: {self.last_updated})"
+
+
+class DailyExchangeRate(models.Model):
+    """Append-only history of the rates stored each day, used to convert at transaction-date rates."""
+    base_currency = models.CharField(max_length=10, default='USD')
+    currency = models.CharField(max_length=10)
+    date = models.DateField()
+    rate = models.FloatField()
 
     def __str__(self):
-        return f"Exchange rates for {self.base_currency} (updated: {self.last_updated})"
\ No newline at end of file
+        return f"{self.base_currency}/{self.currency} on {self.date}: {self.rate}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['base_currency', 'currency', 'date'], name='unique_daily_exchange_rate'),
+        ]
+        indexes = [
+            models.Index(fields=['base_currency', 'date'], name='daily_rate_base_date_idx'),
+        ]
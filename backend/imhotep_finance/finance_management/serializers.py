@@ -20,6 +20,12 @@ class CategoryRequestSerializer(serializers.Serializer):
         required=False,
         help_text="Filter categories by transaction status"
     )
+    weighting = serializers.ChoiceField(
+        choices=['frequency', 'recency'],
+        default='frequency',
+        required=False,
+        help_text="Order by use count, or by use count decayed with the days since last use"
+    )
 
 
 class CategoryResponseSerializer(serializers.Serializer):
@@ -59,4 +65,35 @@ class ConvertCurrencyRequestSerializer(serializers.Serializer):
 
 class DeleteNetworthRequestSerializer(serializers.Serializer):
     place = serializers.CharField(required=True, max_length=255, help_text="The place name of the net worth record")
-    currency = serializers.CharField(required=True, max_length=4, help_text="The currency of the net worth record")
\ No newline at end of file
+    currency = serializers.CharField(required=True, max_length=4, help_text="The currency of the net worth record")
+
+class DashboardQuerySerializer(serializers.Serializer):
+    include = serializers.CharField(
+        required=False,
+        help_text="Comma separated sections to return; all sections when omitted"
+    )
+
+    def validate_include(self, value):
+        from finance_management.utils.dashboard import DASHBOARD_SECTIONS
+
+        sections = [section.strip() for section in value.split(',') if section.strip()]
+        unknown = [section for section in sections if section not in DASHBOARD_SECTIONS]
+        if unknown:
+            raise serializers.ValidationError(
+                f"Unknown sections: {', '.join(unknown)}. Choose from: {', '.join(DASHBOARD_SECTIONS)}"
+            )
+        if not sections:
+            raise serializers.ValidationError("Choose at least one section")
+        # Keep the canonical order so equal selections share one cache entry
+        return [section for section in DASHBOARD_SECTIONS if section in sections]
+
+class DashboardResponseSerializer(serializers.Serializer):
+    id = serializers.IntegerField(help_text="User ID")
+    favorite_currency = serializers.CharField()
+    networth = serializers.FloatField(required=False, help_text="Total networth in the favorite currency")
+    networth_details = serializers.DictField(required=False, help_text="Networth details per place")
+    networth_by_place = serializers.ListField(child=serializers.DictField(), required=False)
+    categories = serializers.ListField(child=serializers.CharField(), required=False)
+    places = serializers.ListField(child=serializers.CharField(), required=False)
+    score = serializers.DictField(required=False, allow_null=True, help_text="Current month score, null without a target")
+    recent_transactions = serializers.DictField(required=False, help_text="First page of the last 30 days and its next_cursor")
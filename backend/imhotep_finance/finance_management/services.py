@@ -1,6 +1,7 @@
 from finance_management.utils.get_user_places import get_places
 from finance_management.utils.get_networth import get_networth, get_netWorth_details
 from finance_management.utils.get_category import get_category
+from finance_management.utils.dashboard import build_dashboard, DASHBOARD_SECTIONS
 
 
 def get_user_networth_service(user):
@@ -41,18 +42,19 @@ def get_user_networth_details_service(user):
     return get_netWorth_details(request)
 
 
-def get_user_categories_service(user, status='ANY'):
+def get_user_categories_service(user, status='ANY', weighting='frequency'):
     """
     Get user's most frequently used categories filtered by status.
     
     Args:
         user: User object
         status: Transaction status filter (Deposit, Withdraw, or ANY)
+        weighting: frequency, or recency to favor recently used categories
         
     Returns:
         list: List of category names
     """
-    return get_category(user, status)
+    return get_category(user, status, weighting)
 
 def get_user_places_service(user, currency='ANY'):
     """
@@ -65,4 +67,18 @@ def get_user_places_service(user, currency='ANY'):
     Returns:
         list: List of place names
     """
-    return get_places(user, currency=currency)
\ No newline at end of file
+    return get_places(user, currency=currency)
+
+
+def get_dashboard_service(user, sections=DASHBOARD_SECTIONS):
+    """
+    Get the dashboard sections of a user in one response.
+    
+    Args:
+        user: User object
+        sections: Names of the sections to include, from DASHBOARD_SECTIONS
+        
+    Returns:
+        dict: The user id and favorite currency plus one key per section
+    """
+    return build_dashboard(user, sections)
@@ -1,10 +1,31 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.core.cache import cache
 from django.urls import reverse
 from rest_framework.test import APITestCase
 from accounts.models import User
 from transaction_management.models import Transactions, NetWorth
-from datetime import date
+from datetime import date, timedelta
 from .utils.recalculate_networth import recalculate_networth
+from .utils.user_cache import get_response_cache_stats
+from .utils.currencies import BASE_CURRENCY, convert_amounts_to_fav_currency, convert_to_fav_currency, get_or_update_rates, get_rates
+from .utils.dashboard import DASHBOARD_SECTIONS
+from target_management.models import Target
+from .utils.rates_cache import invalidate_rates
+from .utils.rate_providers import RatesProvider, RatesProviderError, FixtureRatesProvider
+from .utils.rates_refresh import refresh_exchange_rates
+from .utils.rate_history import clear_rate_history_cache, get_rates_as_of, record_daily_rates
+from user_reports.utils.calculate_user_report import calculate_user_report
+from django.utils import timezone
+import json
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+import tempfile
+from unittest.mock import Mock, PropertyMock, patch
+from .models import BaseExchangeRate
+from transaction_management.services import create_transaction, delete_transaction, update_transaction
+from transaction_management.models import CategoryUsage, CategoryUsageBuild, NetWorthSnapshot, TransactionSearchToken
+from user_reports.models import Reports
+from transaction_management.utils.category_usage import rebuild_category_usage
 
 class RecalculateNetworthTest(TestCase):
 
@@ -38,6 +59,20 @@ class RecalculateNetworthTest(TestCase):
         self.assertEqual(Transactions.objects.filter(place='Office').count(), 3)
         self.assertEqual(Transactions.objects.filter(place='General').count(), 1)
 
+    def test_recalculate_networth_keeps_client_uuid_and_drops_stale_rows(self):
+        """Test existing NetWorth rows are updated in place and rows without transactions are removed"""
+        Transactions.objects.create(user=self.user, amount=100, currency='USD', trans_status='deposit', category='Test', date=date.today(), place='Bank')
+        Transactions.objects.create(user=self.user, amount=30, currency='USD', trans_status='withdraw', category='Test', date=date.today(), place='bank ')
+        bank = NetWorth.objects.create(user=self.user, currency='USD', place='Bank', total=999)
+        NetWorth.objects.create(user=self.user, currency='EUR', place='Old', total=5)
+        success, data = recalculate_networth(self.user)
+        self.assertTrue(success)
+        refreshed = NetWorth.objects.get(user=self.user)
+        self.assertEqual(refreshed.client_uuid, bank.client_uuid)
+        self.assertEqual(float(refreshed.total), 70)
+        self.assertEqual(data['currency_totals'], {'USD': 70.0})
+        self.assertEqual(list(NetWorthSnapshot.objects.filter(user=self.user).values_list('currency', 'place', 'balance')), [('USD', 'Bank', 70.0)])
+
     def test_recalculate_networth_empty_db(self):
         """Test recalculate_networth on an empty database"""
         success, data = recalculate_networth(self.user)
@@ -85,6 +120,17 @@ class MoveMoneyApiTest(APITestCase):
         self.assertEqual(withdrawals.first().category, 'Transfer')
         self.assertEqual(deposits.first().category, 'Transfer')
 
+    def test_move_money_legs_are_deleted_as_a_unit(self):
+        """Test both legs share a transfer id and deleting one leg reverses the whole transfer"""
+        self.client.post(self.url, {'source_place': 'Cash', 'target_place': 'Bank', 'amount': 300.0, 'currency': 'USD'}, format='json')
+        withdraw, deposit = Transactions.objects.filter(user=self.user).order_by('id')
+        self.assertIsNotNone(withdraw.transfer_id)
+        self.assertEqual(withdraw.transfer_id, deposit.transfer_id)
+        delete_transaction(user=self.user, transaction_id=withdraw.id)
+        self.assertFalse(Transactions.objects.filter(user=self.user).exists())
+        self.assertEqual(NetWorth.objects.get(user=self.user, place='Cash').total, 1000.0)
+        self.assertEqual(NetWorth.objects.get(user=self.user, place='Bank').total, 500.0)
+
     def test_move_money_to_new_place_success(self):
         """Test moving money to a target place that doesn't exist yet"""
         payload = {
@@ -138,6 +184,58 @@ class MoveMoneyApiTest(APITestCase):
         self.assertEqual(res.status_code, 400)
         self.assertIn("does not exist", str(res.data))
 
+    def test_move_money_unexpected_error_is_a_validation_error(self):
+        """Test an unexpected error while writing the transfer answers 400 with its message"""
+        with patch('finance_management.apis.create_transfer', side_effect=RuntimeError('Rates unavailable')):
+            res = self.client.post(self.url, {'source_place': 'Cash', 'target_place': 'Bank', 'amount': 100.0, 'currency': 'USD'}, format='json')
+        self.assertEqual(res.status_code, 400)
+        self.assertIn("Rates unavailable", str(res.data))
+
+    def test_move_money_legs_get_ids_without_bulk_insert_returning(self):
+        """Test both legs are indexed under their ids on backends that can't return rows from bulk inserts"""
+        with patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', new_callable=PropertyMock, return_value=False):
+            res = self.client.post(self.url, {'source_place': 'Cash', 'target_place': 'Bank', 'amount': 100.0, 'currency': 'USD'}, format='json')
+        self.assertEqual(res.status_code, 200)
+        for trans in Transactions.objects.filter(user=self.user):
+            self.assertTrue(trans.details_indexed)
+            self.assertTrue(TransactionSearchToken.objects.filter(transaction=trans).exists())
+
+class ConvertCurrencyApiTest(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        NetWorth.objects.create(user=self.user, currency='USD', place='Bank', total=500.0)
+        self.url = reverse('convert_currency')
+
+    def test_convert_currency_writes_paired_legs_without_reports(self):
+        """Test a conversion moves both balances, links its legs and leaves reports alone"""
+        payload = {'place': 'Bank', 'source_currency': 'USD', 'target_currency': 'EUR', 'amount': 100.0, 'target_amount': 90.0}
+        res = self.client.post(self.url, payload, format='json')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(NetWorth.objects.get(user=self.user, currency='USD').total, 400.0)
+        self.assertEqual(NetWorth.objects.get(user=self.user, currency='EUR').total, 90.0)
+        self.assertEqual(Transactions.objects.filter(user=self.user).values('transfer_id').distinct().count(), 1)
+        self.assertFalse(Reports.objects.filter(user=self.user).exists())
+
+    def test_convert_currency_insufficient_funds_fails(self):
+        """Test converting more than the source balance fails without writing anything"""
+        payload = {'place': 'Bank', 'source_currency': 'USD', 'target_currency': 'EUR', 'amount': 600.0, 'target_amount': 540.0}
+        res = self.client.post(self.url, payload, format='json')
+        self.assertEqual(res.status_code, 400)
+        self.assertIn("Insufficient funds", str(res.data))
+        self.assertFalse(Transactions.objects.filter(user=self.user).exists())
+
+
+    def test_convert_currency_unexpected_error_is_a_validation_error(self):
+        """Test an unexpected error while writing the conversion answers 400 with its message"""
+        payload = {'place': 'Bank', 'source_currency': 'USD', 'target_currency': 'EUR', 'amount': 100.0, 'target_amount': 90.0}
+        with patch('finance_management.apis.create_transfer', side_effect=RuntimeError('Rates unavailable')):
+            res = self.client.post(self.url, payload, format='json')
+        self.assertEqual(res.status_code, 400)
+        self.assertIn("Rates unavailable", str(res.data))
+
+
 class DeleteNetworthApiTest(APITestCase):
 
     def setUp(self):
@@ -152,6 +250,8 @@ class DeleteNetworthApiTest(APITestCase):
 
     def test_delete_networth_zero_balance_success(self):
         """Test that deleting a networth with zero balance is successful"""
+        NetWorthSnapshot.objects.create(user=self.user, currency='USD', place='Cash', date=date.today() - timedelta(days=3), balance=40.0)
+        NetWorthSnapshot.objects.create(user=self.user, currency='USD', place='Bank', date=date.today() - timedelta(days=3), balance=500.0)
         payload = {
             'place': 'Cash',
             'currency': 'USD'
@@ -162,6 +262,11 @@ class DeleteNetworthApiTest(APITestCase):
         
         # Verify it is deleted
         self.assertFalse(NetWorth.objects.filter(user=self.user, currency='USD', place='Cash').exists())
+        # Only the removed balance's history changes: kept in the past, zero from today
+        self.assertEqual(
+            list(NetWorthSnapshot.objects.filter(user=self.user).order_by('place', 'date').values_list('place', 'date', 'balance')),
+            [('Bank', date.today() - timedelta(days=3), 500.0), ('Cash', date.today() - timedelta(days=3), 40.0), ('Cash', date.today(), 0.0)],
+        )
 
     def test_delete_networth_non_zero_balance_fails(self):
         """Test that deleting a networth with non-zero balance fails"""
@@ -185,3 +290,233 @@ class DeleteNetworthApiTest(APITestCase):
         res = self.client.delete(self.url, payload, format='json')
         self.assertEqual(res.status_code, 400)
         self.assertIn("Net worth record not found.", str(res.data))
+
+
+@override_settings(USER_RESPONSE_CACHE_TIMEOUT=300)
+class UserResponseCacheTest(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('get_netWorth_details')
+        create_transaction(user=self.user, amount=100, currency='USD', trans_status='deposit', category='Salary', trans_details='', transaction_date=date.today(), place='General')
+
+    def test_repeated_read_is_served_from_cache(self):
+        """Test a second identical read is a cache hit"""
+        first = self.client.get(self.url)
+        second = self.client.get(self.url)
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(get_response_cache_stats()['networth_details'], {'hits': 1, 'misses': 1})
+
+    def test_write_service_invalidates_cached_read(self):
+        """Test a write through a service bumps the user's version so the next read is fresh"""
+        self.client.get(self.url)
+        create_transaction(user=self.user, amount=50, currency='USD', trans_status='deposit', category='Gift', trans_details='', transaction_date=date.today(), place='General')
+        res = self.client.get(self.url)
+        self.assertIn('150', str(res.data['networth_details']))
+        self.assertEqual(get_response_cache_stats()['networth_details']['misses'], 2)
+
+
+class CategoryUsageTest(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('get_category')
+        today = date.today()
+        for category, days_ago in [('Food', 200), ('Food', 190), ('Food', 180), ('Rent', 1), ('Rent', 2)]:
+            create_transaction(user=self.user, amount=10, currency='USD', trans_status='deposit', category=category, trans_details='', transaction_date=today - timedelta(days=days_ago), place='General')
+        self.coffee = create_transaction(user=self.user, amount=5, currency='USD', trans_status='withdraw', category='Coffee', trans_details='', transaction_date=today, place='General')
+
+    def _counters(self):
+        return sorted(CategoryUsage.objects.filter(user=self.user, count__gt=0).values_list('trans_status', 'category', 'count', 'last_used'))
+
+    def test_categories_ordered_by_frequency_or_recency(self):
+        """Test categories come back by use count, and recency weighting favors recently used ones"""
+        self.assertEqual(self.client.get(self.url).data['category'], ['Food', 'Rent', 'Coffee'])
+        self.assertEqual(self.client.get(self.url, {'status': 'Withdraw'}).data['category'], ['Coffee'])
+        self.assertEqual(self.client.get(self.url, {'weighting': 'recency'}).data['category'], ['Rent', 'Coffee', 'Food'])
+
+    def test_counters_from_before_upgrade_are_built_on_first_read(self):
+        """Test a user whose counters were never built gets them from all transactions, even after a newer write"""
+        CategoryUsage.objects.filter(user=self.user).delete()
+        CategoryUsageBuild.objects.filter(user=self.user).delete()
+        create_transaction(user=self.user, amount=5, currency='USD', trans_status='deposit', category='Gift', trans_details='', transaction_date=date.today() - timedelta(days=3), place='General')
+        self.assertEqual(self.client.get(self.url).data['category'], ['Food', 'Rent', 'Coffee', 'Gift'])
+        self.assertTrue(CategoryUsageBuild.objects.filter(user=self.user).exists())
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url, {'status': 'Withdraw'})
+        self.assertEqual(sum(Transactions._meta.db_table in query['sql'] for query in queries.captured_queries), 0)
+
+    def test_write_paths_keep_counters_matching_a_rebuild(self):
+        """Test update and delete maintain the same counters a rebuild computes"""
+        update_transaction(user=self.user, transaction_id=self.coffee.id, amount=5, currency='USD', trans_details='', category='Snacks', trans_status='withdraw', transaction_date=date.today(), place='General')
+        older_rent = Transactions.objects.get(user=self.user, date=date.today() - timedelta(days=2))
+        delete_transaction(user=self.user, transaction_id=older_rent.id)
+        incremental = self._counters()
+        self.assertIn(('withdraw', 'Snacks', 1, date.today()), incremental)
+        self.assertIn(('deposit', 'Rent', 1, date.today() - timedelta(days=1)), incremental)
+        rebuild_category_usage(self.user)
+        self.assertEqual(self._counters(), incremental)
+
+
+class DashboardApiTest(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('dashboard')
+        create_transaction(user=self.user, amount=100, currency='USD', trans_status='deposit', category='Salary', trans_details='', transaction_date=date.today(), place='Bank')
+        create_transaction(user=self.user, amount=50, currency='USD', trans_status='deposit', category='Gift', trans_details='', transaction_date=date.today(), place='Wallet')
+
+    def test_dashboard_matches_the_separate_endpoints(self):
+        """Test every section carries the same data as the endpoint it replaces"""
+        res = self.client.get(self.url)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data['networth'], self.client.get(reverse('get_networth')).data['networth'])
+        self.assertEqual(res.data['networth_details'], self.client.get(reverse('get_netWorth_details')).data['networth_details'])
+        self.assertEqual(res.data['categories'], self.client.get(reverse('get_category')).data['category'])
+        self.assertEqual(res.data['places'], self.client.get(reverse('get_places')).data['places'])
+        self.assertEqual(res.data['networth_by_place'], self.client.get(reverse('networth_by_place')).data['networth_by_place'])
+        self.assertIsNone(res.data['score'])
+        self.assertEqual(len(res.data['recent_transactions']['transactions']), 2)
+
+    def test_sections_share_one_networth_query_and_one_rates_lookup(self):
+        """Test the default sections read NetWorth, the category counters and the rates once per request"""
+        Target.objects.create(user=self.user, target=10, month=date.today().month, year=date.today().year, score=0)
+        rebuild_category_usage(self.user)
+        rates_lookup = Mock(wraps=get_rates)
+        with patch('finance_management.utils.dashboard.get_rates', rates_lookup), patch('finance_management.utils.currencies.get_rates', rates_lookup):
+            with CaptureQueriesContext(connection) as queries:
+                res = self.client.get(self.url)
+        self.assertEqual(set(res.data) - {'id', 'favorite_currency'}, set(DASHBOARD_SECTIONS))
+        self.assertEqual(res.data['score']['score'], 140)
+        self.assertEqual(rates_lookup.call_count, 1)
+        self.assertEqual(sum(NetWorth._meta.db_table in query['sql'] for query in queries.captured_queries), 1)
+        self.assertEqual(sum(f'"{CategoryUsage._meta.db_table}"' in query['sql'] for query in queries.captured_queries), 1)
+
+    def test_unknown_section_is_rejected(self):
+        """Test an include naming an unknown section returns 400"""
+        res = self.client.get(self.url, {'include': 'networth,weather'})
+        self.assertEqual(res.status_code, 400)
+
+
+class ExchangeRatesCacheTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.rate_obj = BaseExchangeRate.objects.create(base_currency=BASE_CURRENCY, rates={'USD': 1.0, 'EUR': 0.5})
+
+    def tearDown(self):
+        invalidate_rates(BASE_CURRENCY)
+
+    def test_conversions_reuse_cached_rates(self):
+        """Test only the first conversion reads the rates from the database"""
+        with self.assertNumQueries(1):
+            self.assertEqual(convert_to_fav_currency(self.user, {'EUR': 50}), (100.0, 'USD'))
+        with self.assertNumQueries(0):
+            for _ in range(10):
+                self.assertEqual(convert_to_fav_currency(self.user, {'EUR': 50, 'USD': 1}), (101.0, 'USD'))
+
+    def test_batch_conversion_is_element_wise(self):
+        """Test the batch converter converts each element with one rates lookup"""
+        self.user.favorite_currency = 'EUR'
+        with self.assertNumQueries(1):
+            converted, favorite_currency = convert_amounts_to_fav_currency(self.user, [10, 4, 7] * 1000, ['USD', 'EUR', 'XYZ'] * 1000)
+        self.assertEqual(favorite_currency, 'EUR')
+        self.assertEqual(converted[:3], [5.0, 4.0, None])
+        with self.assertRaises(ValueError):
+            convert_amounts_to_fav_currency(self.user, [1, 2], ['USD'])
+
+    def test_saving_rates_invalidates_cache(self):
+        """Test a refreshed BaseExchangeRate is used by the next conversion"""
+        convert_to_fav_currency(self.user, {'EUR': 50})
+        self.rate_obj.rates = {'USD': 1.0, 'EUR': 0.25}
+        self.rate_obj.save()
+        self.assertEqual(convert_to_fav_currency(self.user, {'EUR': 50}), (200.0, 'USD'))
+
+
+class UnreachableRatesProvider(RatesProvider):
+    calls = 0
+
+    def fetch(self, base_currency):
+        UnreachableRatesProvider.calls += 1
+        raise RatesProviderError("Rates API unreachable")
+
+
+class ExchangeRatesRefreshTest(TestCase):
+
+    def setUp(self):
+        UnreachableRatesProvider.calls = 0
+        self.rate_obj = BaseExchangeRate.objects.create(base_currency=BASE_CURRENCY, rates={'USD': 1.0, 'EUR': 0.5})
+        BaseExchangeRate.objects.filter(pk=self.rate_obj.pk).update(last_updated=timezone.now() - timedelta(days=2))
+
+    def tearDown(self):
+        invalidate_rates(BASE_CURRENCY)
+
+    @override_settings(EXCHANGE_RATES_PROVIDER='finance_management.tests.UnreachableRatesProvider')
+    def test_stale_rates_are_served_without_fetching(self):
+        """Test a request gets the last good rates and never calls the provider inline"""
+        self.assertEqual(get_or_update_rates(BASE_CURRENCY)['EUR'], 0.5)
+        self.assertEqual(UnreachableRatesProvider.calls, 0)
+
+    def test_refresh_is_single_flight(self):
+        """Test a second refresh backs off while another process holds the lease"""
+        BaseExchangeRate.objects.filter(pk=self.rate_obj.pk).update(refresh_started_at=timezone.now())
+        updated, message = refresh_exchange_rates(BASE_CURRENCY, provider=UnreachableRatesProvider())
+        self.assertFalse(updated)
+        self.assertEqual(UnreachableRatesProvider.calls, 0)
+
+    def test_failed_refresh_keeps_rates_and_releases_lease(self):
+        """Test a provider failure leaves the stored rates and frees the lease for the next try"""
+        with self.assertRaises(RatesProviderError):
+            refresh_exchange_rates(BASE_CURRENCY, provider=UnreachableRatesProvider())
+        self.rate_obj.refresh_from_db()
+        self.assertEqual(self.rate_obj.rates['EUR'], 0.5)
+        self.assertIsNone(self.rate_obj.refresh_started_at)
+
+    def test_fixture_provider_refresh(self):
+        """Test rates are refreshed offline from a JSON fixture"""
+        with tempfile.NamedTemporaryFile('w', suffix='.json') as fixture:
+            json.dump({'USD': {'USD': 1, 'EUR': 0.8}}, fixture)
+            fixture.flush()
+            with override_settings(EXCHANGE_RATES_FIXTURE=fixture.name):
+                updated, _ = refresh_exchange_rates(BASE_CURRENCY, provider=FixtureRatesProvider())
+        self.assertTrue(updated)
+        self.assertEqual(get_or_update_rates(BASE_CURRENCY)['EUR'], 0.8)
+
+
+class ExchangeRateHistoryTest(TestCase):
+
+    def setUp(self):
+        clear_rate_history_cache()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.day1 = date(2024, 3, 1)
+        self.day3 = date(2024, 3, 3)
+        record_daily_rates(BASE_CURRENCY, {'USD': 1.0, 'EUR': 0.5}, day=self.day1)
+        record_daily_rates(BASE_CURRENCY, {'USD': 1.0, 'EUR': 0.8}, day=self.day3)
+
+    def tearDown(self):
+        clear_rate_history_cache()
+
+    def test_as_of_lookup_resolves_pairs_in_one_query(self):
+        """Test many (currency, day) pairs resolve in one query and closed days are then cached"""
+        days = [date(2024, 2, 1), self.day1, date(2024, 3, 2), self.day3, date(2024, 3, 20)]
+        pairs = [('EUR', day) for day in days] + [('GBP', self.day1)]
+        with self.assertNumQueries(1):
+            rates = get_rates_as_of(pairs, base_currency=BASE_CURRENCY)
+        self.assertEqual([rates[('EUR', day)] for day in days], [0.5, 0.5, 0.5, 0.8, 0.8])
+        self.assertIsNone(rates[('GBP', self.day1)])
+        with self.assertNumQueries(0):
+            get_rates_as_of(pairs, base_currency=BASE_CURRENCY)
+
+    def test_report_converts_at_transaction_date_rates(self):
+        """Test a closed month keeps its value when today's rates change"""
+        Transactions.objects.create(user=self.user, amount=100, currency='EUR', trans_status='withdraw', category='Food', date=self.day1, place='General')
+        Transactions.objects.create(user=self.user, amount=80, currency='EUR', trans_status='withdraw', category='Food', date=self.day3, place='General')
+        record_daily_rates(BASE_CURRENCY, {'USD': 1.0, 'EUR': 0.1})
+        total_withdraw = calculate_user_report(date(2024, 3, 1), date(2024, 3, 31), self.user)[4]
+        self.assertAlmostEqual(total_withdraw, 300.0)
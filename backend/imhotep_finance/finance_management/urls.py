@@ -1,5 +1,5 @@
 from django.urls import path, include
-from .apis import GetNetworthApi, GetNetworthDetailsApi, GetCategoryApi, GetPlacesApi, MoveMoneyApi, ConvertCurrencyApi, GetExchangeRatesApi, DeleteNetworthApi
+from .apis import GetNetworthApi, GetNetworthDetailsApi, GetCategoryApi, GetPlacesApi, MoveMoneyApi, ConvertCurrencyApi, GetExchangeRatesApi, DeleteNetworthApi, DashboardApi
 
 urlpatterns = [
     # Core finance management endpoints - New DDD class-based APIs
@@ -11,6 +11,7 @@ urlpatterns = [
     path('convert-currency/', ConvertCurrencyApi.as_view(), name='convert_currency'),
     path('get-exchange-rates/', GetExchangeRatesApi.as_view(), name='get_exchange_rates'),
     path('delete-networth/', DeleteNetworthApi.as_view(), name='delete_networth'),
+    path('dashboard/', DashboardApi.as_view(), name='dashboard'),
     
     # Sub-app endpoints
     path('transaction/', include('transaction_management.urls')),
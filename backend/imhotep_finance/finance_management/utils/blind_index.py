@@ -0,0 +1,42 @@
+import hashlib
+import hmac
+from django.conf import settings
+
+# Categories left out of reports and scores (internal money moves)
+REPORT_EXCLUDED_CATEGORIES = ("Transfer", "Conversion")
+
+
+def normalize_category(value):
+    """Normalize a category the same way reports group it."""
+    if value is None:
+        return ""
+    return str(value).strip().title()
+
+
+def _blind_index_key():
+    # Derive a dedicated key so the HMAC never reuses the encryption key directly
+    secret = getattr(settings, 'BLIND_INDEX_KEY', '') or settings.FIELD_ENCRYPTION_KEY
+    return hashlib.sha256(b"imhotep-blind-index:" + secret.encode()).digest()
+
+
+def keyed_hash(value, purpose=""):
+    """HMAC-SHA256 hex digest of value; a purpose prefix keeps hashes of different fields apart."""
+    message = f"{purpose}:{value}" if purpose else value
+    return hmac.new(_blind_index_key(), message.encode(), hashlib.sha256).hexdigest()
+
+
+def category_blind_index(value):
+    """Keyed HMAC of the normalized category, safe to store and filter on in SQL.
+
+    Blank categories hash to an empty string so that NULL keeps meaning
+    "not indexed yet" (rows written before the backfill ran).
+    """
+    normalized = normalize_category(value)
+    if not normalized:
+        return ""
+    return keyed_hash(normalized)
+
+
+def excluded_category_indexes():
+    """Blind indexes of the categories reports and scores skip."""
+    return [category_blind_index(category) for category in REPORT_EXCLUDED_CATEGORIES]
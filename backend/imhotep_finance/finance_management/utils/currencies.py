@@ -1,12 +1,10 @@
-import os
 import datetime
-import requests
 from django.contrib.auth import get_user_model
-from django.utils import timezone
-from django.conf import settings
-from decouple import config
 from transaction_management.models import Transactions, NetWorth
 from finance_management.models import BaseExchangeRate
+from finance_management.utils.rates_cache import get_cached_rates, store_rates
+from finance_management.utils.rate_history import get_rates_as_of
+from finance_management.utils.rates_refresh import rates_are_stale, refresh_exchange_rates, schedule_rates_refresh
 
 BASE_CURRENCY = 'USD'
 
@@ -174,67 +172,121 @@ def get_default_test_rates():
 def get_fav_currency(user):
     return getattr(user, 'favorite_currency', 'USD')
 
-def fetch_rates_from_api(base_currency=BASE_CURRENCY):
-    """Fetch exchange rates from API and return rates dict or None on error."""
-    primary_api_key = config('EXCHANGE_API_KEY_PRIMARY')
-    try:
-        response = requests.get(
-            f"https://imhotepexchangeratesapi.pythonanywhere.com/latest_rates/{primary_api_key}/{base_currency}"
-        )
-        data = response.json()
-        rates = data.get("data")
-        return rates
-    except requests.RequestException as e:
-        print(f"Failed to fetch exchange rates from API: {e}")
-        return None
-
 def get_or_update_rates(base_currency=BASE_CURRENCY):
-    """Get rates from DB, update if older than 1 day, return rates dict or False on error."""
+    """
+    Get rates from DB and cache them, return rates dict or False on error.
+
+    Stale rates are still returned while a background refresh fetches new ones,
+    so requests don't wait on the rates API; only a cold start with no stored
+    rates fetches inline.
+    """
     try:
         rate_obj, created = BaseExchangeRate.objects.get_or_create(base_currency=base_currency)
-        
-        # Check if rates are older than 1 day
-        now = timezone.now()
-        if (now - rate_obj.last_updated).days >= 1 or not rate_obj.rates:
-            # Fetch new rates from API
-            new_rates = fetch_rates_from_api(base_currency)
-            if new_rates:
-                rate_obj.rates = new_rates
-                rate_obj.save()
-                return new_rates
-            else:
-                print(f"API fetch failed, using cached rates from DB")
-                # If no cached rates and we're in test mode, use default test rates
-                if not rate_obj.rates:
-                    # Check if we're in test mode
-                    is_test_mode = (
-                        hasattr(settings, 'TESTING') or 
-                        'test' in settings.SETTINGS_MODULE.lower() or
-                        os.environ.get('DJANGO_SETTINGS_MODULE', '').endswith('settings_test')
-                    )
-                    if is_test_mode:
-                        print("Test mode detected, using default test exchange rates")
-                        default_rates = get_default_test_rates()
-                        rate_obj.rates = default_rates
-                        rate_obj.save()
-                        return default_rates
-                return rate_obj.rates if rate_obj.rates else False
-        else:
-            # Rates are fresh
-            return rate_obj.rates if rate_obj.rates else False
+
+        if not rate_obj.rates:
+            updated, message = refresh_exchange_rates(base_currency, force=True)
+            if not updated:
+                print(f"No exchange rates stored yet: {message}")
+                return False
+            rate_obj.refresh_from_db()
+        elif rates_are_stale(rate_obj.last_updated):
+            schedule_rates_refresh(base_currency)
+
+        return store_rates(base_currency, rate_obj.rates, rate_obj.last_updated)['rates']
     except Exception as e:
         print(f"Error getting/updating rates: {e}")
-        # In test mode, return default rates even on error
-        is_test_mode = (
-            hasattr(settings, 'TESTING') or 
-            'test' in settings.SETTINGS_MODULE.lower() or
-            os.environ.get('DJANGO_SETTINGS_MODULE', '').endswith('settings_test')
-        )
-        if is_test_mode:
-            print("Test mode detected, using default test exchange rates after error")
-            return get_default_test_rates()
         return False
 
+def get_rates(base_currency=BASE_CURRENCY):
+    """
+    Return rates for base_currency from the rates cache, falling back to
+    get_or_update_rates (one DB round trip) on a miss. Stale cached rates are
+    served while a background refresh runs. The returned dict is shared, so
+    callers must not modify it.
+    """
+    payload = get_cached_rates(base_currency)
+    if payload is None:
+        return get_or_update_rates(base_currency)
+    if rates_are_stale(payload['version']):
+        schedule_rates_refresh(base_currency)
+    return payload['rates']
+
+def get_rate(rates, currency):
+    """Rate of currency in a rates dict, with the base currency (USD) always 1.0."""
+    if currency == BASE_CURRENCY:
+        return 1.0
+    return rates.get(currency)
+
+def get_conversion_factors(user, pairs):
+    """
+    Return {(currency, day): factor} where factor converts one unit of currency
+    into the user's favorite currency at the rates recorded for that day, or
+    None when a rate is missing. Days without history use the latest rates.
+
+    All pairs are resolved with one history query and at most one latest-rates lookup.
+    """
+    favorite_currency = get_fav_currency(user)
+    pairs = set(pairs)
+    wanted = {(currency, day) for currency, day in pairs if currency != BASE_CURRENCY}
+    if favorite_currency != BASE_CURRENCY:
+        wanted |= {(favorite_currency, day) for _, day in pairs}
+    historical = get_rates_as_of(wanted, base_currency=BASE_CURRENCY) if wanted else {}
+
+    latest = None
+    factors = {}
+    for currency, day in pairs:
+        if currency == favorite_currency:
+            factors[(currency, day)] = 1.0
+            continue
+
+        from_rate = 1.0 if currency == BASE_CURRENCY else historical.get((currency, day))
+        to_rate = 1.0 if favorite_currency == BASE_CURRENCY else historical.get((favorite_currency, day))
+        if from_rate is None or to_rate is None:
+            if latest is None:
+                latest = get_rates(BASE_CURRENCY) or {}
+            from_rate = get_rate(latest, currency)
+            to_rate = get_rate(latest, favorite_currency)
+
+        factors[(currency, day)] = to_rate / from_rate if from_rate and to_rate else None
+    return factors
+
+def convert_amounts_to_fav_currency(user, amounts, currencies, dates=None, rates=None):
+    """
+    Convert parallel sequences of amounts and currency codes (and optionally
+    dates, to use each day's rates) to the user's favorite currency.
+
+    One factor is resolved per distinct currency, or (currency, day), from a
+    single rates fetch and applied element-wise, so thousands of rows cost one
+    lookup. Without dates, rates can pass latest rates the caller already
+    fetched. Returns (converted, favorite_currency) where converted[i] is None
+    when a rate is missing.
+    """
+    if len(amounts) != len(currencies) or (dates is not None and len(dates) != len(amounts)):
+        raise ValueError("amounts, currencies and dates must have the same length")
+
+    favorite_currency = get_fav_currency(user)
+    if dates is not None:
+        keys = list(zip(currencies, dates))
+        factors = get_conversion_factors(user, keys)
+    else:
+        keys = currencies
+        if rates is None:
+            rates = get_rates(BASE_CURRENCY) or {}
+        favorite_rate = get_rate(rates, favorite_currency)
+        factors = {}
+        for currency in set(currencies):
+            rate = get_rate(rates, currency)
+            if currency == favorite_currency:
+                factors[currency] = 1.0
+            else:
+                factors[currency] = favorite_rate / rate if rate and favorite_rate else None
+
+    converted = [
+        float(amount) * factors[key] if factors[key] is not None else None
+        for amount, key in zip(amounts, keys)
+    ]
+    return converted, favorite_currency
+
 def convert_to_fav_currency(user, amounts_not_fav_currency):
     """
     Convert amounts in different currencies to user's favorite currency.
@@ -247,29 +299,28 @@ def convert_to_fav_currency(user, amounts_not_fav_currency):
         if not amounts_not_fav_currency:
             return 0.0, favorite_currency
         
-        # Get rates from DB (with update if stale)
-        rates = get_or_update_rates(BASE_CURRENCY)
+        # Get rates from the cache (DB with update if stale on a miss)
+        rates = get_rates(BASE_CURRENCY)
         
         if rates is False:
             print("No exchange rates available")
             return False, favorite_currency
         
-        # Ensure base currency (USD) has rate of 1.0
-        rates[BASE_CURRENCY] = 1.0
-        
         total_favorite_currency = 0.0
+        favorite_rate = get_rate(rates, favorite_currency)
         
         for currency, amount in amounts_not_fav_currency.items():
-            if currency not in rates or rates[currency] is None:
+            currency_rate = get_rate(rates, currency)
+            if currency_rate is None:
                 print(f"Rate not available for {currency}")
                 continue
             
-            if favorite_currency not in rates or rates[favorite_currency] is None:
+            if favorite_rate is None:
                 print(f"Rate not available for favorite currency {favorite_currency}")
                 return False, favorite_currency
             
             # Convert: (amount / rate_from_usd) * rate_to_usd
-            converted_amount = (amount / rates[currency]) * rates[favorite_currency]
+            converted_amount = (amount / currency_rate) * favorite_rate
             total_favorite_currency += converted_amount
         
         return total_favorite_currency, favorite_currency
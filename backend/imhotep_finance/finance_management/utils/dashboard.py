@@ -0,0 +1,149 @@
+from collections import Counter
+from transaction_management.models import NetWorth
+from transaction_management.selectors import get_transactions_page_by_cursor, resolve_date_range
+from .currencies import BASE_CURRENCY, convert_amounts_to_fav_currency, get_fav_currency, get_rates
+from .get_category import category_usage_rows, rank_categories
+from .serializer import serialize_transaction
+
+DASHBOARD_SECTIONS = (
+    'networth',
+    'networth_details',
+    'networth_by_place',
+    'categories',
+    'places',
+    'score',
+    'recent_transactions',
+)
+RECENT_TRANSACTIONS_LIMIT = 20
+
+
+class DashboardContext:
+    """
+    State shared by the dashboard sections of one request: the user's NetWorth
+    rows, category counters and the latest rates are read once, the first
+    time a section needs them, and every conversion uses those rates.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self._networth_rows = None
+        self._converted = None
+        self._rates = None
+        self._category_usages = None
+
+    @property
+    def rates(self):
+        if self._rates is None:
+            self._rates = get_rates(BASE_CURRENCY) or {}
+        return self._rates
+
+    @property
+    def category_usages(self):
+        if self._category_usages is None:
+            self._category_usages = category_usage_rows(self.user)
+        return self._category_usages
+
+    @property
+    def networth_rows(self):
+        if self._networth_rows is None:
+            self._networth_rows = list(NetWorth.objects.filter(user=self.user).values_list('place', 'currency', 'total'))
+        return self._networth_rows
+
+    @property
+    def converted(self):
+        if self._converted is None:
+            rows = self.networth_rows
+            self._converted, _ = convert_amounts_to_fav_currency(
+                self.user,
+                [total or 0.0 for _, _, total in rows],
+                [currency for _, currency, _ in rows],
+                rates=self.rates,
+            )
+        return self._converted
+
+
+def _networth(context):
+    return round(sum(amount or 0.0 for amount in context.converted), 2)
+
+
+def _networth_details(context):
+    details = {}
+    for place, currency, total in context.networth_rows:
+        details.setdefault(place or 'General', []).append({'currency': currency, 'amount': total})
+    return details
+
+
+def _networth_by_place(context):
+    places = {}
+    for (place, _, _), converted_amount in zip(context.networth_rows, context.converted):
+        place = place or 'General'
+        places[place] = places.get(place, 0.0) + (converted_amount or 0.0)
+
+    total_wealth = sum(places.values())
+    result = [
+        {
+            'place': place,
+            'converted_amount': converted_total,
+            'percentage': round((converted_total / total_wealth) * 100, 1) if total_wealth > 0 else 0,
+        }
+        for place, converted_total in places.items()
+    ]
+    result.sort(key=lambda x: x['percentage'], reverse=True)
+    return result
+
+
+def _categories(context):
+    return rank_categories(context.category_usages)
+
+
+def _places(context):
+    places = Counter(place for place, _, _ in context.networth_rows if place)
+    return [place for place, _ in places.most_common()]
+
+
+def _score(context):
+    from target_management.selectors import get_latest_target_for_user
+    from target_management.services import calculate_score
+
+    target = get_latest_target_for_user(user=context.user)
+    if not target:
+        return None
+    target_obj, score_txt, score = calculate_score(user=context.user, target_obj=target, rates=context.rates)
+    return {
+        "score": score,
+        "target": target_obj.target,
+        "month": target_obj.month,
+        "year": target_obj.year,
+        "score_txt": score_txt,
+    }
+
+
+def _recent_transactions(context):
+    start_date, end_date = resolve_date_range()
+    transactions, next_cursor = get_transactions_page_by_cursor(
+        user=context.user, start_date=start_date, end_date=end_date, page_size=RECENT_TRANSACTIONS_LIMIT
+    )
+    return {
+        "transactions": [serialize_transaction(t) for t in transactions],
+        "next_cursor": next_cursor,
+    }
+
+
+SECTION_BUILDERS = {
+    'networth': _networth,
+    'networth_details': _networth_details,
+    'networth_by_place': _networth_by_place,
+    'categories': _categories,
+    'places': _places,
+    'score': _score,
+    'recent_transactions': _recent_transactions,
+}
+
+
+def build_dashboard(user, sections=DASHBOARD_SECTIONS):
+    """Build the requested dashboard sections from one shared context."""
+    context = DashboardContext(user)
+    dashboard = {'id': user.id, 'favorite_currency': get_fav_currency(user) or 'USD'}
+    for section in sections:
+        dashboard[section] = SECTION_BUILDERS[section](context)
+    return dashboard
@@ -1,18 +1,61 @@
-from collections import Counter
-from transaction_management.models import Transactions
+from django.db import IntegrityError
+from django.utils import timezone
+from transaction_management.models import CategoryUsage, CategoryUsageBuild
+from transaction_management.utils.category_usage import rebuild_category_usage
 
+CATEGORY_WEIGHTINGS = ('frequency', 'recency')
+# Days after which a category's uses count half as much with recency weighting
+RECENCY_HALF_LIFE_DAYS = 30
 
-def get_category(user, status="ANY"):
-    """Get user's most frequently used categories."""
-    if not user or status is None:  # validate input parameters
-        return []
 
-    qs = Transactions.objects.filter(user=user)
+def category_usage_rows(user, status="ANY"):
+    """
+    The user's used (category_index, category, count, last_used) counters, of
+    one status or of all. Counters that were never built from all of the
+    user's transactions (users from before the counters) are built here, once.
+    """
+    if not CategoryUsageBuild.objects.filter(user=user).exists():
+        try:
+            rebuild_category_usage(user)
+        except IntegrityError:
+            # A concurrent request built them first
+            pass
+
+    qs = CategoryUsage.objects.filter(user=user, count__gt=0)
     if status != "ANY":
-        qs = qs.filter(trans_status__iexact=status)
+        qs = qs.filter(trans_status=status.lower())
+    return list(qs.values_list('category_index', 'category', 'count', 'last_used'))
+
+
+def rank_categories(rows, weighting="frequency"):
+    """Category names of usage counter rows, most used first, optionally weighted towards recent use."""
+    # With ANY a category can have a counter per status; merge them by blind index
+    usages = {}
+    for category_index, category, count, last_used in rows:
+        merged = usages.get(category_index)
+        if merged is None:
+            usages[category_index] = [category, count, last_used]
+            continue
+        merged[1] += count
+        if last_used > merged[2]:
+            merged[0], merged[2] = category, last_used
 
-    qs = qs.exclude(category__isnull=True).exclude(category__exact="")
+    if weighting == "recency":
+        today = timezone.localdate()
 
-    # Grouping on an encrypted column is non-deterministic, so count in Python after decryption
-    category_list = [c for c in (tx.category for tx in qs.only("category")) if c and c.strip()]
-    return [category for category, _ in Counter(category_list).most_common()]
+        def score(usage):
+            days = max((today - usage[2]).days, 0)
+            return usage[1] * 0.5 ** (days / RECENCY_HALF_LIFE_DAYS)
+    else:
+        def score(usage):
+            return usage[1]
+
+    ranked = sorted(usages.values(), key=lambda usage: (score(usage), usage[2]), reverse=True)
+    return [category for category, _, _ in ranked if category]
+
+
+def get_category(user, status="ANY", weighting="frequency"):
+    """Get user's most frequently used categories, optionally weighted towards recent use."""
+    if not user or status is None:  # validate input parameters
+        return []
+    return rank_categories(category_usage_rows(user, status), weighting)
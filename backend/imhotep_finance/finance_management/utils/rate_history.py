@@ -0,0 +1,102 @@
+from collections import OrderedDict
+from django.conf import settings
+from django.db.models import DateField, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+from finance_management.models import DailyExchangeRate
+
+# (base_currency, day) -> {currency: rate or None}, least recently used first.
+# Only days before today are kept: their history is final, so they never go stale.
+_closed_days = OrderedDict()
+
+
+def clear_rate_history_cache():
+    _closed_days.clear()
+
+
+def record_daily_rates(base_currency, rates, day=None):
+    """Append the rates for day (today by default); a day already recorded is kept as is."""
+    day = day or timezone.localdate()
+    DailyExchangeRate.objects.bulk_create(
+        [
+            DailyExchangeRate(base_currency=base_currency, currency=currency, date=day, rate=float(rate))
+            for currency, rate in rates.items()
+            if rate is not None
+        ],
+        ignore_conflicts=True,
+    )
+    clear_rate_history_cache()
+
+
+def _remember(base_currency, day, rates):
+    if day >= timezone.localdate():
+        return
+    key = (base_currency, day)
+    _closed_days.setdefault(key, {}).update(rates)
+    _closed_days.move_to_end(key)
+    while len(_closed_days) > settings.EXCHANGE_RATES_HISTORY_CACHE_DAYS:
+        _closed_days.popitem(last=False)
+
+
+def _load_rates_as_of(base_currency, currencies, days):
+    """
+    Resolve {day: {currency: rate}} for every day with one range query.
+
+    The range starts at the last recorded day on or before the earliest day
+    asked for, so each day gets the latest rate recorded on or before it. Days
+    before the history starts use its first recorded rates.
+    """
+    history = DailyExchangeRate.objects.filter(base_currency=base_currency, currency__in=currencies)
+    first_day = history.order_by('date').values('date')[:1]
+    floor_day = history.filter(date__lte=min(days)).order_by('-date').values('date')[:1]
+    rows = list(
+        history.filter(
+            date__gte=Coalesce(Subquery(floor_day), Subquery(first_day)),
+            date__lte=Greatest(Value(max(days), output_field=DateField()), Subquery(first_day)),
+        )
+        .order_by('date')
+        .values_list('date', 'currency', 'rate')
+    )
+
+    current = {}
+    for _, currency, rate in rows:
+        current.setdefault(currency, rate)
+
+    resolved = {}
+    position = 0
+    for day in sorted(days):
+        while position < len(rows) and rows[position][0] <= day:
+            _, currency, rate = rows[position]
+            current[currency] = rate
+            position += 1
+        resolved[day] = {currency: current.get(currency) for currency in currencies}
+    return resolved
+
+
+def get_rates_as_of(pairs, *, base_currency):
+    """
+    Return {(currency, day): rate} with the rate recorded on or before each day,
+    or None for currencies without any history.
+
+    Pairs not in the closed-day cache are resolved together in one query.
+    """
+    found = {}
+    missing = set()
+    for currency, day in pairs:
+        cached = _closed_days.get((base_currency, day))
+        if cached is not None and currency in cached:
+            _closed_days.move_to_end((base_currency, day))
+            found[(currency, day)] = cached[currency]
+        else:
+            missing.add((currency, day))
+
+    if missing:
+        currencies = {currency for currency, _ in missing}
+        days = {day for _, day in missing}
+        resolved = _load_rates_as_of(base_currency, currencies, days)
+        for day, rates in resolved.items():
+            _remember(base_currency, day, rates)
+        for currency, day in missing:
+            found[(currency, day)] = resolved[day].get(currency)
+
+    return found
@@ -0,0 +1,73 @@
+import json
+import requests
+from decouple import config
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class RatesProviderError(Exception):
+    """Raised when a provider cannot return usable rates."""
+
+
+def _validate_rates(rates, base_currency):
+    if not isinstance(rates, dict) or not rates:
+        raise RatesProviderError(f"No rates returned for {base_currency}")
+    try:
+        return {currency: float(rate) for currency, rate in rates.items() if rate is not None}
+    except (TypeError, ValueError):
+        raise RatesProviderError(f"Malformed rates returned for {base_currency}")
+
+
+class RatesProvider:
+    """Source of the latest exchange rates; fetch() returns {currency: rate} against base_currency."""
+
+    def fetch(self, base_currency):
+        raise NotImplementedError
+
+
+class HttpRatesProvider(RatesProvider):
+    """The Imhotep exchange rates API, with strict connect/read timeouts."""
+
+    url = "https://imhotepexchangeratesapi.pythonanywhere.com/latest_rates/{api_key}/{base_currency}"
+
+    def fetch(self, base_currency):
+        url = self.url.format(api_key=config('EXCHANGE_API_KEY_PRIMARY'), base_currency=base_currency)
+        try:
+            response = requests.get(
+                url,
+                timeout=(settings.EXCHANGE_RATES_CONNECT_TIMEOUT, settings.EXCHANGE_RATES_READ_TIMEOUT),
+            )
+            response.raise_for_status()
+            data = response.json()
+        except (requests.RequestException, ValueError) as e:
+            raise RatesProviderError(f"Failed to fetch exchange rates from API: {e}")
+        return _validate_rates(data.get("data") if isinstance(data, dict) else None, base_currency)
+
+
+class FixtureRatesProvider(RatesProvider):
+    """
+    Offline rates for tests and local development.
+
+    Reads {base_currency: {currency: rate}} from the JSON file at
+    EXCHANGE_RATES_FIXTURE, or falls back to the built-in test rates for USD.
+    """
+
+    def fetch(self, base_currency):
+        path = settings.EXCHANGE_RATES_FIXTURE
+        if path:
+            try:
+                with open(path) as fixture:
+                    rates = json.load(fixture).get(base_currency)
+            except (OSError, ValueError, AttributeError) as e:
+                raise RatesProviderError(f"Failed to read exchange rates fixture: {e}")
+            return _validate_rates(rates, base_currency)
+
+        from finance_management.utils.currencies import BASE_CURRENCY, get_default_test_rates
+        if base_currency != BASE_CURRENCY:
+            raise RatesProviderError(f"No fixture rates for {base_currency}")
+        return get_default_test_rates()
+
+
+def get_rates_provider(path=None):
+    """Instantiate the provider named by path or the EXCHANGE_RATES_PROVIDER setting."""
+    return import_string(path or settings.EXCHANGE_RATES_PROVIDER)()
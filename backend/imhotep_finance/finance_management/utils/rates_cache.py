@@ -0,0 +1,43 @@
+import time
+from django.conf import settings
+from django.core.cache import cache
+
+RATES_KEY = "exchange-rates:{base_currency}"
+
+# base_currency -> (payload, expires_at); payload is shared between callers and never mutated
+_local_rates = {}
+
+
+def get_cached_rates(base_currency):
+    """
+    Return the cached payload {'rates', 'version'} for base_currency or None.
+
+    The process-local copy is served until its TTL runs out, then re-read from
+    the Django cache so every worker picks up a refresh within that TTL.
+    """
+    now = time.monotonic()
+    entry = _local_rates.get(base_currency)
+    if entry and entry[1] > now:
+        return entry[0]
+
+    payload = cache.get(RATES_KEY.format(base_currency=base_currency))
+    if payload is None:
+        _local_rates.pop(base_currency, None)
+        return None
+
+    _local_rates[base_currency] = (payload, now + settings.EXCHANGE_RATES_LOCAL_TTL)
+    return payload
+
+
+def store_rates(base_currency, rates, version):
+    """Cache a rates dict for base_currency; version is the stored row's last_updated."""
+    payload = {'rates': dict(rates), 'version': version}
+    cache.set(RATES_KEY.format(base_currency=base_currency), payload, settings.EXCHANGE_RATES_CACHE_TIMEOUT)
+    _local_rates[base_currency] = (payload, time.monotonic() + settings.EXCHANGE_RATES_LOCAL_TTL)
+    return payload
+
+
+def invalidate_rates(base_currency):
+    """Drop cached rates for base_currency, called whenever BaseExchangeRate is saved."""
+    cache.delete(RATES_KEY.format(base_currency=base_currency))
+    _local_rates.pop(base_currency, None)
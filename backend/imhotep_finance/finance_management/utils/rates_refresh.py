@@ -0,0 +1,96 @@
+import threading
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+from finance_management.models import BaseExchangeRate
+from finance_management.utils.rate_providers import RatesProviderError, get_rates_provider
+from finance_management.utils.rate_history import record_daily_rates
+
+# Stored rates older than this are refreshed from the provider
+RATES_MAX_AGE = timedelta(days=1)
+
+# base_currency -> monotonic time of the last background refresh this process started
+_scheduled_refreshes = {}
+
+
+def rates_are_stale(last_updated):
+    return timezone.now() - last_updated >= RATES_MAX_AGE
+
+
+def _claim_refresh(base_currency):
+    """
+    Take the refresh lease on the BaseExchangeRate row with one conditional UPDATE.
+
+    Only the process whose UPDATE matched fetches; the others keep serving the
+    stored rates. A lease older than EXCHANGE_RATES_REFRESH_LEASE seconds is
+    considered abandoned (crashed worker) and can be taken over.
+    """
+    BaseExchangeRate.objects.get_or_create(base_currency=base_currency)
+    now = timezone.now()
+    expired = now - timedelta(seconds=settings.EXCHANGE_RATES_REFRESH_LEASE)
+    claimed = BaseExchangeRate.objects.filter(base_currency=base_currency).filter(
+        Q(refresh_started_at__isnull=True) | Q(refresh_started_at__lt=expired)
+    ).update(refresh_started_at=now)
+    return claimed == 1
+
+
+def refresh_exchange_rates(base_currency, provider=None, force=False):
+    """
+    Fetch the latest rates for base_currency and store them (and today's history
+    row), single-flight across processes.
+
+    Returns (updated, message); updated is False when the rates were fresh or
+    another process holds the refresh lease. Raises RatesProviderError when the
+    fetch fails, leaving the last good rates untouched.
+    """
+    if not force:
+        rate_obj = BaseExchangeRate.objects.filter(base_currency=base_currency).first()
+        if rate_obj and rate_obj.rates and not rates_are_stale(rate_obj.last_updated):
+            return False, f"Rates for {base_currency} are up to date"
+
+    if not _claim_refresh(base_currency):
+        return False, f"A refresh of {base_currency} rates is already running"
+
+    try:
+        rates = (provider or get_rates_provider()).fetch(base_currency)
+    except RatesProviderError:
+        BaseExchangeRate.objects.filter(base_currency=base_currency).update(refresh_started_at=None)
+        raise
+
+    rate_obj = BaseExchangeRate.objects.get(base_currency=base_currency)
+    rate_obj.rates = rates
+    rate_obj.refresh_started_at = None
+    rate_obj.save()
+    record_daily_rates(base_currency, rates)
+    return True, f"Updated {len(rates)} rates for {base_currency}"
+
+
+def _refresh_in_background(base_currency):
+    try:
+        refresh_exchange_rates(base_currency)
+    except Exception as e:
+        print(f"Background exchange rate refresh failed: {e}")
+    finally:
+        connection.close()
+
+
+def schedule_rates_refresh(base_currency):
+    """
+    Start a background refresh of stale rates so the request keeps serving the
+    last good ones (stale-while-revalidate). Each process tries at most once per
+    EXCHANGE_RATES_LOCAL_TTL seconds; the DB lease keeps it to one fetch overall.
+    """
+    if not settings.EXCHANGE_RATES_BACKGROUND_REFRESH:
+        return False
+
+    now = time.monotonic()
+    last = _scheduled_refreshes.get(base_currency)
+    if last is not None and now - last < settings.EXCHANGE_RATES_LOCAL_TTL:
+        return False
+    _scheduled_refreshes[base_currency] = now
+
+    threading.Thread(target=_refresh_in_background, args=(base_currency,), daemon=True).start()
+    return True
@@ -1,87 +1,99 @@
+from django.db import transaction
 from django.db.models import Sum, Q
+from django.utils import timezone
 from transaction_management.models import Transactions, NetWorth
+from transaction_management.utils.networth_snapshots import backfill_networth_snapshots
+from finance_management.utils.user_cache import bump_user_data_version
+
+
+def _clean_place(place):
+    return place.strip().title() if place and str(place).strip() else 'General'
+
 
 def recalculate_networth(user):
-    """Recalculate user's networth from all transactions."""
+    """Recalculate user's networth from all transactions.
+
+    Runs in a handful of queries whatever the history size: one UPDATE per
+    distinct dirty place, one GROUP BY for every balance, and bulk writes for
+    the NetWorth rows. Existing rows are updated in place so their client_uuid
+    (the mobile sync identity) is kept.
+    """
     try:
         if not user:
             return False, "User must be provided"
 
-        # 1. First, cleanly update all transaction places to ensure consistent grouping
-        all_transactions = Transactions.objects.filter(user=user)
-        for trans in all_transactions:
-            raw_place = trans.place
-            actual_place = raw_place.strip().title() if raw_place and str(raw_place).strip() else 'General'
-            if raw_place != actual_place:
-                trans.place = actual_place
-                trans.save(update_fields=['place'])
-
-        # 2. Get all unique currency and place combinations from cleaned user's transactions
-        combinations = list(Transactions.objects.filter(user=user).values_list('currency', 'place').order_by().distinct())
+        with transaction.atomic():
+            # 1. Normalize places with one UPDATE per distinct dirty value
+            user_transactions = Transactions.objects.filter(user=user)
+            raw_places = user_transactions.values_list('place', flat=True).order_by().distinct()
+            for raw_place in list(raw_places):
+                actual_place = _clean_place(raw_place)
+                if raw_place != actual_place:
+                    if raw_place is None:
+                        user_transactions.filter(place__isnull=True).update(place=actual_place)
+                    else:
+                        user_transactions.filter(place=raw_place).update(place=actual_place)
 
-        print(f"Unique combinations: {combinations}")
-        
-        if not combinations:
-            # Clear existing networth records if no transactions exist
-            NetWorth.objects.filter(user=user).delete()
-            return True, {
-                "currencies_processed": 0,
-                "networth_records_created": 0,
-                "currency_totals": {}
-            }
-        
-        # Clear existing networth records for this user
-        NetWorth.objects.filter(user=user).delete()
-        
-        # Calculate totals for each currency & actual_place
-        currency_totals = {}
-        networth_balances = {}
-        created_count = 0
-        
-        for currency, place in combinations:
-            actual_place = place or 'General'
-            
-            # Get all deposits for this combination
-            deposits = Transactions.objects.filter(
-                user=user,
-                currency=currency,
-                place=place,
-                trans_status__in=['Deposit', 'deposit']
-            ).aggregate(total=Sum('amount'))['total'] or 0.0
-            
-            # Get all withdrawals for this combination
-            withdrawals = Transactions.objects.filter(
-                user=user,
-                currency=currency,
-                place=place,
-                trans_status__in=['Withdraw', 'withdraw']
-            ).aggregate(total=Sum('amount'))['total'] or 0.0
-            
-            # Calculate net balance (deposits - withdrawals)
-            net_balance = float(deposits) - float(withdrawals)
-            
-            key = (currency, actual_place)
-            networth_balances[key] = networth_balances.get(key, 0.0) + net_balance
-            currency_totals[currency] = currency_totals.get(currency, 0.0) + net_balance
-            
-        for (currency, actual_place), net_balance in networth_balances.items():
-            # Create networth record for all combinations (even zero balances for tracking)
-            NetWorth.objects.create(
-                user=user,
-                currency=currency,
-                place=actual_place,
-                total=net_balance
+            # 2. Every (currency, place) balance in one conditional-aggregate GROUP BY
+            grouped = (
+                user_transactions.values('currency', 'place')
+                .annotate(
+                    deposits=Sum('amount', filter=Q(trans_status__in=['Deposit', 'deposit'])),
+                    withdrawals=Sum('amount', filter=Q(trans_status__in=['Withdraw', 'withdraw'])),
+                )
+                .order_by()
             )
-            created_count += 1
-            
-            print(f"Currency: {currency}, Place: {actual_place}, Net: {net_balance}")
-        
+            networth_balances = {}
+            currency_totals = {}
+            for row in grouped:
+                net_balance = float(row['deposits'] or 0.0) - float(row['withdrawals'] or 0.0)
+                key = (row['currency'], row['place'])
+                networth_balances[key] = networth_balances.get(key, 0.0) + net_balance
+                currency_totals[row['currency']] = currency_totals.get(row['currency'], 0.0) + net_balance
+
+            # 3. Upsert NetWorth rows, keeping one existing row per key
+            existing = {}
+            to_delete = []
+            for net_worth in NetWorth.objects.select_for_update().filter(user=user).order_by('created_at', 'id'):
+                key = (net_worth.currency, _clean_place(net_worth.place))
+                if key in networth_balances and key not in existing:
+                    existing[key] = net_worth
+                else:
+                    to_delete.append(net_worth.id)
+
+            if to_delete:
+                NetWorth.objects.filter(id__in=to_delete).delete()
+
+            now = timezone.now()
+            to_update = []
+            to_create = []
+            for (currency, place), net_balance in networth_balances.items():
+                net_worth = existing.get((currency, place))
+                if net_worth:
+                    net_worth.place = place
+                    net_worth.total = net_balance
+                    # bulk_update skips auto_now, so bump updated_at for mobile sync ourselves
+                    net_worth.updated_at = now
+                    to_update.append(net_worth)
+                else:
+                    # Create networth record for all combinations (even zero balances for tracking)
+                    to_create.append(NetWorth(user=user, currency=currency, place=place, total=net_balance))
+
+            if to_update:
+                NetWorth.objects.bulk_update(to_update, ['place', 'total', 'updated_at'])
+            if to_create:
+                NetWorth.objects.bulk_create(to_create)
+
+            # The history has to end on the recalculated totals
+            backfill_networth_snapshots(user)
+            bump_user_data_version(user)
+
         return True, {
-            "currencies_processed": len(set(c[0] for c in combinations)),
-            "networth_records_created": created_count,
+            "currencies_processed": len(currency_totals),
+            "networth_records_created": len(networth_balances),
             "currency_totals": currency_totals
         }
-        
+
     except Exception as e:
         print(f"Error in recalculate_networth: {str(e)}")
         return False, "Error occurred while recalculating networth"
@@ -2,7 +2,7 @@ def serialize_transaction(trans):
 
     return {
         "id": trans.id,
-        "user_id": trans.user.id if trans.user else None,
+        "user_id": trans.user_id,
         "date": trans.date.isoformat() if trans.date else None,
         "amount": trans.amount,
         "currency": trans.currency,
@@ -10,6 +10,7 @@ def serialize_transaction(trans):
         "trans_details": trans.trans_details,
         "category": trans.category,
         "place": trans.place,
+        "transfer_id": str(trans.transfer_id) if trans.transfer_id else None,
         "created_at": trans.created_at.isoformat() if trans.created_at else None,
     }
 
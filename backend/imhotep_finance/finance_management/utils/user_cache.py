@@ -0,0 +1,107 @@
+import hashlib
+import json
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+# Read endpoints cached per user; listed so their counters can be reported
+CACHED_RESPONSES = (
+    'networth',
+    'networth_details',
+    'categories',
+    'places',
+    'networth_by_place',
+    'report_history_months',
+    'report_history_years',
+    'score',
+)
+
+VERSION_KEY = "user-data-version:{user_id}"
+RESPONSE_KEY = "user-response:{user_id}:{version}:{name}:{params}"
+STATS_KEY = "user-response-stats:{name}:{outcome}"
+
+
+def _user_id(user):
+    return getattr(user, 'id', user)
+
+
+def _fresh_version():
+    # Time based so a version key lost to eviction never restarts at a value already used
+    return time.time_ns()
+
+
+def get_user_data_version(user):
+    """Return the user's current data version, initialising it if needed."""
+    key = VERSION_KEY.format(user_id=_user_id(user))
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _fresh_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def _increment_version(user_id):
+    key = VERSION_KEY.format(user_id=user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _fresh_version(), timeout=None)
+
+
+def bump_user_data_version(user):
+    """
+    Invalidate every cached response of the user in O(1).
+
+    The version moves immediately and again once the surrounding transaction
+    commits, so a response computed from pre-commit data can't outlive the write.
+    """
+    user_id = _user_id(user)
+    if user_id is None:
+        return
+    _increment_version(user_id)
+    transaction.on_commit(lambda: _increment_version(user_id))
+
+
+def _count(name, outcome):
+    key = STATS_KEY.format(name=name, outcome=outcome)
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        pass
+
+
+def cached_user_response(user, name, compute, params=None):
+    """Return compute() for this user, name and params, cached until the user's data changes."""
+    timeout = settings.USER_RESPONSE_CACHE_TIMEOUT
+    if timeout <= 0:
+        return compute()
+
+    params_key = hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()[:16]
+    key = RESPONSE_KEY.format(
+        user_id=_user_id(user),
+        version=get_user_data_version(user),
+        name=name,
+        params=params_key,
+    )
+
+    value = cache.get(key)
+    if value is not None:
+        _count(name, 'hits')
+        return value
+
+    _count(name, 'misses')
+    value = compute()
+    cache.set(key, value, timeout)
+    return value
+
+
+def get_response_cache_stats():
+    """Hit/miss counters per cached response (shared across processes unless the cache is LocMem)."""
+    stats = {}
+    for name in CACHED_RESPONSES:
+        hits = cache.get(STATS_KEY.format(name=name, outcome='hits'), 0)
+        misses = cache.get(STATS_KEY.format(name=name, outcome='misses'), 0)
+        stats[name] = {'hits': hits, 'misses': misses}
+    return stats
@@ -164,6 +164,50 @@ WSGI_APPLICATION = 'imhotep_finance.wsgi.application'
 
 AUTH_USER_MODEL = 'accounts.User'
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# LocMem is per process; use a shared backend (Redis, Memcached, database or
+# file based) in production so all workers see the same per-user data versions.
+
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='imhotep-finance'),
+    }
+}
+
+# Seconds a cached read response may be served; 0 disables response caching.
+# Per-process backends can't share the per-user data versions between workers,
+# so a write in one worker would leave the others serving stale responses:
+# caching is only on by default with a shared backend.
+_PER_PROCESS_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+USER_RESPONSE_CACHE_TIMEOUT = config(
+    'USER_RESPONSE_CACHE_TIMEOUT',
+    default=0 if CACHES['default']['BACKEND'] in _PER_PROCESS_CACHE_BACKENDS else 300,
+    cast=int,
+)
+
+# Exchange rates: seconds each process reuses its own copy before re-reading the
+# shared cache, and seconds the shared cache keeps them
+EXCHANGE_RATES_LOCAL_TTL = config('EXCHANGE_RATES_LOCAL_TTL', default=60, cast=int)
+EXCHANGE_RATES_CACHE_TIMEOUT = config('EXCHANGE_RATES_CACHE_TIMEOUT', default=86400, cast=int)
+
+# Exchange rate refresh: dotted path of the rates provider, its HTTP timeouts in
+# seconds, how long a refresh lease is held before another process may take it
+# over, and whether a request seeing stale rates starts a background refresh
+EXCHANGE_RATES_PROVIDER = config('EXCHANGE_RATES_PROVIDER', default='finance_management.utils.rate_providers.HttpRatesProvider')
+EXCHANGE_RATES_FIXTURE = config('EXCHANGE_RATES_FIXTURE', default='')
+EXCHANGE_RATES_CONNECT_TIMEOUT = config('EXCHANGE_RATES_CONNECT_TIMEOUT', default=3.05, cast=float)
+EXCHANGE_RATES_READ_TIMEOUT = config('EXCHANGE_RATES_READ_TIMEOUT', default=10, cast=float)
+EXCHANGE_RATES_REFRESH_LEASE = config('EXCHANGE_RATES_REFRESH_LEASE', default=120, cast=int)
+EXCHANGE_RATES_BACKGROUND_REFRESH = config('EXCHANGE_RATES_BACKGROUND_REFRESH', default=True, cast=bool)
+
+# Closed days of historical rates each process keeps in memory
+EXCHANGE_RATES_HISTORY_CACHE_DAYS = config('EXCHANGE_RATES_HISTORY_CACHE_DAYS', default=400, cast=int)
+
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
@@ -371,6 +415,19 @@ SPECTACULAR_SETTINGS = {
 
 FIELD_ENCRYPTION_KEY = config('FIELD_ENCRYPTION_KEY')
 
+# Secret for the category blind index (derived from FIELD_ENCRYPTION_KEY when unset).
+# Changing it requires re-running `manage.py backfill_category_index --all`.
+BLIND_INDEX_KEY = config('BLIND_INDEX_KEY', default='')
+
+# CSV transaction import limits (the file is streamed, so these bound work rather than memory)
+TRANSACTION_IMPORT_MAX_FILE_SIZE = config('TRANSACTION_IMPORT_MAX_FILE_SIZE', default=5 * 1024 * 1024, cast=int)
+TRANSACTION_IMPORT_MAX_ROWS = config('TRANSACTION_IMPORT_MAX_ROWS', default=50000, cast=int)
+TRANSACTION_IMPORT_BATCH_SIZE = config('TRANSACTION_IMPORT_BATCH_SIZE', default=500, cast=int)
+TRANSACTION_IMPORT_MAX_ERRORS = config('TRANSACTION_IMPORT_MAX_ERRORS', default=50, cast=int)
+
+# Largest array accepted by the JSON batch create endpoint
+TRANSACTION_BATCH_MAX_ITEMS = config('TRANSACTION_BATCH_MAX_ITEMS', default=500, cast=int)
+
 UNFOLD = {
     "COMMAND_PALETTE": {
         "items": [], 
@@ -8,6 +8,15 @@ DATABASES = {
     }
 }
 
+# Tests reuse user ids against the same process-wide LocMem cache, so response
+# caching is off unless a test enables it explicitly
+USER_RESPONSE_CACHE_TIMEOUT = 0
+
+# Exchange rates come from the built-in test rates, never the network
+EXCHANGE_RATES_PROVIDER = 'finance_management.utils.rate_providers.FixtureRatesProvider'
+EXCHANGE_RATES_FIXTURE = ''
+EXCHANGE_RATES_BACKGROUND_REFRESH = False
+
 # Silence only noisy HTTP request error logs during tests
 LOGGING = {
     "version": 1,
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.14 on 2026-10-18 17:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduled_trans_management', '0006_scheduledtransaction_place'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scheduledtransaction',
+            name='category_index',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='scheduledtransaction',
+            index=models.Index(fields=['user', 'category_index', 'date'], name='sched_user_cat_date_idx'),
+        ),
+    ]
@@ -2,6 +2,7 @@ from django.db import models
 from accounts.models import User
 from django.utils import timezone
 from encrypted_model_fields.fields import EncryptedCharField
+from finance_management.utils.blind_index import category_blind_index
 
 def current_year():
     return timezone.now().year
@@ -29,11 +30,20 @@ class ScheduledTransaction(models.Model):
     scheduled_trans_status = models.CharField(max_length=8, choices=TRANSACTIONS_STATUS)
     scheduled_trans_details = EncryptedCharField(max_length=255, blank=True, null=True)
     category = EncryptedCharField(max_length=100, blank=True, null=True)
+    # Keyed hash of the normalized category so it can be filtered/grouped in SQL
+    category_index = models.CharField(max_length=64, blank=True, null=True, editable=False)
     last_time_added = models.DateTimeField(blank=True, null=True)
     place = models.CharField(max_length=255, default='General', blank=True, null=True)
     status =  models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    def save(self, *args, **kwargs):
+        self.category_index = category_blind_index(self.category)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'category' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'category_index'}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"ScheduledTransaction of {self.user.username} ({self.date}) with amount {self.amount} and status {self.scheduled_trans_status}"
     
@@ -42,3 +52,6 @@ class ScheduledTransaction(models.Model):
         verbose_name = "ScheduledTransaction"
         verbose_name_plural = "ScheduledTransactions"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'category_index', 'date'], name='sched_user_cat_date_idx'),
+        ]
@@ -1,6 +1,8 @@
 from django.core.exceptions import ValidationError
 from scheduled_trans_management.models import ScheduledTransaction
+from user_reports.utils.report_buffer import coalesce_report_updates
 from finance_management.utils.currencies import get_allowed_currencies
+from finance_management.utils.user_cache import bump_user_data_version
 from django.db import transaction
 from django.utils import timezone
 import calendar
@@ -43,6 +45,7 @@ def create_scheduled_transaction(*, user, day_of_month, amount, currency, schedu
             status=True  # Active by default
         )
     
+    bump_user_data_version(user)
     return scheduled_trans
 
 
@@ -58,6 +61,7 @@ def delete_scheduled_transaction(*, user, scheduled_trans_id):
     with transaction.atomic():
         scheduled_trans.delete()
     
+    bump_user_data_version(user)
     return True
 
 
@@ -97,6 +101,7 @@ def update_scheduled_transaction(*, user, scheduled_trans_id, day_of_month, amou
         scheduled_trans.place = place
         scheduled_trans.save()
     
+    bump_user_data_version(user)
     return scheduled_trans
 
 
@@ -113,6 +118,7 @@ def toggle_scheduled_transaction_status(*, user, scheduled_trans_id):
         scheduled_trans.status = not scheduled_trans.status
         scheduled_trans.save()
     
+    bump_user_data_version(user)
     return scheduled_trans
 
 
@@ -134,7 +140,7 @@ def apply_scheduled_transactions(*, user):
     scheduled = ScheduledTransaction.objects.filter(user=user, status=True)
     
     try:
-        with transaction.atomic():
+        with transaction.atomic(), coalesce_report_updates():
             for sched in scheduled:
                 if sched.amount is None or sched.amount <= 0:
                     errors_list.append("Invalid amount")
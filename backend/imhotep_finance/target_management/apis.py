@@ -17,6 +17,8 @@ from target_management.serializers import (
 )
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from finance_management.utils.serializer import serialize_target
+from finance_management.utils.user_cache import cached_user_response
+from datetime import datetime
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 
@@ -119,18 +121,27 @@ class GetScoreApi(APIView):
                     status=status.HTTP_404_NOT_FOUND
                 )
 
-            target_obj, score_txt, score = calculate_score(
-                user=request.user,
-                target_obj=target
+            def compute_score():
+                target_obj, score_txt, score = calculate_score(
+                    user=request.user,
+                    target_obj=target
+                )
+                return {
+                    "score": score,
+                    "target": target_obj.target,
+                    "month": target_obj.month,
+                    "year": target_obj.year,
+                    "score_txt": score_txt
+                }
+
+            # The score is for the current month, so the month is part of the key
+            now = datetime.now()
+            response_data = cached_user_response(
+                request.user, 'score', compute_score,
+                params={'target_id': target.id, 'month': now.month, 'year': now.year}
             )
 
-            return Response({
-                "score": score,
-                "target": target_obj.target,
-                "month": target_obj.month,
-                "year": target_obj.year,
-                "score_txt": score_txt
-            }, status=status.HTTP_200_OK)
+            return Response(response_data, status=status.HTTP_200_OK)
         except ValidationError as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
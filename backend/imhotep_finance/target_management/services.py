@@ -3,7 +3,10 @@ from target_management.models import Target
 from transaction_management.models import Transactions
 from datetime import datetime
 from django.db import transaction as db_transaction
-from finance_management.utils.currencies import convert_to_fav_currency
+from finance_management.utils.currencies import convert_amounts_to_fav_currency
+from finance_management.utils.user_cache import bump_user_data_version
+from finance_management.utils.blind_index import excluded_category_indexes
+from django.db.models import Sum
 
 
 def create_target_for_user(*, user, target_value):
@@ -31,11 +34,12 @@ def create_target_for_user(*, user, target_value):
         target_obj.target = target_value
         target_obj.save()
 
+    bump_user_data_version(user)
     return target_obj
 
 
-def calculate_score(*, user, target_obj):
-    """Calculate score for the user based on transactions and target."""
+def calculate_score(*, user, target_obj, rates=None):
+    """Calculate score for the user based on transactions and target, converting with rates when given."""
     now = datetime.now()
 
     target_db = target_obj.target
@@ -69,43 +73,56 @@ def calculate_score(*, user, target_obj):
     to_date = first_day_next_month.date()
 
     # Transactions for deposits and withdrawals this month
-    score_deposit_raw = Transactions.objects.filter(
+    month_transactions = Transactions.objects.filter(
         user=user,
         date__gte=from_date,
         date__lt=to_date,
-        trans_status__in=['Deposit', 'deposit']
-    ).values_list("amount", "currency", "category")
-    score_deposit = [
-        (amount, currency)
-        for amount, currency, category in score_deposit_raw
-        if not (category and str(category).strip().title() in ['Transfer', 'Conversion'])
-    ]
+        trans_status__in=['Deposit', 'deposit', 'withdraw', 'Withdraw']
+    )
+    currency_totals = {'deposit': {}, 'withdraw': {}}
+
+    # Transfers/Conversions are excluded through the category blind index,
+    # so indexed rows are summed per currency in SQL without decryption
+    indexed_totals = (
+        month_transactions.filter(category_index__isnull=False)
+        .exclude(category_index__in=excluded_category_indexes())
+        .values_list("trans_status", "currency")
+        .annotate(total=Sum("amount"))
+        .order_by()
+    )
+    for trans_status, currency, total in indexed_totals:
+        totals = currency_totals[trans_status.lower()]
+        totals[currency] = totals.get(currency, 0) + float(total or 0)
 
-    score_withdraw_raw = Transactions.objects.filter(
-        user=user,
-        date__gte=from_date,
-        date__lt=to_date,
-        trans_status__in=['withdraw', 'Withdraw']
-    ).values_list("amount", "currency", "category")
-    score_withdraw = [
-        (amount, currency)
-        for amount, currency, category in score_withdraw_raw
-        if not (category and str(category).strip().title() in ['Transfer', 'Conversion'])
+    # Rows written before the index backfill still need their category decrypted
+    legacy_rows = month_transactions.filter(category_index__isnull=True).values_list(
+        "trans_status", "amount", "currency", "category"
+    )
+    for trans_status, amount, currency, category in legacy_rows:
+        if category and str(category).strip().title() in ['Transfer', 'Conversion']:
+            continue
+        totals = currency_totals[trans_status.lower()]
+        totals[currency] = totals.get(currency, 0) + float(amount)
+
+    # Convert both sides in one batch
+    buckets = [
+        (trans_status, currency, total)
+        for trans_status, totals in currency_totals.items()
+        for currency, total in totals.items()
     ]
-
-    # Aggregate deposits
-    currency_totals_deposit = {}
-    for amount, currency in score_deposit:
-        amount = float(amount)
-        currency_totals_deposit[currency] = currency_totals_deposit.get(currency, 0) + amount
-    total_favorite_currency_deposit, _ = convert_to_fav_currency(user, currency_totals_deposit)
-
-    # Aggregate withdrawals
-    currency_totals_withdraw = {}
-    for amount, currency in score_withdraw:
-        amount = float(amount)
-        currency_totals_withdraw[currency] = currency_totals_withdraw.get(currency, 0) + amount
-    total_favorite_currency_withdraw, _ = convert_to_fav_currency(user, currency_totals_withdraw)
+    converted, _ = convert_amounts_to_fav_currency(
+        user,
+        [total for _, _, total in buckets],
+        [currency for _, currency, _ in buckets],
+        rates=rates,
+    )
+    total_favorite_currency_deposit = 0.0
+    total_favorite_currency_withdraw = 0.0
+    for (trans_status, _, _), converted_amount in zip(buckets, converted):
+        if trans_status == 'deposit':
+            total_favorite_currency_deposit += converted_amount or 0.0
+        else:
+            total_favorite_currency_withdraw += converted_amount or 0.0
 
     # Calculate score (deposits - target - withdrawals)
     score = (total_favorite_currency_deposit - target_obj.target) - total_favorite_currency_withdraw
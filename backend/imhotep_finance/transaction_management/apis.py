@@ -4,7 +4,10 @@ from transaction_management.services import (
     delete_transaction, 
     update_transaction, 
     bulk_import_transactions,
-    parse_csv_transactions,
+    create_transactions_batch,
+    iter_csv_transaction_batches,
+    ImportErrorLog,
+    BATCH_ROLLED_BACK_MESSAGE,
 )
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -19,13 +22,24 @@ from .serializers import (
     TransactionFilterSerializer,
     TransactionListResponseSerializer,
     TransactionImportResponseSerializer,
-    CSVFileUploadSerializer
+    CSVFileUploadSerializer,
+    TransactionBatchCreateSerializer,
+    TransactionBatchCreateResponseSerializer
+)
+from transaction_management.selectors import (
+    get_transactions_for_user,
+    get_transactions_page_by_cursor,
+    count_transactions_for_user,
+    iter_transactions_for_export,
+    resolve_date_range,
+    EXPORT_CSV_COLUMNS,
 )
-from transaction_management.selectors import get_transactions_for_user
 from finance_management.utils.serializer import serialize_transaction
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
-from django.http import HttpResponse, Http404
+from django.http import StreamingHttpResponse, Http404
 import csv
+from datetime import date
+from transaction_management.models import Transactions
 from finance_management.utils.get_networth import get_networth
 from rest_framework.parsers import MultiPartParser, FormParser
 from finance_management.utils.recalculate_networth import recalculate_networth
@@ -75,6 +89,80 @@ class TransactionCreateApi(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+class TransactionBatchCreateApi(APIView):
+    permission_classes = [IsAuthenticated]
+    
+    @extend_schema(
+        tags=['Transactions'],
+        request=TransactionBatchCreateSerializer,
+        responses={
+            201: TransactionBatchCreateResponseSerializer,
+            400: 'Validation error, or no transaction was created',
+            500: 'Internal server error'
+        },
+        operation_id='create_transactions_batch'
+    )
+    def post(self, request):
+        """Create an array of transactions in one request, all or nothing or best effort."""
+        serializer = TransactionBatchCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        mode = serializer.validated_data['mode']
+        items = serializer.validated_data['transactions']
+
+        try:
+            # Validate each item like a single create; invalid items get their errors back
+            results = [None] * len(items)
+            valid = []
+            for index, item in enumerate(items):
+                item_serializer = TransactionInputSerializer(data=item)
+                if not item_serializer.is_valid():
+                    results[index] = {"index": index, "success": False, "error": item_serializer.errors}
+                    continue
+                data = item_serializer.validated_data
+                valid.append((index, {
+                    'date': data.get('date') or date.today(),
+                    'amount': data['amount'],
+                    'currency': data['currency'],
+                    'trans_status': data['trans_status'],
+                    'category': data.get('category') or '',
+                    'trans_details': data.get('trans_details') or '',
+                    'place': data.get('place'),
+                }))
+
+            all_or_nothing = mode == 'all_or_nothing'
+            if all_or_nothing and len(valid) < len(items):
+                batch_results = [BATCH_ROLLED_BACK_MESSAGE] * len(valid)
+            else:
+                batch_results = create_transactions_batch(
+                    user=request.user,
+                    transactions_data=[row for _, row in valid],
+                    all_or_nothing=all_or_nothing,
+                ) if valid else []
+
+            for (index, _), result in zip(valid, batch_results):
+                if isinstance(result, Transactions):
+                    results[index] = {"index": index, "success": True, "id": result.id}
+                else:
+                    results[index] = {"index": index, "success": False, "error": result}
+
+            created_count = sum(1 for result in results if result["success"])
+            response_data = {
+                "mode": mode,
+                "created_count": created_count,
+                "error_count": len(results) - created_count,
+                "results": results,
+            }
+            response_status = status.HTTP_201_CREATED if created_count else status.HTTP_400_BAD_REQUEST
+            return Response(response_data, status=response_status)
+        except ValidationError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            print(f"Error creating transactions batch: {str(e)}")
+            return Response(
+                {'error': 'An error occurred while creating the transactions'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
 class TransactionDeleteApi(APIView):
     permission_classes = [IsAuthenticated]
     
@@ -200,6 +288,10 @@ class TransactionListApi(APIView):
             filter_serializer.is_valid(raise_exception=True)
             filters = filter_serializer.validated_data
             
+            # Cursor mode: keyset pagination without COUNT/OFFSET
+            if 'cursor' in filters:
+                return self._get_cursor_page(request, filters)
+            
             # Get filtered transactions
             transactions_qs, start_date, end_date = get_transactions_for_user(
                 user=request.user,
@@ -248,6 +340,63 @@ class TransactionListApi(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    def _get_cursor_page(self, request, filters):
+        """Return one keyset page; the total is only counted when explicitly requested."""
+        start_date, end_date = resolve_date_range(filters.get('start_date'), filters.get('end_date'))
+        filter_kwargs = {
+            'user': request.user,
+            'start_date': start_date,
+            'end_date': end_date,
+            'category': filters.get('category'),
+            'place': filters.get('place'),
+            'trans_status': filters.get('trans_status'),
+            'details_search': filters.get('details_search'),
+        }
+
+        transactions, next_cursor = get_transactions_page_by_cursor(
+            cursor=filters.get('cursor'),
+            page_size=20,
+            **filter_kwargs
+        )
+
+        pagination = {
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None,
+            "per_page": 20,
+        }
+        if filters.get('include_total'):
+            pagination["total"] = count_transactions_for_user(**filter_kwargs)
+
+        response_data = {
+            "transactions": [serialize_transaction(t) for t in transactions],
+            "pagination": pagination,
+            "date_range": {
+                "start_date": start_date.isoformat(),
+                "end_date": end_date.isoformat(),
+            }
+        }
+        return Response(response_data, status=status.HTTP_200_OK)
+
+class _EchoBuffer:
+    """File-like object whose write() hands the line back, for streaming csv.writer output."""
+
+    def write(self, value):
+        return value
+
+# Last line of an export that failed after streaming started, so a truncated file can't pass for a complete one
+EXPORT_CSV_ERROR_MARKER = '# export incomplete: an error occurred while exporting transactions'
+
+def _export_csv_lines(rows):
+    """CSV lines of an export; once the 200 headers are sent a failure can only be reported in the body."""
+    writer = csv.writer(_EchoBuffer())
+    yield writer.writerow(EXPORT_CSV_COLUMNS)
+    try:
+        for row in rows:
+            yield writer.writerow(row)
+    except Exception as e:
+        print(f"Error exporting transactions: {str(e)}")
+        yield writer.writerow([EXPORT_CSV_ERROR_MARKER])
+
 class TransactionExportCSVApi(APIView):
     permission_classes = [IsAuthenticated]
     
@@ -265,36 +414,23 @@ class TransactionExportCSVApi(APIView):
             filter_serializer.is_valid(raise_exception=True)
             filters = filter_serializer.validated_data
             
-            # Get filtered transactions
-            transactions_qs, start_date, end_date = get_transactions_for_user(
+            start_date, end_date = resolve_date_range(filters.get('start_date'), filters.get('end_date'))
+            
+            rows = iter_transactions_for_export(
                 user=request.user,
-                start_date=filters.get('start_date'),
-                end_date=filters.get('end_date'),
+                start_date=start_date,
+                end_date=end_date,
                 category=filters.get('category'),
                 place=filters.get('place'),
                 trans_status=filters.get('trans_status'),
                 details_search=filters.get('details_search')
             )
             
-            # Create CSV response
-            response = HttpResponse(content_type='text/csv')
+            # Stream the CSV so the body is never held in memory
+            response = StreamingHttpResponse(_export_csv_lines(rows), content_type='text/csv')
             response['Content-Disposition'] = f'attachment; filename="transactions_{start_date}_to_{end_date}.csv"'
             response['Access-Control-Expose-Headers'] = 'Content-Disposition'
             
-            # Write CSV data
-            writer = csv.writer(response)
-            writer.writerow(['date', 'amount', 'currency', 'trans_status', 'category', 'trans_details'])
-            
-            for transaction in transactions_qs:
-                writer.writerow([
-                    transaction.date,
-                    transaction.amount,
-                    transaction.currency,
-                    transaction.trans_status,
-                    transaction.category,
-                    transaction.trans_details
-                ])
-            
             return response
             
         except ValidationError as e:
@@ -332,17 +468,16 @@ class TransactionImportCSVApi(APIView):
         file = serializer.validated_data['file']
         
         try:
-            # Parse CSV and validate rows
-            transactions_data, validation_errors = parse_csv_transactions(file)
-            
-            # Bulk import transactions using service
-            created_count, import_errors = bulk_import_transactions(
-                user=request.user,
-                transactions_data=transactions_data
-            )
-            
-            # Combine all errors
-            all_errors = validation_errors + import_errors
+            # Stream the CSV and import it batch by batch so memory stays bounded
+            errors = ImportErrorLog()
+            created_count = 0
+            for batch in iter_csv_transaction_batches(file, errors=errors):
+                batch_created, batch_errors = bulk_import_transactions(
+                    user=request.user,
+                    transactions_data=batch
+                )
+                created_count += batch_created
+                errors.extend(batch_errors)
             
             # Prepare response
             response_data = {
@@ -351,10 +486,10 @@ class TransactionImportCSVApi(APIView):
                 'imported_count': created_count,
             }
             
-            if all_errors:
-                response_data['errors'] = all_errors[:50]  # Limit to first 50 errors
-                if len(all_errors) > 50:
-                    response_data['errors'].append(f"... and {len(all_errors) - 50} more errors.")
+            if errors:
+                # Only the first messages are kept, followed by a count of the rest
+                response_data['errors'] = errors.as_list()
+                response_data['error_count'] = errors.count
                 
                 if created_count == 0:
                     response_data['message'] = "No transactions were imported due to errors."
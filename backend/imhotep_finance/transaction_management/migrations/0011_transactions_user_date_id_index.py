@@ -0,0 +1,19 @@
+# Generated by Django 5.2.14 on 2026-10-18 17:53
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transaction_management', '0010_add_sync_fields'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transactions',
+            index=models.Index(fields=['user', 'date', 'id'], name='trans_user_date_id_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.14 on 2026-10-18 18:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transaction_management', '0012_transactions_category_index_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transactions',
+            name='details_indexed',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.CreateModel(
+            name='TransactionSearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=16)),
+                ('transaction', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to='transaction_management.transactions')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transaction_search_tokens', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Transaction search token',
+                'verbose_name_plural': 'Transaction search tokens',
+                'indexes': [models.Index(fields=['user', 'token'], name='trans_search_user_token_idx')],
+                'constraints': [models.UniqueConstraint(fields=('transaction', 'token'), name='unique_transaction_search_token')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.14 on 2026-10-18 18:58
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transaction_management', '0013_transaction_search_tokens'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyAggregate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('currency', models.CharField(max_length=4)),
+                ('trans_status', models.CharField(max_length=8)),
+                ('total', models.FloatField(default=0.0)),
+                ('count', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_aggregates', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Daily aggregate',
+                'verbose_name_plural': 'Daily aggregates',
+                'indexes': [models.Index(fields=['user', 'date'], name='daily_agg_user_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'date', 'currency', 'trans_status'), name='unique_daily_aggregate')],
+            },
+        ),
+    ]
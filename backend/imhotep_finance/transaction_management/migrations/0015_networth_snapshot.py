@@ -0,0 +1,33 @@
+# Generated by Django 5.2.14 on 2026-10-18 19:03
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transaction_management', '0014_daily_aggregate'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NetWorthSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('currency', models.CharField(max_length=4)),
+                ('place', models.CharField(default='General', max_length=255)),
+                ('balance', models.FloatField(default=0.0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='networth_snapshots', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Net worth snapshot',
+                'verbose_name_plural': 'Net worth snapshots',
+                'indexes': [models.Index(fields=['user', 'date'], name='networth_snap_user_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'currency', 'place', 'date'), name='unique_networth_snapshot')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.14 on 2026-10-18 19:09
+
+import django.db.models.deletion
+import encrypted_model_fields.fields
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transaction_management', '0015_networth_snapshot'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trans_status', models.CharField(max_length=8)),
+                ('category_index', models.CharField(max_length=64)),
+                ('category', encrypted_model_fields.fields.EncryptedCharField()),
+                ('count', models.IntegerField(default=0)),
+                ('last_used', models.DateField()),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='category_usages', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Category usage',
+                'verbose_name_plural': 'Category usages',
+                'indexes': [models.Index(fields=['user', 'trans_status', '-count'], name='category_usage_user_count_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'trans_status', 'category_index'), name='unique_category_usage')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.14 on 2026-10-18 19:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transaction_management', '0016_category_usage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transactions',
+            name='transfer_id',
+            field=models.UUIDField(blank=True, db_index=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,20 @@
+from django.db import migrations
+
+
+def drop_global_search_tokens(apps, schema_editor):
+    """Search tokens are now keyed per user; drop the old ones so searches scan until rebuild_search_index runs."""
+    Transactions = apps.get_model('transaction_management', 'Transactions')
+    TransactionSearchToken = apps.get_model('transaction_management', 'TransactionSearchToken')
+    TransactionSearchToken.objects.all().delete()
+    Transactions.objects.filter(details_indexed=True).update(details_indexed=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transaction_management', '0017_transaction_transfer_id'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_global_search_tokens, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.14 on 2026-10-18 20:03
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_user_otp_code_user_otp_created_at'),
+        ('transaction_management', '0018_rekey_search_tokens'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryUsageBuild',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='category_usage_build', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('built_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Category usage build',
+                'verbose_name_plural': 'Category usage builds',
+            },
+        ),
+    ]
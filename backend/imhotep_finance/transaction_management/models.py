@@ -2,6 +2,7 @@ from django.db import models
 from accounts.models import User
 from django.utils import timezone
 from encrypted_model_fields.fields import EncryptedCharField
+from finance_management.utils.blind_index import category_blind_index
 import uuid
 
 # Create your models here.
@@ -19,13 +20,46 @@ class Transactions(models.Model):
     trans_status = models.CharField(max_length=8, choices=TRANSACTIONS_STATUS)
     trans_details = EncryptedCharField(max_length=255, blank=True, null=True)
     category = EncryptedCharField(max_length=100, blank=True, null=True)
+    # Keyed hash of the normalized category so it can be filtered/grouped in SQL
+    category_index = models.CharField(max_length=64, blank=True, null=True, editable=False)
     place = models.CharField(max_length=255, default="General", blank=True, null=True)
+    # False until the trans_details search tokens have been written
+    details_indexed = models.BooleanField(default=False, editable=False)
+    # Shared by the two legs of a transfer or conversion so they can be deleted together
+    transfer_id = models.UUIDField(blank=True, null=True, editable=False, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
     # --- Offline Sync Fields ---
     client_uuid = models.UUIDField(unique=True, default=uuid.uuid4, editable=False, db_index=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_deleted = models.BooleanField(default=False, db_index=True)
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored details so save() can tell when the search tokens go stale
+        if 'trans_details' in field_names:
+            instance._saved_trans_details = instance.trans_details
+        return instance
+
+    def save(self, *args, **kwargs):
+        self.category_index = category_blind_index(self.category)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'category' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'category_index'}
+
+        # Writes outside the services (admin, scripts) don't re-index, so fall back to scanning
+        details_changed = (
+            hasattr(self, '_saved_trans_details')
+            and (update_fields is None or 'trans_details' in update_fields)
+            and self.trans_details != self._saved_trans_details
+        )
+        if details_changed:
+            self.details_indexed = False
+            if update_fields is not None:
+                kwargs['update_fields'] = set(kwargs['update_fields']) | {'details_indexed'}
+        super().save(*args, **kwargs)
+        self._saved_trans_details = self.trans_details
+
     def __str__(self):
         return f"Transaction of {self.user.username} ({self.date.strftime('%Y-%m-%d')}) with amount {self.amount} and Status of {self.trans_status}"
     
@@ -34,6 +68,90 @@ class Transactions(models.Model):
         verbose_name = "Transaction"
         verbose_name_plural = "Transactions"
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination walks (date, id) per user
+            models.Index(fields=['user', 'date', 'id'], name='trans_user_date_id_idx'),
+            models.Index(fields=['user', 'category_index', 'date'], name='trans_user_cat_date_idx'),
+        ]
+
+class TransactionSearchToken(models.Model):
+    """Keyed hash of one trigram of a transaction's trans_details, used to find search candidates."""
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='transaction_search_tokens')
+    transaction = models.ForeignKey(Transactions, on_delete=models.CASCADE, related_name='search_tokens')
+    token = models.CharField(max_length=16)
+
+    def __str__(self):
+        return f"Search token of transaction {self.transaction_id}"
+
+    class Meta:
+        verbose_name = "Transaction search token"
+        verbose_name_plural = "Transaction search tokens"
+        indexes = [
+            models.Index(fields=['user', 'token'], name='trans_search_user_token_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['transaction', 'token'], name='unique_transaction_search_token'),
+        ]
+
+class DailyAggregate(models.Model):
+    """Sum and count of a user's report transactions per (date, currency, status), for charts and time series."""
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_aggregates')
+    date = models.DateField()
+    currency = models.CharField(max_length=4)
+    trans_status = models.CharField(max_length=8)
+    total = models.FloatField(default=0.0)
+    count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user.username} {self.date} {self.trans_status} {self.total} {self.currency} ({self.count})"
+
+    class Meta:
+        verbose_name = "Daily aggregate"
+        verbose_name_plural = "Daily aggregates"
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'date', 'currency', 'trans_status'], name='unique_daily_aggregate'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'date'], name='daily_agg_user_date_idx'),
+        ]
+
+class CategoryUsage(models.Model):
+    """How often and how recently a user picked a category per status, for the category suggestions."""
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='category_usages')
+    trans_status = models.CharField(max_length=8)
+    category_index = models.CharField(max_length=64)
+    category = EncryptedCharField(max_length=100)
+    count = models.IntegerField(default=0)
+    last_used = models.DateField()
+
+    def __str__(self):
+        return f"{self.user.username} {self.trans_status} {self.category} ({self.count})"
+
+    class Meta:
+        verbose_name = "Category usage"
+        verbose_name_plural = "Category usages"
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'trans_status', 'category_index'], name='unique_category_usage'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'trans_status', '-count'], name='category_usage_user_count_idx'),
+        ]
+
+class CategoryUsageBuild(models.Model):
+    """Marks a user whose category usage counters were built from all of their transactions."""
+
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='category_usage_build')
+    built_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Category usage of {self.user.username} built at {self.built_at}"
+
+    class Meta:
+        verbose_name = "Category usage build"
+        verbose_name_plural = "Category usage builds"
 
 class NetWorth(models.Model):
 
@@ -63,3 +181,26 @@ class NetWorth(models.Model):
                 name='unique_user_currency_place'
             )
         ]
+
+
+class NetWorthSnapshot(models.Model):
+    """End-of-day balance of one (currency, place) on each day it changed; later days keep the last balance."""
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='networth_snapshots')
+    date = models.DateField()
+    currency = models.CharField(max_length=4)
+    place = models.CharField(max_length=255, default="General")
+    balance = models.FloatField(default=0.0)
+
+    def __str__(self):
+        return f"{self.user.username} {self.date} {self.place}: {self.balance} {self.currency}"
+
+    class Meta:
+        verbose_name = "Net worth snapshot"
+        verbose_name_plural = "Net worth snapshots"
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'currency', 'place', 'date'], name='unique_networth_snapshot'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'date'], name='networth_snap_user_date_idx'),
+        ]
@@ -1,77 +1,297 @@
-from transaction_management.models import Transactions
+from transaction_management.models import Transactions, TransactionSearchToken
+from transaction_management.utils.search_index import search_tokens_for_query
+from finance_management.utils.blind_index import category_blind_index
+from finance_management.utils.user_cache import get_user_data_version
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models import Q, Count
 from datetime import date, timedelta
+import base64
+import hashlib
 
+# How long an optional total count is reused by cursor pagination
+TRANSACTION_COUNT_CACHE_TIMEOUT = 60
 
-def get_transactions_for_user(
+# Columns written by the CSV export, in order (matches the import format)
+EXPORT_CSV_COLUMNS = ['date', 'amount', 'currency', 'trans_status', 'category', 'trans_details', 'place']
+
+
+def resolve_date_range(start_date=None, end_date=None):
+    """Default a missing date range to the last 30 days."""
+    today = date.today()
+    if not start_date:
+        start_date = today - timedelta(days=30)
+    if not end_date:
+        end_date = today
+    return start_date, end_date
+
+
+def get_transactions_queryset_for_user(
     *,
     user,
-    start_date= None,
-    end_date = None,
-    category = None,
+    start_date,
+    end_date,
     place = None,
     trans_status = None,
+    category = None,
     details_search = None
 ):
-    """Get filtered transactions for a user.
-    
-    Note: Since category and trans_details are encrypted fields, they cannot be
-    filtered directly in the database. We filter them in memory after decryption.
+    """Get a user's transactions filtered only on the non-encrypted columns.
+
+    A category narrows the rows through its blind index and a details search
+    through the trigram search tokens; the exact match is still checked after
+    decryption by matches_encrypted_filters.
     """
-    
-    # Set default date range to last 30 days if not provided
-    today = date.today()
-    if not start_date:
-        start_date = today - timedelta(days=30)
-    if not end_date:
-        end_date = today
-    
+
     # Base query - filter by non-encrypted fields first
     queryset = Transactions.objects.filter(
         user=user,
         date__gte=start_date,
         date__lte=end_date
     ).order_by('-date')
-    
+
     # Apply trans_status filter (non-encrypted field)
     if trans_status and trans_status in ["Deposit", "Withdraw", "deposit", "withdraw"]:
         queryset = queryset.filter(trans_status=trans_status)
-        
+
     # Apply place filter (non-encrypted field)
     if place and place.strip():
         queryset = queryset.filter(place=place.strip().title())
-    
+
+    # Rows not backfilled yet have no index and stay candidates
+    if category:
+        queryset = queryset.filter(
+            Q(category_index=category_blind_index(category)) | Q(category_index__isnull=True)
+        )
+
+    # Candidates must carry every trigram of the search term
+    tokens = search_tokens_for_query(details_search, user.pk) if details_search else None
+    if tokens:
+        candidate_ids = (
+            TransactionSearchToken.objects.filter(user=user, token__in=tokens)
+            .values('transaction_id')
+            .annotate(matched=Count('id'))
+            .filter(matched=len(tokens))
+            .values('transaction_id')
+        )
+        queryset = queryset.filter(Q(id__in=candidate_ids) | Q(details_indexed=False))
+
+    return queryset
+
+
+def matches_encrypted_filters(*, category_value, details_value, category=None, details_search=None):
+    """Check already decrypted category/details values against the encrypted-field filters."""
+    # Apply category filter
+    if category and (category_value or "") != category:
+        return False
+
+    # Apply details_search filter
+    if details_search and details_search.lower() not in (details_value or "").lower():
+        return False
+
+    return True
+
+
+def get_transactions_for_user(
+    *,
+    user,
+    start_date= None,
+    end_date = None,
+    category = None,
+    place = None,
+    trans_status = None,
+    details_search = None
+):
+    """Get filtered transactions for a user.
+
+    Note: Since category and trans_details are encrypted fields, they cannot be
+    filtered directly in the database. We filter them in memory after decryption.
+    """
+
+    # Set default date range to last 30 days if not provided
+    start_date, end_date = resolve_date_range(start_date, end_date)
+
+    queryset = get_transactions_queryset_for_user(
+        user=user,
+        start_date=start_date,
+        end_date=end_date,
+        place=place,
+        trans_status=trans_status,
+        category=category,
+        details_search=details_search
+    )
+
     # If we need to filter by encrypted fields (category or details_search),
     # we must filter in memory after decryption
     if category or details_search:
-        # Convert queryset to list to access decrypted values
-        transactions_list = list(queryset)
-        filtered_transactions = []
-        
-        for trans in transactions_list:
-            # Access encrypted fields (they are automatically decrypted when accessed)
-            trans_category = trans.category or ""
-            trans_details = trans.trans_details or ""
-            
-            # Apply category filter
-            if category:
-                if trans_category != category:
-                    continue
-            
-            # Apply details_search filter
-            if details_search:
-                if details_search.lower() not in trans_details.lower():
-                    continue
-            
-            filtered_transactions.append(trans)
-        
-        # Create a new queryset from filtered transactions
-        # We'll use the IDs to create a filtered queryset
-        if filtered_transactions:
-            transaction_ids = [t.id for t in filtered_transactions]
-            # Create queryset with filtered IDs, maintaining date order
+        # Only decrypt the two columns we filter on
+        transaction_ids = [
+            trans_id
+            for trans_id, trans_category, trans_details in queryset.values_list('id', 'category', 'trans_details')
+            if matches_encrypted_filters(
+                category_value=trans_category,
+                details_value=trans_details,
+                category=category,
+                details_search=details_search
+            )
+        ]
+
+        # Create queryset with filtered IDs, maintaining date order
+        if transaction_ids:
             queryset = Transactions.objects.filter(id__in=transaction_ids).order_by('-date')
         else:
             # Return empty queryset if no matches
             queryset = Transactions.objects.none()
-    
+
     return queryset, start_date, end_date
+
+
+def iter_transactions_for_export(
+    *,
+    user,
+    start_date,
+    end_date,
+    category = None,
+    place = None,
+    trans_status = None,
+    details_search = None,
+    chunk_size = 2000
+):
+    """
+    Yield export rows (in EXPORT_CSV_COLUMNS order) one at a time.
+
+    Rows are streamed from the database in chunks and the encrypted filters are
+    applied per row, so memory stays bounded whatever the date range.
+    """
+    queryset = get_transactions_queryset_for_user(
+        user=user,
+        start_date=start_date,
+        end_date=end_date,
+        place=place,
+        trans_status=trans_status,
+        category=category,
+        details_search=details_search
+    )
+
+    # values_list decrypts only the exported columns and skips model instantiation
+    rows = queryset.values_list(*EXPORT_CSV_COLUMNS).iterator(chunk_size=chunk_size)
+    category_index = EXPORT_CSV_COLUMNS.index('category')
+    details_index = EXPORT_CSV_COLUMNS.index('trans_details')
+
+    for row in rows:
+        if (category or details_search) and not matches_encrypted_filters(
+            category_value=row[category_index],
+            details_value=row[details_index],
+            category=category,
+            details_search=details_search
+        ):
+            continue
+        yield row
+
+
+def encode_transaction_cursor(trans_date, trans_id):
+    """Build the opaque cursor pointing after the given (date, id) position."""
+    raw = f"{trans_date.isoformat()}|{trans_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_transaction_cursor(cursor):
+    """Return the (date, id) position stored in a cursor, or raise ValidationError."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        date_str, id_str = base64.urlsafe_b64decode(padded.encode()).decode().split('|')
+        return date.fromisoformat(date_str), int(id_str)
+    except (ValueError, UnicodeDecodeError):
+        raise ValidationError("Invalid cursor")
+
+
+def get_transactions_page_by_cursor(
+    *,
+    user,
+    start_date,
+    end_date,
+    cursor = None,
+    page_size = 20,
+    category = None,
+    place = None,
+    trans_status = None,
+    details_search = None
+):
+    """
+    Return one page of transactions ordered by (date, id) descending, plus the
+    cursor of the next page (None on the last page).
+
+    Uses a keyset condition and LIMIT page_size + 1 instead of COUNT/OFFSET, so
+    the cost depends on the page size and not on how deep the client scrolled.
+    """
+    queryset = get_transactions_queryset_for_user(
+        user=user,
+        start_date=start_date,
+        end_date=end_date,
+        place=place,
+        trans_status=trans_status,
+        category=category,
+        details_search=details_search
+    ).order_by('-date', '-id')
+
+    if cursor:
+        cursor_date, cursor_id = decode_transaction_cursor(cursor)
+        queryset = queryset.filter(Q(date__lt=cursor_date) | Q(date=cursor_date, id__lt=cursor_id))
+
+    if category or details_search:
+        # Decrypt rows in order and stop as soon as one extra match is found
+        matched_ids = []
+        rows = queryset.values_list('id', 'category', 'trans_details').iterator(chunk_size=page_size * 5)
+        for trans_id, trans_category, trans_details in rows:
+            if matches_encrypted_filters(
+                category_value=trans_category,
+                details_value=trans_details,
+                category=category,
+                details_search=details_search
+            ):
+                matched_ids.append(trans_id)
+                if len(matched_ids) > page_size:
+                    break
+        queryset = Transactions.objects.filter(id__in=matched_ids).order_by('-date', '-id')
+
+    transactions = list(queryset[:page_size + 1])
+    next_cursor = None
+    if len(transactions) > page_size:
+        transactions = transactions[:page_size]
+        last = transactions[-1]
+        next_cursor = encode_transaction_cursor(last.date, last.id)
+
+    return transactions, next_cursor
+
+
+def count_transactions_for_user(
+    *,
+    user,
+    start_date,
+    end_date,
+    category = None,
+    place = None,
+    trans_status = None,
+    details_search = None
+):
+    """Count the filtered transactions, cached briefly per user data version and filter set."""
+    filters_key = hashlib.sha256(
+        repr((start_date, end_date, category, place, trans_status, details_search)).encode()
+    ).hexdigest()
+    cache_key = f"transactions:count:{user.id}:{get_user_data_version(user)}:{filters_key}"
+
+    total = cache.get(cache_key)
+    if total is None:
+        queryset, _, _ = get_transactions_for_user(
+            user=user,
+            start_date=start_date,
+            end_date=end_date,
+            category=category,
+            place=place,
+            trans_status=trans_status,
+            details_search=details_search
+        )
+        total = queryset.count()
+        cache.set(cache_key, total, TRANSACTION_COUNT_CACHE_TIMEOUT)
+
+    return total
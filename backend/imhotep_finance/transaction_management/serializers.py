@@ -1,7 +1,8 @@
 from rest_framework import serializers
+from django.conf import settings
 from finance_management.utils.currencies import get_allowed_currencies
+from transaction_management.utils.csv_stream import open_csv_text
 import csv
-from io import TextIOWrapper, StringIO
 
 class TransactionInputSerializer(serializers.Serializer):
     date = serializers.CharField(
@@ -176,6 +177,16 @@ class TransactionFilterSerializer(serializers.Serializer):
         min_value=1,
         help_text="Page number for pagination"
     )
+    cursor = serializers.CharField(
+        required=False,
+        allow_blank=True,
+        help_text="Opaque cursor for keyset pagination. Send it empty for the first page, then pass back next_cursor."
+    )
+    include_total = serializers.BooleanField(
+        required=False,
+        default=False,
+        help_text="In cursor mode, also return the (briefly cached) total count"
+    )
 
 
 class TransactionOutputSerializer(serializers.Serializer):
@@ -198,47 +209,39 @@ class TransactionListResponseSerializer(serializers.Serializer):
 class CSVFileUploadSerializer(serializers.Serializer):
     file = serializers.FileField(
         required=True,
-        help_text="CSV file with columns: date, amount, currency, trans_status, trans_details (optional), category (optional)"
+        help_text="CSV file with columns: date, amount, currency, trans_status, trans_details (optional), category (optional), place (optional)"
     )
     
     def validate_file(self, file):
         """Validate the uploaded CSV file."""
-        MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
+        max_file_size = settings.TRANSACTION_IMPORT_MAX_FILE_SIZE
         
         # Validate file extension
         if not file.name.endswith('.csv'):
             raise serializers.ValidationError("Invalid file format. Please upload a CSV file.")
         
         # Validate file size
-        if file.size > MAX_FILE_SIZE:
-            raise serializers.ValidationError("File size exceeds the maximum limit of 5MB.")
+        if file.size > max_file_size:
+            raise serializers.ValidationError(
+                f"File size exceeds the maximum limit of {max_file_size // (1024 * 1024)}MB."
+            )
         
         # Validate file is not empty
         if file.size == 0:
             raise serializers.ValidationError("The uploaded file is empty.")
         
-        # Validate file can be read as CSV
+        # Validate file can be read as CSV, only reading the header line
         try:
-            # Read the file content
-            file.seek(0)  # Ensure we're at the start
-            file_content = file.read()
-            
-            # Decode and create file wrapper
-            try:
-                decoded_content = file_content.decode('utf-8')
-            except UnicodeDecodeError:
-                raise serializers.ValidationError("Unable to read file. Please ensure the file is UTF-8 encoded.")
-            
-            # Parse as CSV
-            file_wrapper = StringIO(decoded_content)
-            csv_reader = csv.DictReader(file_wrapper)
+            with open_csv_text(file) as text_stream:
+                csv_reader = csv.DictReader(text_stream)
+                fieldnames = csv_reader.fieldnames
             
             # Validate headers
             required_columns = {'date', 'amount', 'currency', 'trans_status'}
-            if csv_reader.fieldnames is None:
+            if fieldnames is None:
                 raise serializers.ValidationError("CSV file appears to be empty or has no headers.")
             
-            normalized_headers = {h.strip().lower() for h in csv_reader.fieldnames if h}
+            normalized_headers = {h.strip().lower() for h in fieldnames if h}
             missing_columns = required_columns - normalized_headers
             
             if missing_columns:
@@ -247,9 +250,6 @@ class CSVFileUploadSerializer(serializers.Serializer):
                     "Required columns are: date, amount, currency, trans_status."
                 )
             
-            # Reset file pointer for later processing
-            file.seek(0)
-            
         except csv.Error as e:
             raise serializers.ValidationError(f"Invalid CSV file format: {str(e)}")
         
@@ -263,5 +263,43 @@ class TransactionImportResponseSerializer(serializers.Serializer):
     errors = serializers.ListField(
         child=serializers.CharField(),
         required=False,
-        help_text="List of errors encountered during import"
+        help_text="First errors encountered during import, followed by a summary of the rest"
+    )
+    error_count = serializers.IntegerField(
+        required=False,
+        help_text="Total number of errors encountered during import"
     )
+
+
+class TransactionBatchCreateSerializer(serializers.Serializer):
+    transactions = serializers.ListField(
+        child=serializers.DictField(),
+        allow_empty=False,
+        help_text="Transactions to create, each with the fields of a single create"
+    )
+    mode = serializers.ChoiceField(
+        choices=['all_or_nothing', 'best_effort'],
+        default='all_or_nothing',
+        help_text="all_or_nothing writes nothing if any transaction fails; best_effort creates every valid one"
+    )
+
+    def validate_transactions(self, value):
+        """Bound the batch size."""
+        max_items = settings.TRANSACTION_BATCH_MAX_ITEMS
+        if len(value) > max_items:
+            raise serializers.ValidationError(f"A batch can hold at most {max_items} transactions.")
+        return value
+
+
+class TransactionBatchItemResultSerializer(serializers.Serializer):
+    index = serializers.IntegerField(help_text="Position of the transaction in the request")
+    success = serializers.BooleanField()
+    id = serializers.IntegerField(required=False, help_text="ID of the created transaction")
+    error = serializers.JSONField(required=False, help_text="Why the transaction was not created")
+
+
+class TransactionBatchCreateResponseSerializer(serializers.Serializer):
+    mode = serializers.CharField()
+    created_count = serializers.IntegerField()
+    error_count = serializers.IntegerField()
+    results = TransactionBatchItemResultSerializer(many=True)
@@ -1,15 +1,31 @@
 from django.shortcuts import get_object_or_404
+from django.http import Http404
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 from finance_management.utils.currencies import get_allowed_currencies
+from finance_management.utils.blind_index import category_blind_index
 from transaction_management.models import Transactions, NetWorth
-from user_reports.utils.save_user_report import save_user_report_with_transaction, save_user_report_with_transaction_update
+from user_reports.utils.save_user_report import (
+    save_user_report_with_transaction,
+    save_user_report_with_transaction_update,
+    save_user_report_with_transactions,
+)
+from user_reports.utils.report_buffer import coalesce_report_updates
 from datetime import date, datetime
-from typing import List, Dict, Tuple
-from django.db import transaction
+from typing import List, Dict, Tuple, Iterator
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
 from wishlist_management.models import Wishlist
+from transaction_management.utils.csv_stream import open_csv_text
+from transaction_management.utils.search_index import index_transaction_details
+from transaction_management.utils.networth_ledger import apply_networth_delta
+from transaction_management.utils.daily_aggregates import record_daily_aggregates
+from transaction_management.utils.category_usage import record_category_usage
+from transaction_management.utils.networth_snapshots import record_transaction_snapshots
+from finance_management.utils.user_cache import bump_user_data_version
 import csv
-from io import TextIOWrapper
+import uuid
 
 def create_transaction(*,user, amount, currency, trans_details, category, trans_status, transaction_date, place):
     """Create a transaction and update net_worth."""
@@ -43,14 +59,11 @@ def create_transaction(*,user, amount, currency, trans_details, category, trans_
     # Clean place to ensure consistent grouping
     place = place.strip().title() if place and str(place).strip() else 'General'
 
-    if trans_status.lower() == "withdraw":
-        net_worth = NetWorth.objects.filter(user=user, currency=currency, place=place).first()
-        current_balance = net_worth.total if net_worth else 0.00
+    with transaction.atomic(), coalesce_report_updates():
+        #Update NetWorth first: a withdrawal only applies while the balance covers it
+        delta = amount if trans_status.lower() == "deposit" else -amount
+        apply_networth_delta(user=user, currency=currency, place=place, delta=delta)
 
-        if current_balance < amount:
-            raise ValidationError(f"Insufficient funds. You only have {current_balance} {currency}.")
-
-    with transaction.atomic():
         #create Transaction
         user_transaction = Transactions.objects.create(
             user=user,
@@ -62,23 +75,14 @@ def create_transaction(*,user, amount, currency, trans_details, category, trans_
             trans_details=trans_details,
             place=place
         )
-
-        #Update NetWorth
-        net_worth_obj, created = NetWorth.objects.get_or_create(
-            user=user,
-            currency=currency,
-            place=place,
-            defaults={'total': 0}
-        )
-        if trans_status.lower() == "deposit":
-            net_worth_obj.total += amount
-        else:
-            net_worth_obj.total -= amount
-        
-        net_worth_obj.save()
+        index_transaction_details([user_transaction])
+        record_daily_aggregates(user, added=[user_transaction])
+        record_category_usage(user, added=[user_transaction])
+        record_transaction_snapshots(user, added=[user_transaction])
     
         save_user_report_with_transaction(user, transaction_date, user_transaction)
                      
+    bump_user_data_version(user)
     return user_transaction
 
 def delete_transaction(*, user, transaction_id):
@@ -86,6 +90,13 @@ def delete_transaction(*, user, transaction_id):
 
     # Get the transaction
     trans_obj = get_object_or_404(Transactions, id=transaction_id, user=user)
+
+    # A transfer leg is only deleted together with its other leg
+    if trans_obj.transfer_id:
+        delete_transfer(user=user, transfer_id=trans_obj.transfer_id)
+        return NetWorth.objects.filter(
+            user=user, currency=trans_obj.currency, place=trans_obj.place
+        ).values_list('total', flat=True).first()
     
     old_amount = trans_obj.amount
     old_currency = trans_obj.currency
@@ -93,21 +104,28 @@ def delete_transaction(*, user, transaction_id):
     old_place = trans_obj.place
     transaction_date = trans_obj.date
 
-    # Get current net_worth
-    net_worth_obj = get_object_or_404(NetWorth, user=user, currency=old_currency, place=old_place)
-    old_total = float(net_worth_obj.total)
-
-    # Calculate new total
+    # Reverse the transaction's effect on net_worth
     if old_trans_status.lower() == "deposit":
-        new_total = old_total - float(old_amount)
-        if new_total < 0:
-            raise ValidationError("You can't delete this transaction as it would result in negative balance")
+        delta = -float(old_amount)
     elif old_trans_status.lower() == "withdraw":
-        new_total = old_total + float(old_amount)
+        delta = float(old_amount)
     else:
         raise ValidationError("Invalid transaction status")
 
-    with transaction.atomic():
+    with transaction.atomic(), coalesce_report_updates():
+        # Update net_worth; a deposit can only be removed while the balance covers it
+        try:
+            apply_networth_delta(
+                user=user,
+                currency=old_currency,
+                place=old_place,
+                delta=delta,
+                create_missing=False,
+                insufficient_message="You can't delete this transaction as it would result in negative balance"
+            )
+        except NetWorth.DoesNotExist:
+            raise Http404("No NetWorth matches the given query.")
+
         # Update wishlist if exists
         wish = Wishlist.objects.filter(transaction=trans_obj, user=user).first()
         if wish:
@@ -118,14 +136,18 @@ def delete_transaction(*, user, transaction_id):
         save_user_report_with_transaction(
             user, transaction_date, trans_obj, parent_function="delete_transaction"
         )
+        record_daily_aggregates(user, removed=[trans_obj])
+        record_category_usage(user, removed=[trans_obj])
+        record_transaction_snapshots(user, removed=[trans_obj])
         
         # Delete the transaction
         trans_obj.delete()
-        
-        # Update net_worth
-        net_worth_obj.total = new_total
-        net_worth_obj.save()
+
+        new_total = NetWorth.objects.filter(
+            user=user, currency=old_currency, place=old_place
+        ).values_list('total', flat=True).first()
     
+    bump_user_data_version(user)
     return new_total
 
 def update_transaction(*, user, transaction_id, amount, currency, trans_details, category, trans_status, transaction_date: date, place: str):
@@ -175,36 +197,28 @@ def update_transaction(*, user, transaction_id, amount, currency, trans_details,
     old_currency = trans_obj.currency
     old_place = trans_obj.place
 
-    old_net_worth = NetWorth.objects.filter(user=user, currency=old_currency, place=old_place).first()
-    if not old_net_worth:
+    if not NetWorth.objects.filter(user=user, currency=old_currency, place=old_place).exists():
         raise ValidationError("Associated net worth record not found for the old transaction")
-    if old_amount != amount or old_status.lower() != trans_status.lower() or old_place != place:
-        #revert old transaction effect on net_worth
-        if old_status.lower() == "withdraw":
-                old_net_worth.total += old_amount
-                old_net_worth.save()
-        elif old_status.lower() == "deposit":
-                old_net_worth.total -= old_amount
-                if old_net_worth.total < 0:
-                    raise ValidationError("Cannot update transaction as it would result in negative balance")
-                old_net_worth.save()
-        else:
-            raise ValidationError("Invalid old transaction status")
-    
-        #update new transaction effect on net_worth
-        new_net_worth, created = NetWorth.objects.get_or_create(user=user, currency=currency, place=place, defaults={'total': 0})
-
-        new_net_worth_total = float(new_net_worth.total)
-        if trans_status.lower() == "withdraw":
-            if new_net_worth_total < amount:
-                raise ValidationError(f"Insufficient funds. You only have {new_net_worth_total} {currency}.")
-            new_net_worth_total -= amount
-        elif trans_status.lower() == "deposit":
-            new_net_worth_total += amount
-        else:
-            raise ValidationError("Invalid new transaction status")
-    
-    with transaction.atomic():
+
+    if old_status.lower() == "withdraw":
+        old_delta, new_delta = old_amount, -amount
+    elif old_status.lower() == "deposit":
+        old_delta, new_delta = -old_amount, amount
+    else:
+        raise ValidationError("Invalid old transaction status")
+
+    with transaction.atomic(), coalesce_report_updates():
+        if old_amount != amount or old_place != place:
+            #revert old transaction effect on net_worth, then apply the new one
+            apply_networth_delta(
+                user=user,
+                currency=old_currency,
+                place=old_place,
+                delta=old_delta,
+                insufficient_message="Cannot update transaction as it would result in negative balance"
+            )
+            apply_networth_delta(user=user, currency=currency, place=place, delta=new_delta)
+
         # Update transaction
         trans_obj.date = transaction_date
         trans_obj.trans_details = trans_details
@@ -214,105 +228,260 @@ def update_transaction(*, user, transaction_id, amount, currency, trans_details,
         trans_obj.trans_status = trans_status
         trans_obj.place = place
         trans_obj.save()
-
-        if old_amount != amount or old_status.lower() != trans_status.lower() or old_place != place:
-            # Update net_worth
-            new_net_worth.total = new_net_worth_total
-            new_net_worth.save()
+        index_transaction_details([trans_obj])
+        record_daily_aggregates(user, added=[trans_obj], removed=[old_transaction])
+        record_category_usage(user, added=[trans_obj], removed=[old_transaction])
+        record_transaction_snapshots(user, added=[trans_obj], removed=[old_transaction])
 
         # Update reports
         save_user_report_with_transaction_update(
             user, old_transaction, trans_obj
         )
     
+    bump_user_data_version(user)
     return trans_obj
 
-def parse_csv_transactions(file) -> Tuple[List[Dict], List[str]]:
-    """Parse CSV file and return transaction data and validation errors."""
-    transactions_data = []
-    errors = []
-    MAX_ROWS = 1000
+def _lock_networths(user, keys):
+    """Lock the user's NetWorth rows of the given (currency, place) keys with one query."""
+    currencies = {currency for currency, _ in keys}
+    places = {place for _, place in keys}
+    return {
+        (nw.currency, nw.place): nw
+        for nw in NetWorth.objects.select_for_update().filter(user=user, currency__in=currencies, place__in=places)
+        if (nw.currency, nw.place) in keys
+    }
+
+
+def _record_transfer_legs(user, added=(), removed=()):
+    # Transfers and conversions are left out of reports and daily aggregates, so only these move
+    record_category_usage(user, added=added, removed=removed)
+    record_transaction_snapshots(user, added=added, removed=removed)
+
+
+def create_transfer(*, user, amount, currency, place, target_place=None, target_currency=None, target_amount=None, category="Transfer", transaction_date=None):
+    """
+    Move money between two (currency, place) balances as one paired operation.
+
+    Both NetWorth rows are locked with one query, both deltas are applied in the
+    same transaction and the withdraw and deposit legs are inserted together,
+    linked by a shared transfer_id. Reports are not touched: transfers and
+    conversions never count in them. target_place and target_currency default
+    to the source ones and target_amount to amount.
+
+    Returns the (withdraw, deposit) transactions.
+    """
+    if not user:
+        raise ValidationError("User must be authenticated!")
+
+    target_place = target_place or place
+    target_currency = target_currency or currency
+    target_amount = amount if target_amount is None else target_amount
+
+    if amount is None or amount <= 0 or target_amount <= 0:
+        raise ValidationError("Amounts must be greater than zero.")
+
+    allowed_currencies = get_allowed_currencies()
+    if currency not in allowed_currencies or target_currency not in allowed_currencies:
+        raise ValidationError("Currency code not supported")
+
+    source_key = (currency, place)
+    target_key = (target_currency, target_place)
+    if source_key == target_key:
+        raise ValidationError("Source and target must be different.")
+
+    amount = float(amount)
+    target_amount = float(target_amount)
+    transaction_date = transaction_date or date.today()
+
+    if currency == target_currency:
+        withdraw_details, deposit_details = f"Transfer to {target_place}", f"Transfer from {place}"
+    else:
+        withdraw_details, deposit_details = f"Currency Conversion to {target_currency}", f"Currency Conversion from {currency}"
+
+    with transaction.atomic():
+        net_worths = _lock_networths(user, {source_key, target_key})
+        source = net_worths.get(source_key)
+        if source is None:
+            raise ValidationError(f"Place '{place}' with currency '{currency}' does not exist.")
+        if source.total < amount:
+            raise ValidationError(f"Insufficient funds in '{place}'. Available: {source.total} {currency}.")
+
+        # The rows are locked, so plain F() updates can't race; update() skips auto_now
+        now = timezone.now()
+        NetWorth.objects.filter(pk=source.pk).update(total=F('total') - amount, updated_at=now)
+        if target_key in net_worths:
+            NetWorth.objects.filter(pk=net_worths[target_key].pk).update(total=F('total') + target_amount, updated_at=now)
+        else:
+            NetWorth.objects.create(user=user, currency=target_currency, place=target_place, total=target_amount)
+
+        transfer_id = uuid.uuid4()
+        withdraw, deposit = _bulk_create_transactions([
+            Transactions(
+                user=user, date=transaction_date, amount=amount, currency=currency,
+                trans_status="Withdraw", category=category, category_index=category_blind_index(category),
+                trans_details=withdraw_details, place=place, transfer_id=transfer_id,
+            ),
+            Transactions(
+                user=user, date=transaction_date, amount=target_amount, currency=target_currency,
+                trans_status="Deposit", category=category, category_index=category_blind_index(category),
+                trans_details=deposit_details, place=target_place, transfer_id=transfer_id,
+            ),
+        ])
+        index_transaction_details([withdraw, deposit])
+        _record_transfer_legs(user, added=[withdraw, deposit])
+
+    bump_user_data_version(user)
+    return withdraw, deposit
+
+
+def delete_transfer(*, user, transfer_id):
+    """
+    Delete both legs of a transfer and give the money back to the source.
+
+    The deposit leg can only be reversed while its balance still covers it.
+    Returns the number of legs deleted.
+    """
+    with transaction.atomic():
+        legs = list(Transactions.objects.filter(user=user, transfer_id=transfer_id))
+        if not legs:
+            raise Http404("No transfer matches the given query.")
+
+        net_worths = _lock_networths(user, {(leg.currency, leg.place) for leg in legs})
+        now = timezone.now()
+        for leg in legs:
+            delta = -float(leg.amount) if leg.trans_status.lower() == "deposit" else float(leg.amount)
+            net_worth = net_worths.get((leg.currency, leg.place))
+            if net_worth is None:
+                raise Http404("No NetWorth matches the given query.")
+            if net_worth.total + delta < 0:
+                raise ValidationError("You can't delete this transfer as it would result in negative balance")
+            net_worth.total += delta
+            NetWorth.objects.filter(pk=net_worth.pk).update(total=F('total') + delta, updated_at=now)
+
+        _record_transfer_legs(user, removed=legs)
+        Transactions.objects.filter(pk__in=[leg.pk for leg in legs]).delete()
+
+    bump_user_data_version(user)
+    return len(legs)
+
+
+class ImportErrorLog:
+    """Collect import errors while keeping only the first messages in memory."""
+
+    def __init__(self, max_messages=None):
+        self.max_messages = max_messages or settings.TRANSACTION_IMPORT_MAX_ERRORS
+        self.messages: List[str] = []
+        self.count = 0
+
+    def add(self, message: str):
+        self.count += 1
+        if len(self.messages) < self.max_messages:
+            self.messages.append(message)
+
+    def extend(self, messages: List[str]):
+        for message in messages:
+            self.add(message)
+
+    def __bool__(self):
+        return self.count > 0
+
+    def as_list(self) -> List[str]:
+        """Return the kept messages plus a summary line for the dropped ones."""
+        if self.count > len(self.messages):
+            return self.messages + [f"... and {self.count - len(self.messages)} more errors."]
+        return list(self.messages)
+
+
+def _parse_csv_row(row_num, row, errors: ImportErrorLog):
+    """Validate one CSV row, returning the transaction data or None after logging the error."""
+    # Normalize row keys
+    normalized_row = {k.strip().lower(): v.strip() if v else '' for k, v in row.items() if k}
+    
+    # Extract and validate required fields
+    date_val = normalized_row.get('date', '')
+    amount_str = normalized_row.get('amount', '')
+    currency_val = normalized_row.get('currency', '')
+    trans_status_val = normalized_row.get('trans_status', '')
     
+    # Validate required fields
+    for field_name, value in (('date', date_val), ('amount', amount_str), ('currency', currency_val), ('trans_status', trans_status_val)):
+        if not value:
+            errors.add(f"Row {row_num}: Missing required field '{field_name}'.")
+            return None
+    
+    # Validate amount
     try:
-        # Reset file pointer
-        file.seek(0)
-        
-        # Read file content and decode
-        file_content = file.read()
-        decoded_content = file_content.decode('utf-8')
-        
-        # Create StringIO from decoded content
-        from io import StringIO
-        file_wrapper = StringIO(decoded_content)
-        csv_reader = csv.DictReader(file_wrapper)
-        
-        row_count = 0
-        for row_num, row in enumerate(csv_reader, start=2):
-            row_count += 1
-            
-            # Check row limit
-            if row_count > MAX_ROWS:
-                errors.append(f"Row limit exceeded. Only the first {MAX_ROWS} rows were processed.")
-                break
-            
-            # Normalize row keys
-            normalized_row = {k.strip().lower(): v.strip() if v else '' for k, v in row.items() if k}
-            
-            # Extract and validate required fields
-            date_val = normalized_row.get('date', '')
-            amount_str = normalized_row.get('amount', '')
-            currency_val = normalized_row.get('currency', '')
-            trans_status_val = normalized_row.get('trans_status', '')
-            place_val = normalized_row.get('place', 'General')
-            
-            # Validate required fields
-            if not date_val:
-                errors.append(f"Row {row_num}: Missing required field 'date'.")
-                continue
-            
-            if not amount_str:
-                errors.append(f"Row {row_num}: Missing required field 'amount'.")
-                continue
-            
-            if not currency_val:
-                errors.append(f"Row {row_num}: Missing required field 'currency'.")
-                continue
-            
-            if not trans_status_val:
-                errors.append(f"Row {row_num}: Missing required field 'trans_status'.")
-                continue
+        amount = float(amount_str)
+        if amount <= 0:
+            errors.add(f"Row {row_num}: Amount must be a positive number.")
+            return None
+    except ValueError:
+        errors.add(f"Row {row_num}: Invalid amount '{amount_str}'. Must be a number.")
+        return None
+    
+    # Validate trans_status
+    trans_status_lower = trans_status_val.lower()
+    if trans_status_lower not in ['deposit', 'withdraw']:
+        errors.add(f"Row {row_num}: Invalid trans_status '{trans_status_val}'. Must be 'deposit' or 'withdraw'.")
+        return None
+    
+    return {
+        'row_num': row_num,
+        'date': date_val,
+        'amount': amount,
+        'currency': currency_val,
+        'trans_status': trans_status_lower,
+        'trans_details': normalized_row.get('trans_details', ''),
+        'category': normalized_row.get('category', ''),
+        'place': normalized_row.get('place', 'General'),
+    }
+
+
+def iter_csv_transaction_batches(file, *, errors: ImportErrorLog, batch_size=None, max_rows=None) -> Iterator[List[Dict]]:
+    """
+    Stream an uploaded CSV file and yield validated rows in fixed-size batches.
+
+    The file is decoded incrementally (encoding and BOM are detected from the
+    first bytes), so memory stays bounded by the batch size rather than the file
+    size. Invalid rows are reported to `errors` and skipped.
+    """
+    batch_size = batch_size or settings.TRANSACTION_IMPORT_BATCH_SIZE
+    max_rows = max_rows or settings.TRANSACTION_IMPORT_MAX_ROWS
+    batch = []
+    
+    try:
+        with open_csv_text(file) as text_stream:
+            csv_reader = csv.DictReader(text_stream)
             
-            # Validate amount
-            try:
-                amount = float(amount_str)
-                if amount <= 0:
-                    errors.append(f"Row {row_num}: Amount must be a positive number.")
+            for row_num, row in enumerate(csv_reader, start=2):
+                # Check row limit
+                if row_num - 1 > max_rows:
+                    errors.add(f"Row limit exceeded. Only the first {max_rows} rows were processed.")
+                    break
+                
+                transaction_data = _parse_csv_row(row_num, row, errors)
+                if transaction_data is None:
                     continue
-            except ValueError:
-                errors.append(f"Row {row_num}: Invalid amount '{amount_str}'. Must be a number.")
-                continue
-            
-            # Validate trans_status
-            trans_status_lower = trans_status_val.lower()
-            if trans_status_lower not in ['deposit', 'withdraw']:
-                errors.append(f"Row {row_num}: Invalid trans_status '{trans_status_val}'. Must be 'deposit' or 'withdraw'.")
-                continue
-            
-            # Add to transactions data
-            transactions_data.append({
-                'date': date_val,
-                'amount': amount,
-                'currency': currency_val,
-                'trans_status': trans_status_lower,
-                'trans_details': normalized_row.get('trans_details', ''),
-                'category': normalized_row.get('category', ''),
-                'place': normalized_row.get('place', 'General'),
-            })
+                
+                batch.append(transaction_data)
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
     
     except Exception as e:
-        errors.append(f"Error reading CSV file: {str(e)}")
+        errors.add(f"Error reading CSV file: {str(e)}")
     
-    return transactions_data, errors
+    if batch:
+        yield batch
+
+
+def parse_csv_transactions(file) -> Tuple[List[Dict], List[str]]:
+    """Parse CSV file and return transaction data and validation errors."""
+    errors = ImportErrorLog()
+    transactions_data = []
+    for batch in iter_csv_transaction_batches(file, errors=errors):
+        transactions_data.extend(batch)
+    return transactions_data, errors.as_list()
 
 
 def bulk_import_transactions(*, user, transactions_data: List[Dict]) -> Tuple[int, List[str]]:
@@ -320,50 +489,183 @@ def bulk_import_transactions(*, user, transactions_data: List[Dict]) -> Tuple[in
     Bulk import transactions from a list of transaction data.
     Returns (created_count, errors_list)
     """
+    results = create_transactions_batch(user=user, transactions_data=transactions_data)
+
     created_count = 0
     errors = []
-    
-    for row_num, transaction_data in enumerate(transactions_data, start=2):
-        try:
-            # Extract values
-            date_val = transaction_data.get('date', '')
-            amount_val = transaction_data.get('amount')
-            currency_val = transaction_data.get('currency', '')
-            trans_status_val = transaction_data.get('trans_status', '')
-            trans_details = transaction_data.get('trans_details', '')
-            category = transaction_data.get('category', '')
-            place = transaction_data.get('place', 'General')
-
-            # Parse date
-            try:
-                if isinstance(date_val, str):
-                    transaction_date = datetime.strptime(date_val, '%Y-%m-%d').date()
-                elif isinstance(date_val, date):
-                    transaction_date = date_val
-                else:
-                    errors.append(f"Row {row_num}: Invalid date format")
-                    continue
-            except ValueError:
-                errors.append(f"Row {row_num}: Invalid date format. Use YYYY-MM-DD")
-                continue
-            
-            # Create transaction using existing service
-            create_transaction(
-                user=user,
-                amount=amount_val,
-                currency=currency_val,
-                trans_status=trans_status_val.lower(),
-                category=category,
-                trans_details=trans_details,
-                transaction_date=transaction_date,
-                place=place
-            )
-            
+    for position, (transaction_data, result) in enumerate(zip(transactions_data, results), start=2):
+        row_num = transaction_data.get('row_num', position)
+        if isinstance(result, Transactions):
             created_count += 1
-            
+        else:
+            errors.append(f"Row {row_num}: {result}")
+
+    return created_count, errors
+
+
+def _prepare_batch_row(*, user, transaction_data: Dict) -> Dict:
+    """Validate and normalize one batch row the same way create_transaction does."""
+    date_val = transaction_data.get('date', '')
+    amount = transaction_data.get('amount')
+    currency = transaction_data.get('currency', '')
+    trans_status = transaction_data.get('trans_status', '')
+    place = transaction_data.get('place', 'General')
+
+    # Parse date
+    try:
+        if isinstance(date_val, str):
+            transaction_date = datetime.strptime(date_val, '%Y-%m-%d').date()
+        elif isinstance(date_val, date):
+            transaction_date = date_val
+        else:
+            raise ValidationError("Invalid date format")
+    except ValueError:
+        raise ValidationError("Invalid date format. Use YYYY-MM-DD")
+
+    if not user:
+        raise ValidationError("User must be authenticated!")
+
+    if currency is None or amount is None:
+        raise ValidationError("You have to choose the currency and amount!")
+
+    if amount <= 0:
+        raise ValidationError("Amount must be greater than zero")
+
+    if currency not in get_allowed_currencies():
+        raise ValidationError("Currency code not supported")
+
+    if not trans_status or trans_status.lower() not in ['deposit', 'withdraw']:
+        raise ValidationError("Transaction Status Must Be Deposit Or Withdraw")
+
+    return {
+        'date': transaction_date,
+        'amount': float(amount),
+        'currency': currency,
+        'trans_status': trans_status.lower(),
+        'trans_details': transaction_data.get('trans_details', ''),
+        'category': transaction_data.get('category', ''),
+        # Clean place to ensure consistent grouping
+        'place': place.strip().title() if place and str(place).strip() else 'General',
+    }
+
+
+BATCH_ROLLED_BACK_MESSAGE = "Not created because another transaction in the batch failed"
+
+
+def _bulk_create_transactions(transactions):
+    """
+    bulk_create the transactions and make sure each has its primary key.
+
+    Backends that can't return rows from a bulk insert (MySQL) leave pk unset,
+    so the ids are read back through the unique client_uuid of each row.
+    """
+    created = Transactions.objects.bulk_create(transactions)
+    if connection.features.can_return_rows_from_bulk_insert:
+        return created
+
+    ids = dict(
+        Transactions.objects.filter(client_uuid__in=[trans.client_uuid for trans in created])
+        .values_list('client_uuid', 'id')
+    )
+    for trans in created:
+        trans.pk = ids[trans.client_uuid]
+    return created
+
+
+def create_transactions_batch(*, user, transactions_data: List[Dict], all_or_nothing=False) -> List:
+    """
+    Create many transactions with set-based writes.
+
+    Every row is validated up front, withdrawals are checked against a running
+    balance per (currency, place), the transactions are inserted with one
+    bulk_create, NetWorth gets one aggregated delta per (currency, place) and
+    each affected monthly report is rewritten once. With all_or_nothing a single
+    failing row leaves the whole batch unwritten.
+
+    Returns a list aligned with transactions_data holding either the created
+    Transactions instance or the error message for that row.
+    """
+    results: List = [None] * len(transactions_data)
+    prepared = []
+
+    for index, transaction_data in enumerate(transactions_data):
+        try:
+            prepared.append((index, _prepare_batch_row(user=user, transaction_data=transaction_data)))
         except ValidationError as e:
-            errors.append(f"Row {row_num}: {str(e)}")
+            results[index] = '; '.join(e.messages)
         except Exception as e:
-            errors.append(f"Row {row_num}: Error processing row - {str(e)}")
-    
-    return created_count, errors
\ No newline at end of file
+            results[index] = f"Error processing row - {str(e)}"
+
+    if not prepared:
+        return results
+
+    with transaction.atomic(), coalesce_report_updates():
+        # Lock only the NetWorth rows the batch touches and keep running balances in memory
+        net_worths = _lock_networths(user, {(row['currency'], row['place']) for _, row in prepared})
+        balances = {key: float(nw.total) for key, nw in net_worths.items()}
+
+        accepted = []
+        for index, row in prepared:
+            key = (row['currency'], row['place'])
+            current_balance = balances.get(key, 0.00)
+
+            if row['trans_status'] == "withdraw":
+                if current_balance < row['amount']:
+                    results[index] = f"Insufficient funds. You only have {current_balance} {row['currency']}."
+                    continue
+                balances[key] = current_balance - row['amount']
+            else:
+                balances[key] = current_balance + row['amount']
+
+            accepted.append((index, Transactions(
+                user=user,
+                date=row['date'],
+                amount=row['amount'],
+                currency=row['currency'],
+                trans_status=row['trans_status'],
+                category=row['category'],
+                # bulk_create skips save(), so fill the blind index here
+                category_index=category_blind_index(row['category']),
+                trans_details=row['trans_details'],
+                place=row['place'],
+            )))
+
+        if not accepted:
+            return results
+
+        if all_or_nothing and len(accepted) < len(transactions_data):
+            for index, _ in accepted:
+                results[index] = BATCH_ROLLED_BACK_MESSAGE
+            return results
+
+        created = _bulk_create_transactions([trans_obj for _, trans_obj in accepted])
+        index_transaction_details(created)
+        record_daily_aggregates(user, added=created)
+        record_category_usage(user, added=created)
+        for (index, _), trans_obj in zip(accepted, created):
+            results[index] = trans_obj
+
+        # Apply one aggregated delta per (currency, place)
+        touched_keys = {(trans_obj.currency, trans_obj.place) for trans_obj in created}
+        to_update = []
+        to_create = []
+        now = timezone.now()
+        for key in touched_keys:
+            if key in net_worths:
+                # bulk_update skips auto_now, so bump updated_at for mobile sync ourselves
+                net_worths[key].total = balances[key]
+                net_worths[key].updated_at = now
+                to_update.append(net_worths[key])
+            else:
+                to_create.append(NetWorth(user=user, currency=key[0], place=key[1], total=balances[key]))
+
+        if to_update:
+            NetWorth.objects.bulk_update(to_update, ['total', 'updated_at'])
+        if to_create:
+            NetWorth.objects.bulk_create(to_create)
+        record_transaction_snapshots(user, added=created)
+
+        save_user_report_with_transactions(user, created)
+        bump_user_data_version(user)
+
+    return results
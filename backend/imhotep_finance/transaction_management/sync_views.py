@@ -68,11 +68,13 @@ Response:
 
 from __future__ import annotations
 
+import copy
 import logging
 import uuid
 from datetime import datetime, timezone as dt_timezone
 from typing import Any
 
+from django.db import transaction
 from django.utils import timezone
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
@@ -81,6 +83,11 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from transaction_management.models import NetWorth, Transactions
+from transaction_management.utils.search_index import index_transaction_details
+from transaction_management.utils.daily_aggregates import record_daily_aggregates
+from transaction_management.utils.category_usage import record_category_usage
+from transaction_management.utils.networth_snapshots import record_networth_snapshots
+from finance_management.utils.user_cache import bump_user_data_version
 from wishlist_management.models import Wishlist
 
 logger = logging.getLogger(__name__)
@@ -148,22 +155,27 @@ def _sync_transactions(user, records: list[dict]) -> tuple[int, int, list[str]]:
                     continue
 
                 # Create new record from mobile
-                Transactions.objects.create(
-                    user=user,
-                    client_uuid=client_uuid,
-                    date=record.get('date'),
-                    amount=record.get('amount', 0.0),
-                    currency=record.get('currency', 'USD'),
-                    trans_status=record.get('trans_status', 'Withdraw'),
-                    trans_details=record.get('trans_details', ''),
-                    category=record.get('category', ''),
-                    place=record.get('place', 'General'),
-                    is_deleted=is_deleted,
-                )
+                with transaction.atomic():
+                    server_record = Transactions.objects.create(
+                        user=user,
+                        client_uuid=client_uuid,
+                        date=record.get('date'),
+                        amount=record.get('amount', 0.0),
+                        currency=record.get('currency', 'USD'),
+                        trans_status=record.get('trans_status', 'Withdraw'),
+                        trans_details=record.get('trans_details', ''),
+                        category=record.get('category', ''),
+                        place=record.get('place', 'General'),
+                        is_deleted=is_deleted,
+                    )
+                    index_transaction_details([server_record])
+                    record_daily_aggregates(user, added=[server_record])
+                    record_category_usage(user, added=[server_record])
                 synced += 1
 
             elif mobile_updated_at >= server_record.updated_at:
                 # Mobile data is newer or equal — Mobile Wins
+                previous = copy.copy(server_record)
                 if is_deleted:
                     server_record.is_deleted = True
                 else:
@@ -176,7 +188,11 @@ def _sync_transactions(user, records: list[dict]) -> tuple[int, int, list[str]]:
                     server_record.place = record.get('place', server_record.place)
                     server_record.is_deleted = False
 
-                server_record.save()
+                with transaction.atomic():
+                    server_record.save()
+                    index_transaction_details([server_record])
+                    record_daily_aggregates(user, added=[server_record], removed=[previous])
+                    record_category_usage(user, added=[server_record], removed=[previous])
                 synced += 1
             else:
                 # Server is strictly newer — skip
@@ -189,6 +205,18 @@ def _sync_transactions(user, records: list[dict]) -> tuple[int, int, list[str]]:
     return synced, skipped, errors
 
 
+def _record_networth_change(user, previous, current) -> None:
+    """Carry a mobile overwrite of a NetWorth total into today's net worth snapshots."""
+    deltas: dict = {}
+    today = timezone.localdate()
+    for record, sign in ((previous, -1), (current, 1)):
+        if record is None or record.is_deleted:
+            continue
+        key = (record.currency, record.place or 'General', today)
+        deltas[key] = deltas.get(key, 0.0) + sign * float(record.total)
+    record_networth_snapshots(user, deltas)
+
+
 def _sync_networth(user, records: list[dict]) -> tuple[int, int, list[str]]:
     """Apply mobile networth records. Upserts by client_uuid."""
     synced = skipped = 0
@@ -217,17 +245,20 @@ def _sync_networth(user, records: list[dict]) -> tuple[int, int, list[str]]:
                     skipped += 1
                     continue
 
-                NetWorth.objects.create(
-                    user=user,
-                    client_uuid=client_uuid,
-                    total=record.get('total', 0.0),
-                    currency=record.get('currency', 'USD'),
-                    place=record.get('place', 'General'),
-                    is_deleted=is_deleted,
-                )
+                with transaction.atomic():
+                    server_record = NetWorth.objects.create(
+                        user=user,
+                        client_uuid=client_uuid,
+                        total=record.get('total', 0.0),
+                        currency=record.get('currency', 'USD'),
+                        place=record.get('place', 'General'),
+                        is_deleted=is_deleted,
+                    )
+                    _record_networth_change(user, None, server_record)
                 synced += 1
 
             elif mobile_updated_at >= server_record.updated_at:
+                previous = copy.copy(server_record)
                 if is_deleted:
                     server_record.is_deleted = True
                 else:
@@ -236,7 +267,9 @@ def _sync_networth(user, records: list[dict]) -> tuple[int, int, list[str]]:
                     server_record.place = record.get('place', server_record.place)
                     server_record.is_deleted = False
 
-                server_record.save()
+                with transaction.atomic():
+                    server_record.save()
+                    _record_networth_change(user, previous, server_record)
                 synced += 1
             else:
                 skipped += 1
@@ -374,6 +407,9 @@ class MobileSyncApi(APIView):
         w_synced, w_skipped, w_errors = _sync_wishlist(user, wishlist_records)
         all_errors.extend(w_errors)
 
+        if t_synced or n_synced or w_synced:
+            bump_user_data_version(user)
+
         response_payload = {
             'synced': {
                 'transactions': t_synced,
@@ -5,9 +5,12 @@ from rest_framework.test import APIClient
 from rest_framework import status
 from transaction_management.services import create_transaction
 from transaction_management.models import Transactions, NetWorth
+from transaction_management.apis import EXPORT_CSV_ERROR_MARKER
 from datetime import date
 from decimal import Decimal
 from io import BytesIO
+from unittest.mock import PropertyMock, patch
+from django.db import connection
 from django.core.files.uploadedfile import SimpleUploadedFile
 User = get_user_model()
 
@@ -40,6 +43,59 @@ class TransactionCreateApiTest(TestCase):
         response = self.client.post(self.url, data, format='json')
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+class TransactionBatchCreateApiTest(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('add_transactions_batch')
+        self.transactions = [
+            {'date': '2024-01-10', 'amount': '100', 'currency': 'USD', 'trans_status': 'deposit', 'category': 'Salary', 'place': 'bank'},
+            {'date': '2024-01-11', 'amount': '30', 'currency': 'USD', 'trans_status': 'withdraw', 'category': 'Food', 'place': 'Bank'},
+            {'date': '2024-01-12', 'amount': '500', 'currency': 'USD', 'trans_status': 'withdraw', 'category': 'Rent', 'place': 'Bank'},
+        ]
+
+    def test_all_or_nothing_writes_nothing_when_one_item_fails(self):
+        """Test an insufficient-funds item rolls back the whole all-or-nothing batch"""
+        response = self.client.post(self.url, {'transactions': self.transactions}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['created_count'], 0)
+        self.assertIn('Insufficient funds', response.data['results'][2]['error'])
+        self.assertFalse(Transactions.objects.filter(user=self.user).exists())
+        self.assertFalse(NetWorth.objects.filter(user=self.user).exists())
+
+    def test_best_effort_creates_the_valid_items(self):
+        """Test best-effort mode creates valid items with one NetWorth row per key and reports per-item results"""
+        items = self.transactions + [{'amount': '-5', 'currency': 'USD', 'trans_status': 'deposit'}]
+        response = self.client.post(self.url, {'transactions': items, 'mode': 'best_effort'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([result['success'] for result in response.data['results']], [True, True, False, False])
+        self.assertIn('amount', response.data['results'][3]['error'])
+        self.assertEqual(NetWorth.objects.get(user=self.user, currency='USD', place='Bank').total, 70.0)
+
+    def test_item_errors_are_plain_text(self):
+        """Test per-item errors carry the plain validation message, without list brackets"""
+        response = self.client.post(self.url, {'transactions': self.transactions, 'mode': 'best_effort'}, format='json')
+        self.assertEqual(response.data['results'][2]['error'], 'Insufficient funds. You only have 70.0 USD.')
+
+    def test_created_results_carry_ids_in_both_modes(self):
+        """Test every created item reports its id, also on backends that don't return bulk insert rows"""
+        for mode in ('all_or_nothing', 'best_effort'):
+            with patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', new_callable=PropertyMock, return_value=False):
+                response = self.client.post(self.url, {'transactions': self.transactions[:2], 'mode': mode}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            ids = [result['id'] for result in response.data['results']]
+            self.assertTrue(all(ids))
+            self.assertEqual(set(ids), set(Transactions.objects.filter(id__in=ids).values_list('id', flat=True)))
+
+    def test_batch_size_is_bounded(self):
+        """Test a batch above TRANSACTION_BATCH_MAX_ITEMS is rejected"""
+        with self.settings(TRANSACTION_BATCH_MAX_ITEMS=2):
+            response = self.client.post(self.url, {'transactions': self.transactions}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
 class TransactionListApiTest(TestCase):
 
     def setUp(self):
@@ -78,6 +134,26 @@ class TransactionListApiTest(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['pagination']['page'], 1)
 
+    def test_list_transactions_cursor_pagination_walks_all_pages(self):
+        """Test cursor mode returns every row once across pages"""
+        for i in range(20):
+            create_transaction(user=self.user, amount=10, currency='USD', trans_status='deposit', category='Bulk', trans_details='', transaction_date=date.today(), place='General')
+        first = self.client.get(self.url, {'cursor': '', 'include_total': 'true'})
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(first.data['transactions']), 20)
+        self.assertTrue(first.data['pagination']['has_more'])
+        self.assertEqual(first.data['pagination']['total'], 25)
+        second = self.client.get(self.url, {'cursor': first.data['pagination']['next_cursor']})
+        self.assertEqual(len(second.data['transactions']), 5)
+        self.assertFalse(second.data['pagination']['has_more'])
+        ids = {t['id'] for t in first.data['transactions']} | {t['id'] for t in second.data['transactions']}
+        self.assertEqual(len(ids), 25)
+
+    def test_list_transactions_invalid_cursor(self):
+        """Test a malformed cursor is rejected"""
+        response = self.client.get(self.url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
 class TransactionUpdateApiTest(TestCase):
 
     def setUp(self):
@@ -139,6 +215,30 @@ class TransactionExportCSVApiTest(TestCase):
         self.assertEqual(response['Content-Type'], 'text/csv')
         self.assertIn('attachment', response['Content-Disposition'])
 
+    def test_export_csv_streams_filtered_rows_with_place(self):
+        """Test the streamed export applies encrypted filters and includes the place column"""
+        create_transaction(user=self.user, amount=40, currency='USD', trans_status='deposit', category='Other', trans_details='Not exported', transaction_date=date.today(), place='Bank')
+        response = self.client.get(self.url, {'category': 'Test'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode('utf-8').splitlines()
+        self.assertEqual(lines[0], 'date,amount,currency,trans_status,category,trans_details,place')
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[1].endswith('Test,Export test,General'))
+
+    def test_export_csv_error_mid_stream_ends_with_marker_row(self):
+        """Test a failure after streaming started ends the file with the error marker instead of silently truncating it"""
+        def failing_rows(**kwargs):
+            yield [str(date.today()), 100.0, 'USD', 'deposit', 'Test', 'Export test', 'General']
+            raise RuntimeError('Decryption failed')
+
+        with patch('transaction_management.apis.iter_transactions_for_export', failing_rows):
+            response = self.client.get(self.url)
+            lines = b''.join(response.streaming_content).decode('utf-8').splitlines()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(lines[-1], EXPORT_CSV_ERROR_MARKER)
+
 class TransactionImportCSVApiTest(TestCase):
 
     def setUp(self):
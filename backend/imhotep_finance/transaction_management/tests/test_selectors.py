@@ -3,6 +3,10 @@ from django.contrib.auth import get_user_model
 from datetime import date, timedelta
 from transaction_management.selectors import get_transactions_for_user
 from transaction_management.services import create_transaction
+from transaction_management.models import Transactions, TransactionSearchToken
+from finance_management.utils.blind_index import category_blind_index
+from django.core.management import call_command
+from io import StringIO
 User = get_user_model()
 
 class GetTransactionsForUserTest(TestCase):
@@ -37,6 +41,22 @@ class GetTransactionsForUserTest(TestCase):
         self.assertEqual(queryset.count(), 1)
         self.assertEqual(queryset.first().category, 'Food')
 
+    def test_category_blind_index_set_on_save(self):
+        """Test the category blind index is computed on save and normalized"""
+        self.trans1.refresh_from_db()
+        self.assertEqual(self.trans1.category_index, category_blind_index(' food '))
+        self.assertNotEqual(self.trans1.category_index, category_blind_index('Transport'))
+
+    def test_category_filter_covers_unindexed_rows_and_backfill(self):
+        """Test rows without an index still match and the backfill command fills them"""
+        Transactions.objects.filter(user=self.user).update(category_index=None)
+        queryset, _, _ = get_transactions_for_user(user=self.user, category='Food')
+        self.assertEqual(list(queryset), [self.trans1])
+        call_command('backfill_category_index', stdout=StringIO())
+        self.assertFalse(Transactions.objects.filter(category_index__isnull=True).exists())
+        queryset, _, _ = get_transactions_for_user(user=self.user, category='Food')
+        self.assertEqual(list(queryset), [self.trans1])
+
     def test_get_transactions_filtered_by_place(self):
         """Test filtering transactions by place"""
         create_transaction(user=self.user, amount=80, currency='USD', trans_status='deposit', category='Food', trans_details='Lunch', transaction_date=date.today(), place='Office')
@@ -50,6 +70,38 @@ class GetTransactionsForUserTest(TestCase):
         for trans in queryset:
             self.assertEqual(trans.trans_status, 'deposit')
 
+    def test_details_search_uses_tokens_and_covers_unindexed_rows(self):
+        """Test substring search through the token index, before and after a rebuild"""
+        self.assertTrue(TransactionSearchToken.objects.filter(transaction=self.trans2).exists())
+        queryset, _, _ = get_transactions_for_user(user=self.user, details_search='XI FA')
+        self.assertEqual(list(queryset), [self.trans2])
+        TransactionSearchToken.objects.all().delete()
+        Transactions.objects.update(details_indexed=False)
+        queryset, _, _ = get_transactions_for_user(user=self.user, details_search='xi fa')
+        self.assertEqual(list(queryset), [self.trans2])
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertFalse(Transactions.objects.filter(details_indexed=False).exists())
+        queryset, _, _ = get_transactions_for_user(user=self.user, details_search='taxi')
+        self.assertEqual(list(queryset), [self.trans2])
+
+    def test_search_tokens_are_keyed_per_user(self):
+        """Test the same details produce different tokens for different users"""
+        other_user = User.objects.create_user(username='otheruser', password='testpass123')
+        other = create_transaction(user=other_user, amount=5, currency='USD', trans_status='deposit', category='Food', trans_details=self.trans2.trans_details, transaction_date=date.today(), place='General')
+        own_tokens = set(TransactionSearchToken.objects.filter(transaction=self.trans2).values_list('token', flat=True))
+        other_tokens = set(TransactionSearchToken.objects.filter(transaction=other).values_list('token', flat=True))
+        self.assertTrue(own_tokens)
+        self.assertFalse(own_tokens & other_tokens)
+
+    def test_details_edited_outside_services_fall_back_to_scanning(self):
+        """Test saving new details without re-indexing marks the row unindexed so search still finds it"""
+        trans = Transactions.objects.get(pk=self.trans1.pk)
+        trans.trans_details = 'Bookshop visit'
+        trans.save()
+        self.assertFalse(Transactions.objects.get(pk=trans.pk).details_indexed)
+        queryset, _, _ = get_transactions_for_user(user=self.user, start_date=date.today() - timedelta(days=50), end_date=date.today(), details_search='bookshop')
+        self.assertEqual([t.id for t in queryset], [trans.id])
+
     def test_get_transactions_filtered_by_details_search(self):
         """Test filtering transactions by details search"""
         queryset, _, _ = get_transactions_for_user(user=self.user, start_date=date.today() - timedelta(days=50), end_date=date.today(), details_search='Groceries')
@@ -3,10 +3,15 @@ from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from decimal import Decimal
 from datetime import date, timedelta
-from transaction_management.services import create_transaction, delete_transaction, update_transaction, bulk_import_transactions, parse_csv_transactions
-from transaction_management.models import Transactions, NetWorth
+from transaction_management.services import create_transaction, delete_transaction, update_transaction, bulk_import_transactions, create_transactions_batch, parse_csv_transactions, iter_csv_transaction_batches, ImportErrorLog
+from transaction_management.models import Transactions, NetWorth, DailyAggregate, NetWorthSnapshot, TransactionSearchToken
+from transaction_management.utils.daily_aggregates import rebuild_daily_aggregates
+from transaction_management.utils.networth_snapshots import backfill_networth_snapshots
 from wishlist_management.models import Wishlist
 from io import BytesIO
+from unittest.mock import PropertyMock, patch
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 User = get_user_model()
 
 class CreateTransactionServiceTest(TestCase):
@@ -36,6 +41,8 @@ class CreateTransactionServiceTest(TestCase):
         with self.assertRaises(ValidationError) as context:
             create_transaction(user=self.user, amount=100, currency='USD', trans_status='withdraw', category='Food', trans_details='', transaction_date=date.today(), place='General')
         self.assertIn('Insufficient funds', str(context.exception))
+        self.assertFalse(Transactions.objects.filter(user=self.user).exists())
+        self.assertFalse(NetWorth.objects.filter(user=self.user).exists())
 
     def test_create_transaction_invalid_amount(self):
         """Test creating transaction with invalid amount"""
@@ -135,6 +142,8 @@ class UpdateTransactionServiceTest(TestCase):
         with self.assertRaises(ValidationError) as context:
             update_transaction(user=self.user, transaction_id=withdraw_trans.id, amount=200, currency='USD', trans_status='withdraw', category='Test', trans_details='', transaction_date=date.today(), place='General')
         self.assertIn('Insufficient funds', str(context.exception))
+        # The reverted old withdrawal must be rolled back with the failed update
+        self.assertEqual(float(NetWorth.objects.get(user=self.user, currency='USD').total), 130)
 
     def test_update_transaction_cleans_dirty_place_casing(self):
         """Test that messy casing and whitespaces in place names are formatted properly during update"""
@@ -150,6 +159,13 @@ class BulkImportTransactionsTest(TestCase):
     def setUp(self):
         self.user = User.objects.create_user(username='testuser', password='testpass123')
 
+    def test_row_errors_are_plain_text(self):
+        """Test a row failing validation reports its message without list brackets"""
+        transactions_data = [{'date': '2024-01-15', 'amount': 100, 'currency': 'XXX', 'trans_status': 'deposit'}, {'date': '2024-01-15', 'amount': 100, 'currency': 'USD', 'trans_status': 'refund'}]
+        created_count, errors = bulk_import_transactions(user=self.user, transactions_data=transactions_data)
+        self.assertEqual(created_count, 0)
+        self.assertEqual(errors, ['Row 2: Currency code not supported', 'Row 3: Transaction Status Must Be Deposit Or Withdraw'])
+
     def test_bulk_import_success(self):
         """Test bulk importing transactions successfully"""
         transactions_data = [{'date': '2024-01-15', 'amount': 100, 'currency': 'USD', 'trans_status': 'deposit', 'category': 'Salary', 'trans_details': 'Monthly salary'}, {'date': '2024-01-16', 'amount': 50, 'currency': 'USD', 'trans_status': 'deposit', 'category': 'Bonus', 'trans_details': ''}]
@@ -163,4 +179,160 @@ class BulkImportTransactionsTest(TestCase):
         transactions_data = [{'date': '2024-01-15', 'amount': 100, 'currency': 'USD', 'trans_status': 'deposit', 'category': 'Valid', 'trans_details': ''}, {'date': 'invalid-date', 'amount': 50, 'currency': 'USD', 'trans_status': 'deposit', 'category': 'Invalid', 'trans_details': ''}]
         created_count, errors = bulk_import_transactions(user=self.user, transactions_data=transactions_data)
         self.assertEqual(created_count, 1)
-        self.assertGreater(len(errors), 0)
\ No newline at end of file
+        self.assertGreater(len(errors), 0)
+
+    def test_bulk_import_running_balance_insufficient_funds(self):
+        """Test withdrawals in a batch are checked against the running balance"""
+        transactions_data = [{'date': '2024-01-15', 'amount': 100, 'currency': 'USD', 'trans_status': 'deposit', 'category': 'Salary', 'trans_details': ''}, {'date': '2024-01-16', 'amount': 80, 'currency': 'USD', 'trans_status': 'withdraw', 'category': 'Food', 'trans_details': ''}, {'date': '2024-01-17', 'amount': 30, 'currency': 'USD', 'trans_status': 'withdraw', 'category': 'Food', 'trans_details': ''}]
+        created_count, errors = bulk_import_transactions(user=self.user, transactions_data=transactions_data)
+        self.assertEqual(created_count, 2)
+        self.assertEqual(len(errors), 1)
+        self.assertIn('Row 4', errors[0])
+        self.assertIn('Insufficient funds. You only have 20.0 USD.', errors[0])
+        networth = NetWorth.objects.get(user=self.user, currency='USD', place='General')
+        self.assertEqual(float(networth.total), 20)
+
+    def test_bulk_import_matches_per_row_path(self):
+        """Test the batch path produces the same networth and report as create_transaction"""
+        from user_reports.services import get_monthly_report_for_user
+        other_user = User.objects.create_user(username='otheruser', password='testpass123')
+        transactions_data = [{'date': '2024-01-15', 'amount': 100, 'currency': 'USD', 'trans_status': 'deposit', 'category': 'Salary', 'trans_details': '', 'place': ' bank '}, {'date': '2024-01-20', 'amount': 40, 'currency': 'USD', 'trans_status': 'withdraw', 'category': 'Food', 'trans_details': '', 'place': 'Bank'}, {'date': '2024-02-01', 'amount': 10, 'currency': 'USD', 'trans_status': 'withdraw', 'category': '', 'trans_details': '', 'place': 'bank'}]
+        bulk_import_transactions(user=self.user, transactions_data=transactions_data)
+        for row in transactions_data:
+            create_transaction(user=other_user, amount=row['amount'], currency=row['currency'], trans_status=row['trans_status'], category=row['category'], trans_details=row['trans_details'], transaction_date=row['date'], place=row['place'])
+        for month in (1, 2):
+            batch_report = get_monthly_report_for_user(user=self.user, year=2024, month=month)['report_data']
+            row_report = get_monthly_report_for_user(user=other_user, year=2024, month=month)['report_data']
+            self.assertEqual(batch_report, row_report)
+        self.assertEqual(NetWorth.objects.get(user=self.user, place='Bank').total, NetWorth.objects.get(user=other_user, place='Bank').total)
+
+
+    def test_bulk_import_sets_ids_without_bulk_insert_returning(self):
+        """Test created rows get their ids and search tokens on backends that don't return bulk insert rows"""
+        transactions_data = [{'date': '2024-01-15', 'amount': 100, 'currency': 'USD', 'trans_status': 'deposit', 'category': 'Salary', 'trans_details': 'Monthly salary'}, {'date': '2024-01-16', 'amount': 50, 'currency': 'USD', 'trans_status': 'deposit', 'category': 'Bonus', 'trans_details': 'Yearly bonus'}]
+        with patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', new_callable=PropertyMock, return_value=False):
+            results = create_transactions_batch(user=self.user, transactions_data=transactions_data)
+        self.assertEqual([trans.pk for trans in results], list(Transactions.objects.filter(user=self.user).order_by('id').values_list('id', flat=True)))
+        self.assertEqual(TransactionSearchToken.objects.filter(transaction_id__in=[trans.pk for trans in results]).values('transaction_id').distinct().count(), 2)
+
+    def test_batch_locks_only_the_touched_networth_rows(self):
+        """Test the batch only locks the NetWorth rows of the keys it writes"""
+        NetWorth.objects.create(user=self.user, currency='EUR', place='Bank', total=10)
+        with CaptureQueriesContext(connection) as queries:
+            create_transactions_batch(user=self.user, transactions_data=[{'date': '2024-01-15', 'amount': 100, 'currency': 'USD', 'trans_status': 'deposit', 'category': 'Salary', 'trans_details': ''}])
+        networth_reads = [query['sql'] for query in queries.captured_queries if query['sql'].startswith('SELECT') and f'FROM "{NetWorth._meta.db_table}"' in query['sql']]
+        self.assertTrue(networth_reads)
+        self.assertTrue(all('"currency" IN' in sql for sql in networth_reads))
+
+
+class DailyAggregateTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+
+    def _aggregates(self):
+        return list(DailyAggregate.objects.filter(user=self.user, count__gt=0).order_by('date', 'trans_status').values_list('date', 'trans_status', 'total', 'count'))
+
+    def test_services_keep_aggregates_matching_a_rebuild(self):
+        """Test create, update, delete and bulk import maintain the same daily aggregates a rebuild computes"""
+        create_transaction(user=self.user, amount=100, currency='USD', trans_status='deposit', category='Salary', trans_details='', transaction_date=date(2024, 1, 1), place='General')
+        food = create_transaction(user=self.user, amount=30, currency='USD', trans_status='withdraw', category='Food', trans_details='', transaction_date=date(2024, 1, 1), place='General')
+        rent = create_transaction(user=self.user, amount=20, currency='USD', trans_status='withdraw', category='Rent', trans_details='', transaction_date=date(2024, 1, 2), place='General')
+        update_transaction(user=self.user, transaction_id=food.id, amount=40, currency='USD', trans_details='', category='Food', trans_status='withdraw', transaction_date=date(2024, 1, 2), place='General')
+        delete_transaction(user=self.user, transaction_id=rent.id)
+        bulk_import_transactions(user=self.user, transactions_data=[{'date': '2024-01-03', 'amount': 5, 'currency': 'USD', 'trans_status': 'withdraw', 'category': 'Food', 'trans_details': ''}, {'date': '2024-01-03', 'amount': 5, 'currency': 'USD', 'trans_status': 'withdraw', 'category': 'Transfer', 'trans_details': ''}])
+        incremental = self._aggregates()
+        self.assertEqual(incremental, [(date(2024, 1, 1), 'deposit', 100.0, 1), (date(2024, 1, 2), 'withdraw', 40.0, 1), (date(2024, 1, 3), 'withdraw', 5.0, 1)])
+        rebuild_daily_aggregates(self.user)
+        self.assertEqual(self._aggregates(), incremental)
+
+
+class NetWorthSnapshotTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+
+    def _snapshots(self):
+        return list(NetWorthSnapshot.objects.filter(user=self.user).order_by('currency', 'place', 'date').values_list('currency', 'place', 'date', 'balance'))
+
+    def _balances_by_day(self):
+        """Balance of each (currency, place) at the end of Jan 1-4 2024, read from the latest snapshot up to that day."""
+        balances = {}
+        for key in [('USD', 'General'), ('EUR', 'Bank')]:
+            balances[key] = [
+                NetWorthSnapshot.objects.filter(user=self.user, currency=key[0], place=key[1], date__lte=date(2024, 1, day)).order_by('-date').values_list('balance', flat=True).first() or 0.0
+                for day in range(1, 5)
+            ]
+        return balances
+
+    def test_backdated_edit_propagates_forward(self):
+        """Test a transaction dated in the past moves every later snapshot of its balance"""
+        create_transaction(user=self.user, amount=100, currency='USD', trans_status='deposit', category='Salary', trans_details='', transaction_date=date(2024, 1, 1), place='General')
+        create_transaction(user=self.user, amount=30, currency='USD', trans_status='withdraw', category='Food', trans_details='', transaction_date=date(2024, 1, 10), place='General')
+        create_transaction(user=self.user, amount=50, currency='USD', trans_status='deposit', category='Gift', trans_details='', transaction_date=date(2024, 1, 5), place='General')
+        self.assertEqual(self._snapshots(), [('USD', 'General', date(2024, 1, 1), 100.0), ('USD', 'General', date(2024, 1, 5), 150.0), ('USD', 'General', date(2024, 1, 10), 120.0)])
+
+    def test_services_keep_snapshots_matching_a_backfill(self):
+        """Test create, update, delete and bulk import maintain the same snapshots a backfill computes"""
+        create_transaction(user=self.user, amount=100, currency='USD', trans_status='deposit', category='Salary', trans_details='', transaction_date=date(2024, 1, 1), place='General')
+        food = create_transaction(user=self.user, amount=30, currency='USD', trans_status='withdraw', category='Food', trans_details='', transaction_date=date(2024, 1, 3), place='General')
+        rent = create_transaction(user=self.user, amount=20, currency='USD', trans_status='withdraw', category='Rent', trans_details='', transaction_date=date(2024, 1, 4), place='General')
+        create_transaction(user=self.user, amount=70, currency='EUR', trans_status='deposit', category='Salary', trans_details='', transaction_date=date(2024, 1, 2), place='Bank')
+        update_transaction(user=self.user, transaction_id=food.id, amount=40, currency='USD', trans_details='', category='Food', trans_status='withdraw', transaction_date=date(2024, 1, 2), place='General')
+        delete_transaction(user=self.user, transaction_id=rent.id)
+        bulk_import_transactions(user=self.user, transactions_data=[{'date': '2024-01-03', 'amount': 5, 'currency': 'USD', 'trans_status': 'withdraw', 'category': 'Food', 'trans_details': ''}])
+        incremental = self._balances_by_day()
+        backfill_networth_snapshots(self.user)
+        self.assertEqual(self._balances_by_day(), incremental)
+        self.assertEqual(incremental[('USD', 'General')], [100.0, 60.0, 55.0, 55.0])
+        self.assertEqual(incremental[('EUR', 'Bank')], [0.0, 70.0, 70.0, 70.0])
+
+    def test_balance_without_history_starts_from_its_networth_total(self):
+        """Test the first write to a balance from before the history seeds the snapshot from NetWorth"""
+        NetWorth.objects.create(user=self.user, currency='USD', place='General', total=500.0)
+        create_transaction(user=self.user, amount=30, currency='USD', trans_status='withdraw', category='Food', trans_details='', transaction_date=date(2024, 1, 3), place='General')
+        create_transaction(user=self.user, amount=20, currency='USD', trans_status='deposit', category='Gift', trans_details='', transaction_date=date(2024, 1, 5), place='General')
+        self.assertEqual(self._snapshots(), [('USD', 'General', date(2024, 1, 3), 470.0), ('USD', 'General', date(2024, 1, 5), 490.0)])
+
+    def test_batch_without_history_starts_from_its_networth_total(self):
+        """Test a batch over several days seeds a balance without history from its opening NetWorth total"""
+        NetWorth.objects.create(user=self.user, currency='USD', place='General', total=500.0)
+        create_transactions_batch(user=self.user, transactions_data=[
+            {'date': '2024-01-05', 'amount': 20, 'currency': 'USD', 'trans_status': 'deposit', 'category': 'Gift'},
+            {'date': '2024-01-03', 'amount': 30, 'currency': 'USD', 'trans_status': 'withdraw', 'category': 'Food'},
+        ])
+        self.assertEqual(self._snapshots(), [('USD', 'General', date(2024, 1, 3), 470.0), ('USD', 'General', date(2024, 1, 5), 490.0)])
+
+
+class ParseCSVTransactionsTest(TestCase):
+
+    def test_parse_csv_strips_utf8_bom(self):
+        """Test that a UTF-8 BOM does not corrupt the first header"""
+        csv_file = BytesIO(b'\xef\xbb\xbfdate,amount,currency,trans_status\n2024-01-15,100,USD,deposit\n')
+        transactions_data, errors = parse_csv_transactions(csv_file)
+        self.assertEqual(errors, [])
+        self.assertEqual(transactions_data[0]['date'], '2024-01-15')
+
+    def test_parse_csv_utf16_file(self):
+        """Test that UTF-16 exports are decoded from their BOM"""
+        csv_file = BytesIO('date,amount,currency,trans_status,category\n2024-01-15,100,USD,deposit,Café\n'.encode('utf-16'))
+        transactions_data, errors = parse_csv_transactions(csv_file)
+        self.assertEqual(errors, [])
+        self.assertEqual(transactions_data[0]['category'], 'Café')
+
+    def test_iter_csv_batches_respects_batch_size_and_row_limit(self):
+        """Test rows are yielded in fixed-size batches and stop at the row limit"""
+        rows = ''.join(f'2024-01-{(i % 28) + 1:02d},{i + 1},USD,deposit\n' for i in range(12))
+        csv_file = BytesIO(('date,amount,currency,trans_status\n' + rows).encode('utf-8'))
+        errors = ImportErrorLog()
+        batches = list(iter_csv_transaction_batches(csv_file, errors=errors, batch_size=5, max_rows=10))
+        self.assertEqual([len(batch) for batch in batches], [5, 5])
+        self.assertEqual(batches[1][0]['row_num'], 7)
+        self.assertIn('Row limit exceeded', errors.as_list()[0])
+
+    def test_import_error_log_keeps_first_messages(self):
+        """Test the error log keeps a bounded number of messages and counts the rest"""
+        errors = ImportErrorLog(max_messages=2)
+        errors.extend([f'Row {i}: bad' for i in range(5)])
+        self.assertEqual(errors.count, 5)
+        self.assertEqual(errors.as_list(), ['Row 0: bad', 'Row 1: bad', '... and 3 more errors.'])
@@ -1,6 +1,7 @@
 from django.urls import path
 from .apis import (
     TransactionCreateApi,
+    TransactionBatchCreateApi,
     TransactionListApi,
     TransactionUpdateApi,
     TransactionDeleteApi,
@@ -11,6 +12,7 @@ from .apis import (
 
 urlpatterns = [
     path('transaction/add-transactions/', TransactionCreateApi.as_view(), name='add_transactions'),
+    path('transaction/add-transactions-batch/', TransactionBatchCreateApi.as_view(), name='add_transactions_batch'),
     path('transaction/get-transactions/', TransactionListApi.as_view(), name='get_transaction'),
     path('transaction/update-transactions/<int:transaction_id>/', TransactionUpdateApi.as_view(), name='update_transaction'),
     path('transaction/delete-transactions/<int:transaction_id>/', TransactionDeleteApi.as_view(), name='delete_transaction'),
@@ -0,0 +1,115 @@
+from datetime import datetime
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DateField, F, Max, Value
+from django.db.models.functions import Greatest, Lower
+from finance_management.utils.blind_index import category_blind_index
+from transaction_management.models import CategoryUsage, CategoryUsageBuild, Transactions
+
+
+def _usage_key(trans):
+    """(status, category blind index) a transaction is counted under, or None for blank categories."""
+    if getattr(trans, 'is_deleted', False):
+        return None
+    category_index = category_blind_index(trans.category)
+    if not category_index:
+        return None
+    return (trans.trans_status or '').lower(), category_index
+
+
+def _transaction_day(trans):
+    day = trans.date
+    if isinstance(day, str):
+        day = datetime.strptime(day, '%Y-%m-%d').date()
+    elif isinstance(day, datetime):
+        day = day.date()
+    return day
+
+
+def _apply_usage_delta(user, key, count, last_used, category):
+    trans_status, category_index = key
+    rows = CategoryUsage.objects.filter(user=user, trans_status=trans_status, category_index=category_index)
+    if last_used is None:
+        rows.update(count=F('count') + count)
+        return
+
+    changes = {
+        'count': F('count') + count,
+        'last_used': Greatest(F('last_used'), Value(last_used, output_field=DateField())),
+        'category': category,
+    }
+    if rows.update(**changes) or count <= 0:
+        return
+    try:
+        # Savepoint so a concurrent insert of the same key doesn't break the outer transaction
+        with transaction.atomic():
+            CategoryUsage.objects.create(
+                user=user, trans_status=trans_status, category_index=category_index,
+                category=category, count=count, last_used=last_used,
+            )
+    except IntegrityError:
+        rows.update(**changes)
+
+
+def record_category_usage(user, added=(), removed=()):
+    """
+    Count the added transactions' categories and take the removed ones out,
+    one conditional UPDATE per touched (status, category). last_used only
+    moves forward; a rebuild pulls it back after deletions.
+    """
+    deltas = {}
+    for transactions, sign in ((added, 1), (removed, -1)):
+        for trans in transactions:
+            key = _usage_key(trans)
+            if key is None:
+                continue
+            count, last_used, category = deltas.get(key, (0, None, None))
+            if sign > 0:
+                day = _transaction_day(trans)
+                if last_used is None or day >= last_used:
+                    last_used, category = day, trans.category.strip()
+            deltas[key] = (count + sign, last_used, category)
+
+    for key, (count, last_used, category) in deltas.items():
+        if count or last_used is not None:
+            _apply_usage_delta(user, key, count, last_used, category)
+
+
+def rebuild_category_usage(user):
+    """Recompute all of the user's category usage counters from their transactions; returns the rows written."""
+    transactions = Transactions.objects.filter(user=user, is_deleted=False)
+    usages = {}
+    grouped = list(
+        transactions.filter(category_index__isnull=False)
+        .exclude(category_index='')
+        .annotate(status=Lower('trans_status'))
+        .values_list('status', 'category_index')
+        .annotate(count=Count('id'), last_used=Max('date'), sample_id=Max('id'))
+        .order_by()
+    )
+    # Decrypt one row per category for its name
+    names = dict(transactions.filter(id__in=[row[4] for row in grouped]).values_list('id', 'category'))
+    for trans_status, category_index, count, last_used, sample_id in grouped:
+        usages[(trans_status, category_index)] = (count, last_used, (names.get(sample_id) or '').strip())
+
+    # Rows written before the category index backfill are decrypted and grouped here
+    for trans in transactions.filter(category_index__isnull=True).only('date', 'trans_status', 'category'):
+        key = _usage_key(trans)
+        if key is None:
+            continue
+        count, last_used, category = usages.get(key, (0, None, None))
+        day = _transaction_day(trans)
+        if last_used is None or day >= last_used:
+            last_used, category = day, trans.category.strip()
+        usages[key] = (count + 1, last_used, category)
+
+    with transaction.atomic():
+        CategoryUsage.objects.filter(user=user).delete()
+        CategoryUsage.objects.bulk_create([
+            CategoryUsage(
+                user=user, trans_status=trans_status, category_index=category_index,
+                category=category, count=count, last_used=last_used,
+            )
+            for (trans_status, category_index), (count, last_used, category) in usages.items()
+        ], batch_size=1000)
+        CategoryUsageBuild.objects.update_or_create(user=user)
+    return len(usages)
@@ -0,0 +1,44 @@
+import codecs
+import io
+from contextlib import contextmanager
+
+# Bytes inspected to pick an encoding; the rest of the file is never buffered
+SNIFF_SIZE = 64 * 1024
+
+def detect_encoding(head: bytes) -> str:
+    """Pick the text encoding of an uploaded CSV from its first bytes."""
+    # UTF-32 BOMs start with the UTF-16 ones, so check them first
+    if head.startswith((codecs.BOM_UTF32_LE, codecs.BOM_UTF32_BE)):
+        return 'utf-32'
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return 'utf-16'
+    if head.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+
+    try:
+        # final=False tolerates a multi-byte character cut at the end of the sample
+        codecs.getincrementaldecoder('utf-8')().decode(head, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        # Spreadsheet exports on Windows are usually cp1252
+        return 'cp1252'
+
+@contextmanager
+def open_csv_text(file):
+    """
+    Yield a text stream over an uploaded file without reading it into memory.
+    The underlying upload is left open and rewound for later readers.
+    """
+    file.seek(0)
+    head = file.read(SNIFF_SIZE)
+    file.seek(0)
+
+    encoding = detect_encoding(head)
+    raw = file.file if hasattr(file, 'file') else file
+    text_stream = io.TextIOWrapper(raw, encoding=encoding, errors='replace', newline='')
+    try:
+        yield text_stream
+    finally:
+        # Detach so closing the wrapper does not close the upload itself
+        text_stream.detach()
+        file.seek(0)
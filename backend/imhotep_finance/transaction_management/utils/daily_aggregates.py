@@ -0,0 +1,93 @@
+from datetime import datetime
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Lower
+from finance_management.utils.blind_index import REPORT_EXCLUDED_CATEGORIES, excluded_category_indexes, normalize_category
+from transaction_management.models import DailyAggregate, Transactions
+
+AGGREGATE_STATUSES = ('deposit', 'withdraw')
+
+
+def _aggregate_key(trans):
+    """(date, currency, status) a transaction is counted under, or None when reports leave it out."""
+    trans_status = (trans.trans_status or '').lower()
+    if trans_status not in AGGREGATE_STATUSES or getattr(trans, 'is_deleted', False):
+        return None
+    if normalize_category(trans.category) in REPORT_EXCLUDED_CATEGORIES:
+        return None
+    day = trans.date
+    if isinstance(day, str):
+        day = datetime.strptime(day, '%Y-%m-%d').date()
+    elif isinstance(day, datetime):
+        day = day.date()
+    return day, trans.currency, trans_status
+
+
+def _apply_delta(user, key, total, count):
+    day, currency, trans_status = key
+    rows = DailyAggregate.objects.filter(user=user, date=day, currency=currency, trans_status=trans_status)
+    if rows.update(total=F('total') + total, count=F('count') + count):
+        return
+    try:
+        # Savepoint so a concurrent insert of the same key doesn't break the outer transaction
+        with transaction.atomic():
+            DailyAggregate.objects.create(
+                user=user, date=day, currency=currency, trans_status=trans_status, total=total, count=count
+            )
+    except IntegrityError:
+        rows.update(total=F('total') + total, count=F('count') + count)
+
+
+def record_daily_aggregates(user, added=(), removed=()):
+    """
+    Add the added transactions to the user's daily aggregates and take the
+    removed ones out, one conditional UPDATE per touched (date, currency, status).
+    """
+    deltas = {}
+    for transactions, sign in ((added, 1), (removed, -1)):
+        for trans in transactions:
+            key = _aggregate_key(trans)
+            if key is None:
+                continue
+            total, count = deltas.get(key, (0.0, 0))
+            deltas[key] = (total + sign * float(trans.amount), count + sign)
+
+    for key, (total, count) in deltas.items():
+        if total or count:
+            _apply_delta(user, key, total, count)
+
+
+def rebuild_daily_aggregates(user):
+    """Recompute all of the user's daily aggregates from their transactions; returns the rows written."""
+    transactions = Transactions.objects.filter(
+        user=user, is_deleted=False, trans_status__in=['Deposit', 'deposit', 'Withdraw', 'withdraw']
+    )
+    sums = {}
+    grouped = (
+        transactions.filter(category_index__isnull=False)
+        .exclude(category_index__in=excluded_category_indexes())
+        .annotate(status=Lower('trans_status'))
+        .values_list('date', 'currency', 'status')
+        .annotate(total=Sum('amount'), count=Count('id'))
+        .order_by()
+    )
+    for day, currency, trans_status, total, count in grouped:
+        key = (day, currency, trans_status)
+        previous_total, previous_count = sums.get(key, (0.0, 0))
+        sums[key] = (previous_total + float(total or 0), previous_count + count)
+
+    # Rows written before the category index backfill are decrypted and grouped here
+    for trans in transactions.filter(category_index__isnull=True).only('date', 'currency', 'trans_status', 'category', 'amount'):
+        key = _aggregate_key(trans)
+        if key is None:
+            continue
+        previous_total, previous_count = sums.get(key, (0.0, 0))
+        sums[key] = (previous_total + float(trans.amount), previous_count + 1)
+
+    with transaction.atomic():
+        DailyAggregate.objects.filter(user=user).delete()
+        DailyAggregate.objects.bulk_create([
+            DailyAggregate(user=user, date=day, currency=currency, trans_status=trans_status, total=total, count=count)
+            for (day, currency, trans_status), (total, count) in sums.items()
+        ], batch_size=1000)
+    return len(sums)
@@ -0,0 +1,52 @@
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from transaction_management.models import NetWorth
+
+INSUFFICIENT_FUNDS_MESSAGE = "Insufficient funds. You only have {balance} {currency}."
+
+
+def apply_networth_delta(*, user, currency, place, delta, create_missing=True, insufficient_message=INSUFFICIENT_FUNDS_MESSAGE):
+    """
+    Add delta to the user's NetWorth for (currency, place) in a single UPDATE.
+
+    A negative delta only applies while the balance covers it (WHERE total >= -delta),
+    so concurrent writes can neither lose updates nor overdraw the balance. When no
+    row exists a positive delta creates it (create_missing) and a negative one is
+    treated as a zero balance. insufficient_message may use {balance} and {currency}.
+
+    Raises ValidationError on insufficient funds and NetWorth.DoesNotExist when the
+    row is missing and create_missing is False. Call it inside transaction.atomic()
+    so a later failure also rolls the balance back.
+    """
+    delta = float(delta)
+    rows = NetWorth.objects.filter(user=user, currency=currency, place=place)
+    if delta < 0:
+        rows = rows.filter(total__gte=-delta)
+
+    # update() skips auto_now, so bump updated_at for mobile sync ourselves
+    if rows.update(total=F('total') + delta, updated_at=timezone.now()):
+        return
+
+    # Nothing matched: either the row is missing or the balance is too low
+    current = (
+        NetWorth.objects.select_for_update()
+        .filter(user=user, currency=currency, place=place)
+        .values_list('total', flat=True)
+        .first()
+    )
+    if current is None and not create_missing:
+        raise NetWorth.DoesNotExist(f"No net worth record for {currency} at {place}")
+    if delta < 0:
+        balance = current if current is not None else 0.00
+        raise ValidationError(insufficient_message.format(balance=balance, currency=currency))
+
+    try:
+        # Savepoint so a concurrent insert of the same key doesn't break the outer transaction
+        with transaction.atomic():
+            NetWorth.objects.create(user=user, currency=currency, place=place, total=delta)
+    except IntegrityError:
+        NetWorth.objects.filter(user=user, currency=currency, place=place).update(
+            total=F('total') + delta, updated_at=timezone.now()
+        )
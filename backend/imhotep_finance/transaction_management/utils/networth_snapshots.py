@@ -0,0 +1,153 @@
+from datetime import datetime
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from transaction_management.models import NetWorth, NetWorthSnapshot, Transactions
+
+
+def _apply_snapshot_delta(user, currency, place, day, delta, opening=0.0):
+    """
+    Add delta to the balance of (currency, place) from day onwards: the
+    snapshots after day move with one UPDATE, and day gets its own snapshot
+    starting from the balance it had before, or from opening when no earlier
+    snapshot exists.
+    """
+    snapshots = NetWorthSnapshot.objects.filter(user=user, currency=currency, place=place)
+    snapshots.filter(date__gt=day).update(balance=F('balance') + delta)
+    if snapshots.filter(date=day).update(balance=F('balance') + delta):
+        return
+
+    previous = snapshots.filter(date__lt=day).order_by('-date').values_list('balance', flat=True).first()
+    try:
+        # Savepoint so a concurrent insert of the same day doesn't break the outer transaction
+        with transaction.atomic():
+            NetWorthSnapshot.objects.create(
+                user=user, currency=currency, place=place, date=day,
+                balance=(opening if previous is None else previous) + delta,
+            )
+    except IntegrityError:
+        snapshots.filter(date=day).update(balance=F('balance') + delta)
+
+
+def _opening_balances(user, deltas):
+    """
+    {(currency, place): balance before the deltas} of the touched balances
+    without any snapshot yet, e.g. balances from before the history existed.
+
+    Read from NetWorth, which the callers have already moved by the deltas.
+    """
+    keys = {(currency, place) for currency, place, _ in deltas}
+    recorded = set(
+        NetWorthSnapshot.objects.filter(
+            user=user,
+            currency__in={currency for currency, _ in keys},
+            place__in={place for _, place in keys},
+        ).values_list('currency', 'place').distinct()
+    )
+    missing = keys - recorded
+    if not missing:
+        return {}
+
+    openings = {key: 0.0 for key in missing}
+    totals = NetWorth.objects.filter(
+        user=user,
+        is_deleted=False,
+        currency__in={currency for currency, _ in missing},
+        place__in={place for _, place in missing},
+    ).values_list('currency', 'place', 'total')
+    for currency, place, total in totals:
+        if (currency, place) in openings:
+            openings[(currency, place)] = float(total)
+    for (currency, place, _), delta in deltas.items():
+        if (currency, place) in openings:
+            openings[(currency, place)] -= float(delta)
+    return openings
+
+
+def record_networth_snapshots(user, deltas):
+    """
+    Apply {(currency, place, day): delta} to the user's net worth history,
+    backdated days included. Call it after NetWorth took the deltas: a balance
+    without history starts from its NetWorth total less the deltas.
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    openings = _opening_balances(user, deltas)
+    for (currency, place, day), delta in deltas.items():
+        _apply_snapshot_delta(user, currency, place, day, float(delta), openings.get((currency, place), 0.0))
+
+
+def clear_networth_snapshots(user, currency, place):
+    """Bring the history of a removed (currency, place) to zero from today, keeping its past balances."""
+    latest = (
+        NetWorthSnapshot.objects.filter(user=user, currency=currency, place=place)
+        .order_by('-date').values_list('balance', flat=True).first()
+    )
+    if latest:
+        _apply_snapshot_delta(user, currency, place, timezone.localdate(), -float(latest))
+
+
+def record_transaction_snapshots(user, added=(), removed=()):
+    """
+    Move the user's net worth history by the added transactions and back out
+    the removed ones, dated on each transaction's own day.
+    """
+    deltas = {}
+    for transactions, sign in ((added, 1), (removed, -1)):
+        for trans in transactions:
+            if getattr(trans, 'is_deleted', False):
+                continue
+            day = trans.date
+            if isinstance(day, str):
+                day = datetime.strptime(day, '%Y-%m-%d').date()
+            elif isinstance(day, datetime):
+                day = day.date()
+            amount = float(trans.amount)
+            delta = amount if trans.trans_status.lower() == 'deposit' else -amount
+            key = (trans.currency, trans.place or 'General', day)
+            deltas[key] = deltas.get(key, 0.0) + sign * delta
+    record_networth_snapshots(user, deltas)
+
+
+def backfill_networth_snapshots(user):
+    """
+    Rebuild the user's net worth history from their transactions in one
+    ordered pass; returns the snapshots written.
+
+    Balances that NetWorth holds beyond what the transactions explain (opening
+    balances, mobile edits) are added to the whole history of their
+    (currency, place), so the latest snapshot matches the current total.
+    """
+    balances = {}
+    snapshots = {}
+    rows = (
+        Transactions.objects.filter(user=user, is_deleted=False)
+        .order_by('date', 'id')
+        .values_list('date', 'currency', 'place', 'trans_status', 'amount')
+    )
+    for day, currency, place, trans_status, amount in rows.iterator(chunk_size=2000):
+        key = (currency, place or 'General')
+        delta = float(amount) if trans_status.lower() == 'deposit' else -float(amount)
+        balances[key] = balances.get(key, 0.0) + delta
+        snapshots[(key, day)] = balances[key]
+
+    today = timezone.localdate()
+    offsets = {}
+    for currency, place, total, created_at in NetWorth.objects.filter(user=user).values_list('currency', 'place', 'total', 'created_at'):
+        key = (currency, place or 'General')
+        if key in balances:
+            offsets[key] = float(total) - balances[key]
+        else:
+            snapshots[(key, min(timezone.localtime(created_at).date(), today))] = float(total)
+
+    with transaction.atomic():
+        NetWorthSnapshot.objects.filter(user=user).delete()
+        NetWorthSnapshot.objects.bulk_create([
+            NetWorthSnapshot(
+                user=user, currency=currency, place=place, date=day,
+                balance=balance + offsets.get((currency, place), 0.0),
+            )
+            for ((currency, place), day), balance in snapshots.items()
+        ], batch_size=1000)
+    return len(snapshots)
@@ -0,0 +1,51 @@
+from django.db import transaction
+from finance_management.utils.blind_index import keyed_hash
+from transaction_management.models import Transactions, TransactionSearchToken
+
+# Shortest search that can use the index; shorter terms fall back to scanning
+SEARCH_GRAM_SIZE = 3
+# Hex characters of the HMAC kept per token (collisions only add candidates)
+SEARCH_TOKEN_LENGTH = 16
+
+
+def details_trigrams(text):
+    """Return the distinct lower-cased trigrams of a text (spaces included, so any substring is covered)."""
+    text = (text or "").lower()
+    return {text[i:i + SEARCH_GRAM_SIZE] for i in range(len(text) - SEARCH_GRAM_SIZE + 1)}
+
+
+def hash_search_token(gram, user_id):
+    # Keyed per user so equal trigrams of different users never share a token
+    return keyed_hash(gram, f"details:{user_id}")[:SEARCH_TOKEN_LENGTH]
+
+
+def search_tokens_for_query(details_search, user_id):
+    """Hashed trigrams every matching transaction of the user must have, or None if the term is too short to index."""
+    grams = details_trigrams(details_search)
+    if not grams:
+        return None
+    return sorted({hash_search_token(gram, user_id) for gram in grams})
+
+
+def index_transaction_details(transactions):
+    """(Re)write the search tokens of the given saved transactions."""
+    transactions = [trans for trans in transactions if trans.pk]
+    if not transactions:
+        return 0
+
+    ids = [trans.pk for trans in transactions]
+    tokens = [
+        TransactionSearchToken(user_id=trans.user_id, transaction_id=trans.pk, token=token)
+        for trans in transactions
+        for token in {hash_search_token(gram, trans.user_id) for gram in details_trigrams(trans.trans_details)}
+    ]
+
+    with transaction.atomic():
+        TransactionSearchToken.objects.filter(transaction_id__in=ids).delete()
+        TransactionSearchToken.objects.bulk_create(tokens, batch_size=1000)
+        # update() leaves updated_at alone, so mobile sync doesn't see a change
+        Transactions.objects.filter(id__in=ids).update(details_indexed=True)
+
+    for trans in transactions:
+        trans.details_indexed = True
+    return len(tokens)
@@ -1,6 +1,7 @@
 
 from django.contrib import admin
 from .models import Reports
+from .utils.report_lines import load_reports_data
 from unfold.admin import ModelAdmin
 
 @admin.register(Reports)
@@ -47,55 +48,26 @@ class ReportsAdmin(ModelAdmin):
         return f"{months[obj.month - 1]} {obj.year}"
     get_month_year.short_description = 'Period'
     
+    def _report_data(self, obj):
+        """Report dict of the row, read from its report lines or its legacy JSON data"""
+        return load_reports_data(obj.user, [obj])[(obj.year, obj.month)]
+
     def get_total_deposit(self, obj):
         """Display total deposit from report data"""
-        if obj.data:
-            # If data is encrypted string, parse it as JSON
-            if isinstance(obj.data, str):
-                import json
-                try:
-                    data = json.loads(obj.data)
-                except json.JSONDecodeError:
-                    return "Error parsing data"
-            else:
-                data = obj.data
-            return data.get('total_deposit', 0)
-        return 0
+        return self._report_data(obj).get('total_deposit', 0)
     get_total_deposit.short_description = 'Total Income'
     
     def get_total_withdraw(self, obj):
         """Display total withdraw from report data"""
-        if obj.data:
-            # If data is encrypted string, parse it as JSON
-            if isinstance(obj.data, str):
-                import json
-                try:
-                    data = json.loads(obj.data)
-                except json.JSONDecodeError:
-                    return "Error parsing data"
-            else:
-                data = obj.data
-            return data.get('total_withdraw', 0)
-        return 0
+        return self._report_data(obj).get('total_withdraw', 0)
     get_total_withdraw.short_description = 'Total Expenses'
     
     def get_net_difference(self, obj):
-        if obj.data:
-            # If data is encrypted string, parse it as JSON
-            if isinstance(obj.data, str):
-                import json
-                try:
-                    data = json.loads(obj.data)
-                except json.JSONDecodeError:
-                    return "Error parsing data"
-            else:
-                data = obj.data
-            
-            deposit = data.get('total_deposit', 0)
-            withdraw = data.get('total_withdraw', 0)
-            difference = deposit - withdraw
-            currency = data.get('favorite_currency', 'USD')
-            symbol = "+" if difference >= 0 else "-"
-            return f"{symbol}{abs(difference):.2f} {currency}"
-        return "0.00"
+        data = self._report_data(obj)
+        deposit = data.get('total_deposit', 0)
+        withdraw = data.get('total_withdraw', 0)
+        difference = deposit - withdraw
+        currency = data.get('favorite_currency', 'USD')
+        symbol = "+" if difference >= 0 else "-"
+        return f"{symbol}{abs(difference):.2f} {currency}"
     get_net_difference.short_description = 'Net Difference'
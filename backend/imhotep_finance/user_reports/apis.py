@@ -13,6 +13,10 @@ from user_reports.services import (
     get_monthly_report_for_user,
     get_report_history_years_for_user,
     get_yearly_report_for_user,
+    get_multi_year_report_for_user,
+    get_range_report_for_user,
+    get_time_series_for_user,
+    get_networth_series_for_user,
     recalculate_all_reports_for_user
 )
 from user_reports.serializers import (
@@ -22,10 +26,20 @@ from user_reports.serializers import (
     YearQuerySerializer,
     ReportHistoryYearsResponseSerializer,
     YearlyReportResponseSerializer,
-    RecalculateReportsResponseSerializer
+    MultiYearQuerySerializer,
+    MultiYearReportResponseSerializer,
+    DateRangeQuerySerializer,
+    RangeReportResponseSerializer,
+    TimeSeriesQuerySerializer,
+    TimeSeriesResponseSerializer,
+    NetWorthSeriesResponseSerializer,
+    RecalculateReportsResponseSerializer,
+    RecalculateProgressResponseSerializer
 )
 from rest_framework.exceptions import ValidationError as DRFValidationError
 from imhotep_finance.throttles import ReportGenerationRateThrottle
+from finance_management.utils.user_cache import cached_user_response
+from user_reports.utils.report_progress import get_recalculation_progress
 
 @method_decorator(csrf_exempt, name='dispatch')
 class ReportHistoryMonthsApi(APIView):
@@ -44,7 +58,10 @@ class ReportHistoryMonthsApi(APIView):
     def get(self, request):
         """Return available report months/years for the logged-in user."""
         try:
-            report_history = get_report_history_months_for_user(user=request.user)
+            report_history = cached_user_response(
+                request.user, 'report_history_months',
+                lambda: get_report_history_months_for_user(user=request.user)
+            )
             
             if not report_history:
                 return Response(
@@ -150,7 +167,10 @@ class ReportHistoryYearsApi(APIView):
     def get(self, request):
         """Return available report years for the logged-in user."""
         try:
-            report_years = get_report_history_years_for_user(user=request.user)
+            report_years = cached_user_response(
+                request.user, 'report_history_years',
+                lambda: get_report_history_years_for_user(user=request.user)
+            )
             
             if not report_years:
                 return Response(
@@ -228,10 +248,262 @@ class YearlyReportApi(APIView):
             )
 
 
+@method_decorator(csrf_exempt, name='dispatch')
+class MultiYearReportApi(APIView):
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [ReportGenerationRateThrottle]
+    
+    @extend_schema(
+        tags=['Reports'],
+        parameters=[
+            OpenApiParameter(
+                name='years',
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description='Number of years up to the current one (e.g., 3). All time if not provided.',
+                required=False
+            )
+        ],
+        responses={
+            200: MultiYearReportResponseSerializer,
+            400: 'Invalid years',
+            404: 'No reports for the selected years',
+            429: 'Rate limit exceeded',
+            500: 'Internal server error'
+        },
+        description='Get a report aggregated over the last N years, or all time, from the yearly rollups.',
+        operation_id='get_multi_year_report'
+    )
+    def get(self, request):
+        """Return the report aggregated over several years for the logged-in user."""
+        try:
+            query_serializer = MultiYearQuerySerializer(data=request.query_params)
+            query_serializer.is_valid(raise_exception=True)
+            
+            report_response = get_multi_year_report_for_user(
+                user=request.user,
+                years=query_serializer.validated_data.get('years')
+            )
+            
+            return Response(report_response, status=status.HTTP_200_OK)
+            
+        except DRFValidationError as e:
+            return Response({'error': e.detail}, status=status.HTTP_400_BAD_REQUEST)
+        except ValidationError as e:
+            error_msg = str(e)
+            if "not found" in error_msg.lower() or "no reports" in error_msg.lower():
+                return Response({'error': error_msg}, status=status.HTTP_404_NOT_FOUND)
+            return Response({'error': error_msg}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            print(f"Multi-year report error: {str(e)}")
+            return Response(
+                {'error': 'Error in retrieving multi-year report'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class RangeReportApi(APIView):
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [ReportGenerationRateThrottle]
+    
+    @extend_schema(
+        tags=['Reports'],
+        parameters=[
+            OpenApiParameter(
+                name='start_date',
+                type=OpenApiTypes.DATE,
+                location=OpenApiParameter.QUERY,
+                description='First day of the range (YYYY-MM-DD)',
+                required=True
+            ),
+            OpenApiParameter(
+                name='end_date',
+                type=OpenApiTypes.DATE,
+                location=OpenApiParameter.QUERY,
+                description='Last day of the range (YYYY-MM-DD)',
+                required=True
+            )
+        ],
+        responses={
+            200: RangeReportResponseSerializer,
+            400: 'Invalid date range',
+            429: 'Rate limit exceeded',
+            500: 'Internal server error'
+        },
+        description='Get the category and place report of any date range, such as a quarter or the last 90 days.',
+        operation_id='get_range_report'
+    )
+    def get(self, request):
+        """Return the report of a date range for the logged-in user."""
+        try:
+            query_serializer = DateRangeQuerySerializer(data=request.query_params)
+            query_serializer.is_valid(raise_exception=True)
+            
+            report_response = get_range_report_for_user(
+                user=request.user,
+                start_date=query_serializer.validated_data['start_date'],
+                end_date=query_serializer.validated_data['end_date']
+            )
+            
+            return Response(report_response, status=status.HTTP_200_OK)
+            
+        except DRFValidationError as e:
+            return Response({'error': e.detail}, status=status.HTTP_400_BAD_REQUEST)
+        except ValidationError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            print(f"Range report error: {str(e)}")
+            return Response(
+                {'error': 'Error in retrieving range report'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class TimeSeriesApi(APIView):
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [ReportGenerationRateThrottle]
+    
+    @extend_schema(
+        tags=['Reports'],
+        parameters=[
+            OpenApiParameter(
+                name='start_date',
+                type=OpenApiTypes.DATE,
+                location=OpenApiParameter.QUERY,
+                description='First day of the series (YYYY-MM-DD)',
+                required=True
+            ),
+            OpenApiParameter(
+                name='end_date',
+                type=OpenApiTypes.DATE,
+                location=OpenApiParameter.QUERY,
+                description='Last day of the series (YYYY-MM-DD)',
+                required=True
+            ),
+            OpenApiParameter(
+                name='bucket',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description='day, week or month. Defaults to day.',
+                required=False
+            )
+        ],
+        responses={
+            200: TimeSeriesResponseSerializer,
+            400: 'Invalid parameters or range too long for the bucket',
+            429: 'Rate limit exceeded',
+            500: 'Internal server error'
+        },
+        description='Get deposits and withdrawals per day, week or month in the favorite currency, for charts.',
+        operation_id='get_time_series'
+    )
+    def get(self, request):
+        """Return the deposit and withdraw series of the logged-in user."""
+        try:
+            query_serializer = TimeSeriesQuerySerializer(data=request.query_params)
+            query_serializer.is_valid(raise_exception=True)
+            
+            series_response = cached_user_response(
+                request.user, 'time_series',
+                lambda: get_time_series_for_user(user=request.user, **query_serializer.validated_data),
+                params=query_serializer.validated_data
+            )
+            
+            return Response(series_response, status=status.HTTP_200_OK)
+            
+        except DRFValidationError as e:
+            return Response({'error': e.detail}, status=status.HTTP_400_BAD_REQUEST)
+        except ValidationError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            print(f"Time series error: {str(e)}")
+            return Response(
+                {'error': 'Error in retrieving time series'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class NetWorthSeriesApi(APIView):
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [ReportGenerationRateThrottle]
+    
+    @extend_schema(
+        tags=['Reports'],
+        parameters=[
+            OpenApiParameter(
+                name='start_date',
+                type=OpenApiTypes.DATE,
+                location=OpenApiParameter.QUERY,
+                description='First day of the series (YYYY-MM-DD)',
+                required=True
+            ),
+            OpenApiParameter(
+                name='end_date',
+                type=OpenApiTypes.DATE,
+                location=OpenApiParameter.QUERY,
+                description='Last day of the series (YYYY-MM-DD)',
+                required=True
+            ),
+            OpenApiParameter(
+                name='bucket',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description='day, week or month. Defaults to day.',
+                required=False
+            )
+        ],
+        responses={
+            200: NetWorthSeriesResponseSerializer,
+            400: 'Invalid parameters or range too long for the bucket',
+            429: 'Rate limit exceeded',
+            500: 'Internal server error'
+        },
+        description='Get the net worth at the end of each day, week or month in the favorite currency, for charts.',
+        operation_id='get_networth_series'
+    )
+    def get(self, request):
+        """Return the net worth series of the logged-in user."""
+        try:
+            query_serializer = TimeSeriesQuerySerializer(data=request.query_params)
+            query_serializer.is_valid(raise_exception=True)
+            
+            series_response = cached_user_response(
+                request.user, 'networth_series',
+                lambda: get_networth_series_for_user(user=request.user, **query_serializer.validated_data),
+                params=query_serializer.validated_data
+            )
+            
+            return Response(series_response, status=status.HTTP_200_OK)
+            
+        except DRFValidationError as e:
+            return Response({'error': e.detail}, status=status.HTTP_400_BAD_REQUEST)
+        except ValidationError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            print(f"Net worth series error: {str(e)}")
+            return Response(
+                {'error': 'Error in retrieving net worth series'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
 @method_decorator(csrf_exempt, name='dispatch')
 class RecalculateReportsApi(APIView):
     permission_classes = [IsAuthenticated]
     
+    @extend_schema(
+        tags=['Reports'],
+        responses={200: RecalculateProgressResponseSerializer},
+        description='Poll the progress of the running or last report recalculation (stage, months done out of total).',
+        operation_id='recalculate_reports_progress'
+    )
+    def get(self, request):
+        """Return the progress of the user's running or last report recalculation."""
+        return Response(get_recalculation_progress(request.user), status=status.HTTP_200_OK)
+
     @extend_schema(
         tags=['Reports'],
         responses={
@@ -272,46 +544,9 @@ class NetWorthByPlaceApi(APIView):
     def get(self, request):
         """Return the current wealth distribution by place in the favorite currency."""
         try:
-            from transaction_management.models import NetWorth
-            from finance_management.utils.currencies import convert_to_fav_currency
-            
             user = request.user
-            networth_db = NetWorth.objects.filter(user=user)
-            
-            # group by place and currency
-            places = {}
-            for i in networth_db:
-                place = i.place or 'General'
-                currency = i.currency
-                total = i.total or 0.0
-                
-                if place not in places:
-                    places[place] = {}
-                    
-                places[place][currency] = places[place].get(currency, 0) + float(total)
-                
-            # convert to favorite currency
-            result = []
-            total_wealth = 0.0
-            for place, currencies in places.items():
-                converted_total, _ = convert_to_fav_currency(user, currencies)
-                converted_total = float(converted_total) if converted_total else 0.0
-                total_wealth += converted_total
-                result.append({
-                    'place': place,
-                    'converted_amount': converted_total
-                })
-                
-            # calculate percentage
-            for r in result:
-                r['percentage'] = round((r['converted_amount'] / total_wealth) * 100, 1) if total_wealth > 0 else 0
-                
-            result.sort(key=lambda x: x['percentage'], reverse=True)
-            
-            return Response({
-                'networth_by_place': result,
-                'favorite_currency': user.favorite_currency or 'USD'
-            }, status=status.HTTP_200_OK)
+            response_data = cached_user_response(user, 'networth_by_place', lambda: self._compute(user))
+            return Response(response_data, status=status.HTTP_200_OK)
             
         except Exception as e:
             print(f"Net worth by place error: {str(e)}")
@@ -319,3 +554,40 @@ class NetWorthByPlaceApi(APIView):
                 {'error': f'Error in retrieving net worth by place: {str(e)}'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+
+    def _compute(self, user):
+        """Group the user's NetWorth rows by place and convert each place to the favorite currency."""
+        from transaction_management.models import NetWorth
+        from finance_management.utils.currencies import convert_amounts_to_fav_currency
+
+        networth_db = list(NetWorth.objects.filter(user=user).values_list('place', 'currency', 'total'))
+
+        # convert every balance to favorite currency in one batch
+        converted, _ = convert_amounts_to_fav_currency(
+            user,
+            [total or 0.0 for _, _, total in networth_db],
+            [currency for _, currency, _ in networth_db],
+        )
+
+        # group by place
+        places = {}
+        for (place, _, _), converted_amount in zip(networth_db, converted):
+            place = place or 'General'
+            places[place] = places.get(place, 0.0) + (converted_amount or 0.0)
+
+        result = [
+            {'place': place, 'converted_amount': converted_total}
+            for place, converted_total in places.items()
+        ]
+        total_wealth = sum(places.values())
+            
+        # calculate percentage
+        for r in result:
+            r['percentage'] = round((r['converted_amount'] / total_wealth) * 100, 1) if total_wealth > 0 else 0
+            
+        result.sort(key=lambda x: x['percentage'], reverse=True)
+        
+        return {
+            'networth_by_place': result,
+            'favorite_currency': user.favorite_currency or 'USD'
+        }
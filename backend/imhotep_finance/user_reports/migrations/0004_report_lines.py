@@ -0,0 +1,40 @@
+# Generated by Django 5.2.14 on 2026-10-18 18:40
+
+import django.db.models.deletion
+import encrypted_model_fields.fields
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_reports', '0003_alter_reports_data'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reports',
+            name='uses_lines',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name='ReportLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.IntegerField()),
+                ('month', models.IntegerField()),
+                ('trans_status', models.CharField(max_length=10)),
+                ('dimension', models.CharField(choices=[('total', 'Total'), ('category', 'Category'), ('place', 'Place')], max_length=10)),
+                ('key_index', models.CharField(blank=True, default='', max_length=64)),
+                ('key', encrypted_model_fields.fields.EncryptedCharField(blank=True, default='')),
+                ('amount', models.FloatField(default=0.0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='report_lines', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'year', 'month'], name='report_line_user_month_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'year', 'month', 'trans_status', 'dimension', 'key_index'), name='unique_report_line')],
+            },
+        ),
+    ]
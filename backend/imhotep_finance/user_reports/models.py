@@ -1,6 +1,6 @@
 from django.db import models
 from accounts.models import User
-from encrypted_model_fields.fields import EncryptedTextField
+from encrypted_model_fields.fields import EncryptedTextField, EncryptedCharField
 
 # Create your models here.
 class Reports(models.Model):
@@ -9,6 +9,8 @@ class Reports(models.Model):
     month = models.IntegerField()
     year = models.IntegerField()
     data = EncryptedTextField()
+    # True once the month's amounts live in ReportLine rows; data is then left as "{}"
+    uses_lines = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     
     def __str__(self):
@@ -18,4 +20,58 @@ class Reports(models.Model):
         db_table = 'finance_management_reports'
         verbose_name = "Report"
         verbose_name_plural = "Reports"
-        ordering = ['-created_at']
\ No newline at end of file
+        ordering = ['-created_at']
+
+
+class ReportLine(models.Model):
+    """One running amount of a monthly report: a status total, or one category or place of it."""
+    DIMENSION_CHOICES = [
+        ('total', 'Total'),
+        ('category', 'Category'),
+        ('place', 'Place'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='report_lines')
+    year = models.IntegerField()
+    month = models.IntegerField()
+    trans_status = models.CharField(max_length=10)
+    dimension = models.CharField(max_length=10, choices=DIMENSION_CHOICES)
+    # Keyed hash of key so the upsert can match it in SQL; empty for totals
+    key_index = models.CharField(max_length=64, blank=True, default='')
+    key = EncryptedCharField(max_length=255, blank=True, default='')
+    amount = models.FloatField(default=0.0)
+
+    def __str__(self):
+        return f"{self.user.username} {self.month}/{self.year} {self.trans_status} {self.dimension}: {self.amount}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'year', 'month', 'trans_status', 'dimension', 'key_index'],
+                name='unique_report_line',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'year', 'month'], name='report_line_user_month_idx'),
+        ]
+
+
+class YearlyReport(models.Model):
+    """
+    Header of a year's rollup. The rolled up amounts are ReportLine rows with
+    month=0; they follow the monthly deltas and are rebuilt from the monthly
+    lines whenever is_stale is set.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='yearly_reports')
+    year = models.IntegerField()
+    months_included = models.IntegerField(default=0)
+    is_stale = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Yearly report of {self.user.username} - {self.year}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'year'], name='unique_yearly_report'),
+        ]
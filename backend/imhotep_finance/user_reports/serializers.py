@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from user_reports.utils.time_series import TIME_SERIES_MAX_SPAN_DAYS
 
 
 class MonthYearSerializer(serializers.Serializer):
@@ -78,6 +79,103 @@ class YearlyReportResponseSerializer(serializers.Serializer):
     months_included = serializers.IntegerField()
 
 
+class MultiYearQuerySerializer(serializers.Serializer):
+    years = serializers.IntegerField(
+        required=False,
+        allow_null=True,
+        min_value=1,
+        help_text="Number of years up to the current one. All time if not provided."
+    )
+
+
+class MultiYearReportResponseSerializer(serializers.Serializer):
+    user_withdraw_on_range = CategoryBreakdownSerializer(many=True)
+    user_deposit_on_range = CategoryBreakdownSerializer(many=True)
+    total_withdraw = serializers.DecimalField(max_digits=15, decimal_places=2)
+    total_deposit = serializers.DecimalField(max_digits=15, decimal_places=2)
+    current_month = serializers.CharField()
+    favorite_currency = serializers.CharField()
+    years = serializers.ListField(child=serializers.IntegerField())
+    months_included = serializers.IntegerField()
+
+
+class DateRangeQuerySerializer(serializers.Serializer):
+    start_date = serializers.DateField(help_text="First day of the range (YYYY-MM-DD)")
+    end_date = serializers.DateField(help_text="Last day of the range (YYYY-MM-DD)")
+
+    def validate(self, data):
+        if data['start_date'] > data['end_date']:
+            raise serializers.ValidationError("Start date must be before end date")
+        return data
+
+
+class PlaceBreakdownSerializer(serializers.Serializer):
+    place = serializers.CharField()
+    converted_amount = serializers.DecimalField(max_digits=15, decimal_places=2)
+    percentage = serializers.DecimalField(max_digits=5, decimal_places=2)
+
+
+class RangeReportResponseSerializer(serializers.Serializer):
+    user_withdraw_on_range = CategoryBreakdownSerializer(many=True)
+    user_deposit_on_range = CategoryBreakdownSerializer(many=True)
+    user_withdraw_by_place = PlaceBreakdownSerializer(many=True)
+    user_deposit_by_place = PlaceBreakdownSerializer(many=True)
+    total_withdraw = serializers.DecimalField(max_digits=15, decimal_places=2)
+    total_deposit = serializers.DecimalField(max_digits=15, decimal_places=2)
+    current_month = serializers.CharField()
+    favorite_currency = serializers.CharField()
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+
+
+class TimeSeriesQuerySerializer(DateRangeQuerySerializer):
+    bucket = serializers.ChoiceField(
+        choices=['day', 'week', 'month'],
+        default='day',
+        help_text="Size of each point of the series"
+    )
+
+    def validate(self, data):
+        data = super().validate(data)
+        max_span = TIME_SERIES_MAX_SPAN_DAYS[data['bucket']]
+        if (data['end_date'] - data['start_date']).days >= max_span:
+            raise serializers.ValidationError(
+                f"A {data['bucket']} series can span at most {max_span} days"
+            )
+        return data
+
+
+class TimeSeriesPointSerializer(serializers.Serializer):
+    period_start = serializers.DateField()
+    deposit = serializers.DecimalField(max_digits=15, decimal_places=2)
+    withdraw = serializers.DecimalField(max_digits=15, decimal_places=2)
+    net = serializers.DecimalField(max_digits=15, decimal_places=2)
+    deposit_count = serializers.IntegerField()
+    withdraw_count = serializers.IntegerField()
+
+
+class TimeSeriesResponseSerializer(serializers.Serializer):
+    bucket = serializers.CharField()
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+    favorite_currency = serializers.CharField()
+    series = TimeSeriesPointSerializer(many=True)
+
+
+class NetWorthPointSerializer(serializers.Serializer):
+    period_start = serializers.DateField()
+    period_end = serializers.DateField()
+    net_worth = serializers.DecimalField(max_digits=15, decimal_places=2)
+
+
+class NetWorthSeriesResponseSerializer(serializers.Serializer):
+    bucket = serializers.CharField()
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+    favorite_currency = serializers.CharField()
+    series = NetWorthPointSerializer(many=True)
+
+
 class ProcessedMonthSerializer(serializers.Serializer):
     month = serializers.IntegerField()
     year = serializers.IntegerField()
@@ -105,3 +203,10 @@ class RecalculateReportsResponseSerializer(serializers.Serializer):
         required=False,
         allow_null=True
     )
+
+
+class RecalculateProgressResponseSerializer(serializers.Serializer):
+    stage = serializers.ChoiceField(choices=['idle', 'calculating', 'saving', 'completed', 'failed'])
+    done = serializers.IntegerField()
+    total = serializers.IntegerField()
+    updated_at = serializers.DateTimeField(allow_null=True)
@@ -1,11 +1,18 @@
 from django.core.exceptions import ValidationError
-from user_reports.models import Reports
+from user_reports.models import Reports, ReportLine, YearlyReport
 from datetime import date
 import calendar
-import json
 from transaction_management.models import Transactions
-from .utils.calculate_user_report import calculate_user_report
+from .utils.calculate_user_report import calculate_user_report, calculate_monthly_reports
 from .utils.save_user_report import save_user_report
+from .utils.report_lines import load_reports_data, report_lines_from_data
+from .utils.report_rollups import load_rollup_report
+from .utils.range_report import calculate_range_report
+from .utils.time_series import TIME_SERIES_BUCKETS, build_networth_series, build_time_series
+from .utils.report_progress import set_recalculation_progress
+from django.db import transaction as db_transaction
+from django.db.models import Min, Max
+from finance_management.utils.user_cache import bump_user_data_version
 
 def get_report_history_months_for_user(*, user):
     """Get available report months/years for a user."""
@@ -46,7 +53,7 @@ def get_monthly_report_for_user(*, user, month, year):
         raise ValidationError("No report found for the specified month and year")
     
     # Calculate and save report data if it doesn't exist or is empty
-    if not user_report.data or user_report.data.strip() in ['{}', '']:
+    if not user_report.uses_lines and (not user_report.data or user_report.data.strip() in ['{}', '']):
         try:
             # Create date objects for the first and last day of the month
             start_date = date(year, month, 1)
@@ -79,13 +86,7 @@ def get_monthly_report_for_user(*, user, month, year):
         except Exception as e:
             raise ValidationError(f"Error calculating report: {str(e)}")
     
-    # Parse encrypted data if it's a string (EncryptedTextField returns decrypted string)
-    report_data = user_report.data
-    if isinstance(report_data, str):
-        try:
-            report_data = json.loads(report_data)
-        except json.JSONDecodeError:
-            raise ValidationError("Error parsing report data")
+    report_data = load_reports_data(user, [user_report])[(year, month)]
     
     # Sort the data by percentage in descending order
     if isinstance(report_data, dict):
@@ -141,127 +142,186 @@ def get_yearly_report_for_user(*, user, year=None):
     else:
         year = now.year
     
-    # Get all monthly reports for the specified year
-    monthly_reports = Reports.objects.filter(user=user, year=year).order_by('month')
-    
-    if not monthly_reports.exists():
+    # Served from the year's rollup, rebuilt from the monthly lines only when it is stale
+    report_data, months_by_year = load_rollup_report(user, [year])
+    months_included = months_by_year[year]
+    if not months_included:
         raise ValidationError(f"No reports found for year {year}")
     
-    # Aggregate data from all monthly reports
-    total_withdraw = 0.0
-    total_deposit = 0.0
-    withdraw_categories = {}
-    deposit_categories = {}
-    withdraw_places = {}
-    deposit_places = {}
-    
-    for monthly_report in monthly_reports:
-        data = monthly_report.data
-        
-        # Parse encrypted data if it's a string (EncryptedTextField returns decrypted string)
-        if isinstance(data, str):
-            try:
-                data = json.loads(data)
-            except json.JSONDecodeError:
-                continue  # Skip this report if data can't be parsed
-        
-        # Add to yearly totals
-        total_withdraw += data.get('total_withdraw', 0)
-        total_deposit += data.get('total_deposit', 0)
-        
-        # Aggregate withdraw categories
-        for item in data.get('user_withdraw_on_range', []):
-            category = item['category']
-            amount = item['converted_amount']
-            withdraw_categories[category] = withdraw_categories.get(category, 0) + amount
-        
-        # Aggregate deposit categories
-        for item in data.get('user_deposit_on_range', []):
-            category = item['category']
-            amount = item['converted_amount']
-            deposit_categories[category] = deposit_categories.get(category, 0) + amount
-            
-        # Aggregate withdraw places
-        for item in data.get('user_withdraw_by_place', []):
-            place = item['place']
-            amount = item['converted_amount']
-            withdraw_places[place] = withdraw_places.get(place, 0) + amount
-            
-        # Aggregate deposit places
-        for item in data.get('user_deposit_by_place', []):
-            place = item['place']
-            amount = item['converted_amount']
-            deposit_places[place] = deposit_places.get(place, 0) + amount
-    
-    # Convert category dictionaries to lists with percentages
-    user_withdraw_on_range = []
-    if total_withdraw > 0:
-        for category, amount in withdraw_categories.items():
-            percentage = round((amount / total_withdraw) * 100, 1)
-            user_withdraw_on_range.append({
-                "category": category,
-                "converted_amount": float(amount),
-                "percentage": percentage
-            })
-        user_withdraw_on_range.sort(key=lambda x: x['percentage'], reverse=True)
-        
-    user_withdraw_by_place = []
-    if total_withdraw > 0:
-        for place, amount in withdraw_places.items():
-            percentage = round((amount / total_withdraw) * 100, 1)
-            user_withdraw_by_place.append({
-                "place": place,
-                "converted_amount": float(amount),
-                "percentage": percentage
-            })
-        user_withdraw_by_place.sort(key=lambda x: x['percentage'], reverse=True)
-    
-    user_deposit_on_range = []
-    if total_deposit > 0:
-        for category, amount in deposit_categories.items():
-            percentage = round((amount / total_deposit) * 100, 1)
-            user_deposit_on_range.append({
-                "category": category,
-                "converted_amount": float(amount),
-                "percentage": percentage
-            })
-        user_deposit_on_range.sort(key=lambda x: x['percentage'], reverse=True)
-        
-    user_deposit_by_place = []
-    if total_deposit > 0:
-        for place, amount in deposit_places.items():
-            percentage = round((amount / total_deposit) * 100, 1)
-            user_deposit_by_place.append({
-                "place": place,
-                "converted_amount": float(amount),
-                "percentage": percentage
-            })
-        user_deposit_by_place.sort(key=lambda x: x['percentage'], reverse=True)
+    report_data.update({
+        "current_month": f"Year {year}",
+        "year": year,
+        "months_included": months_included
+    })
+    return report_data
+
+
+def get_multi_year_report_for_user(*, user, years=None):
+    """Get a report aggregated over the last `years` years, or over all time when years is None."""
+    from django.utils import timezone
+    
+    if not user:
+        raise ValidationError("User must be authenticated!")
     
+    if years is None:
+        year_list = list(Reports.objects.filter(user=user).values_list('year', flat=True).distinct())
+        label = "All time"
+    else:
+        try:
+            years = int(years)
+        except (ValueError, TypeError):
+            raise ValidationError("Years must be a valid integer")
+        if years < 1:
+            raise ValidationError("Years must be at least 1")
+        current_year = timezone.now().year
+        year_list = list(range(current_year - years + 1, current_year + 1))
+        label = f"Last {years} years" if years > 1 else f"Year {current_year}"
+    
+    if not year_list:
+        raise ValidationError("No reports found")
+    
+    report_data, months_by_year = load_rollup_report(user, year_list)
+    if not any(months_by_year.values()):
+        raise ValidationError("No reports found for the selected years")
+    
+    report_data.update({
+        "current_month": label,
+        "years": sorted(year for year, months in months_by_year.items() if months),
+        "months_included": sum(months_by_year.values())
+    })
+    return report_data
+
+
+def _report_response_data(user, first_day, last_day, values):
+    """Stored report structure for one month from calculate_user_report values."""
+    user_withdraw_on_range, user_deposit_on_range, user_withdraw_by_place, user_deposit_by_place, total_withdraw, total_deposit = values
+    month_name = calendar.month_name[first_day.month]
     return {
-        "user_withdraw_on_range": user_withdraw_on_range,
-        "user_deposit_on_range": user_deposit_on_range,
-        "user_withdraw_by_place": user_withdraw_by_place,
-        "user_deposit_by_place": user_deposit_by_place,
-        "total_withdraw": float(total_withdraw),
-        "total_deposit": float(total_deposit),
-        "current_month": f"Year {year}",
+        "user_withdraw_on_range": [
+            {
+                "category": item['category'],
+                "converted_amount": float(item['converted_amount']),
+                "percentage": float(item.get('percentage', 0))
+            }
+            for item in user_withdraw_on_range
+        ],
+        "user_deposit_on_range": [
+            {
+                "category": item['category'],
+                "converted_amount": float(item['converted_amount']),
+                "percentage": float(item.get('percentage', 0))
+            }
+            for item in user_deposit_on_range
+        ],
+        "user_withdraw_by_place": [
+            {
+                "place": item['place'],
+                "converted_amount": float(item['converted_amount']),
+                "percentage": float(item.get('percentage', 0))
+            }
+            for item in user_withdraw_by_place
+        ],
+        "user_deposit_by_place": [
+            {
+                "place": item['place'],
+                "converted_amount": float(item['converted_amount']),
+                "percentage": float(item.get('percentage', 0))
+            }
+            for item in user_deposit_by_place
+        ],
+        "total_withdraw": float(total_withdraw) if total_withdraw is not None else 0.0,
+        "total_deposit": float(total_deposit) if total_deposit is not None else 0.0,
+        "current_month": f"{month_name} {first_day.year}",
         "favorite_currency": user.favorite_currency or 'USD',
-        "year": year,
-        "months_included": monthly_reports.count()
+        "start_date": first_day.isoformat(),
+        "end_date": last_day.isoformat()
+    }
+
+
+def get_range_report_for_user(*, user, start_date, end_date):
+    """Get the report of any date range, composed from stored monthly reports and the partial months at its edges."""
+    
+    if not user:
+        raise ValidationError("User must be authenticated!")
+    
+    if not start_date or not end_date:
+        raise ValidationError("Start date and end date are required")
+    
+    if start_date > end_date:
+        raise ValidationError("Start date must be before end date")
+    
+    values = calculate_range_report(start_date, end_date, user)
+    report_data = _report_response_data(user, start_date, end_date, values)
+    report_data["current_month"] = f"{start_date.isoformat()} to {end_date.isoformat()}"
+    return report_data
+
+
+def get_time_series_for_user(*, user, start_date, end_date, bucket='day'):
+    """Get deposits and withdrawals per day, week or month of a date range, for charts."""
+    
+    if not user:
+        raise ValidationError("User must be authenticated!")
+    
+    if not start_date or not end_date:
+        raise ValidationError("Start date and end date are required")
+    
+    if start_date > end_date:
+        raise ValidationError("Start date must be before end date")
+    
+    if bucket not in TIME_SERIES_BUCKETS:
+        raise ValidationError(f"Bucket must be one of: {', '.join(TIME_SERIES_BUCKETS)}")
+    
+    return {
+        "bucket": bucket,
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "favorite_currency": user.favorite_currency or 'USD',
+        "series": build_time_series(user, start_date, end_date, bucket)
+    }
+
+
+def get_networth_series_for_user(*, user, start_date, end_date, bucket='day'):
+    """Get the net worth at the end of each day, week or month of a date range, for charts."""
+    
+    if not user:
+        raise ValidationError("User must be authenticated!")
+    
+    if not start_date or not end_date:
+        raise ValidationError("Start date and end date are required")
+    
+    if start_date > end_date:
+        raise ValidationError("Start date must be before end date")
+    
+    if bucket not in TIME_SERIES_BUCKETS:
+        raise ValidationError(f"Bucket must be one of: {', '.join(TIME_SERIES_BUCKETS)}")
+    
+    return {
+        "bucket": bucket,
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "favorite_currency": user.favorite_currency or 'USD',
+        "series": build_networth_series(user, start_date, end_date, bucket)
     }
 
 
-def recalculate_all_reports_for_user(*, user):
-    """Recalculate all monthly reports for a user from first to last transaction."""
+def recalculate_all_reports_for_user(*, user, batch_size=200):
+    """Recalculate all monthly reports for a user from first to last transaction.
+
+    The whole history is read in one grouped pass and split into months in
+    memory, then the months' report lines and new Reports headers are bulk
+    created in one transaction.
+    Progress is recorded for get_recalculation_progress as it goes.
+    """
     
     if not user:
         raise ValidationError("User must be authenticated!")
     
     # Get the date range of all user transactions
-    transaction_dates = Transactions.objects.filter(user=user).values_list('date', flat=True).order_by('date')
+    date_range = Transactions.objects.filter(user=user).aggregate(first_date=Min('date'), last_date=Max('date'))
+    first_date, last_date = date_range['first_date'], date_range['last_date']
     
-    if not transaction_dates:
+    if not first_date:
+        set_recalculation_progress(user, 'completed')
         return {
             'message': 'No transactions found for this user',
             'summary': {
@@ -272,129 +332,82 @@ def recalculate_all_reports_for_user(*, user):
             }
         }
     
-    first_date = transaction_dates.first()
-    last_date = transaction_dates.last()
-    
     # Generate all months between first and last transaction
+    months = []
     current_date = date(first_date.year, first_date.month, 1)
-    end_date = date(last_date.year, last_date.month, 1)
-    
-    processed_months = []
-    total_created = 0
-    total_updated = 0
-    errors = []
-    
-    while current_date <= end_date:
-        try:
-            # Calculate first and last day of current month
-            first_day = current_date
-            last_day_of_month = calendar.monthrange(current_date.year, current_date.month)[1]
-            last_day = date(current_date.year, current_date.month, last_day_of_month)
-            
-            # Calculate report data for this month
-            (
-                user_withdraw_on_range,
-                user_deposit_on_range,
-                user_withdraw_by_place,
-                user_deposit_by_place,
-                total_withdraw,
-                total_deposit,
-            ) = calculate_user_report(first_day, last_day, user)
-            
-            # Prepare response data structure
-            month_name = calendar.month_name[current_date.month]
-            response_data = {
-                "user_withdraw_on_range": [
-                    {
-                        "category": item['category'],
-                        "converted_amount": float(item['converted_amount']),
-                        "percentage": float(item.get('percentage', 0))
-                    }
-                    for item in user_withdraw_on_range
-                ],
-                "user_deposit_on_range": [
-                    {
-                        "category": item['category'],
-                        "converted_amount": float(item['converted_amount']),
-                        "percentage": float(item.get('percentage', 0))
-                    }
-                    for item in user_deposit_on_range
-                ],
-                "user_withdraw_by_place": [
-                    {
-                        "place": item['place'],
-                        "converted_amount": float(item['converted_amount']),
-                        "percentage": float(item.get('percentage', 0))
-                    }
-                    for item in user_withdraw_by_place
-                ],
-                "user_deposit_by_place": [
-                    {
-                        "place": item['place'],
-                        "converted_amount": float(item['converted_amount']),
-                        "percentage": float(item.get('percentage', 0))
-                    }
-                    for item in user_deposit_by_place
-                ],
-                "total_withdraw": float(total_withdraw) if total_withdraw is not None else 0.0,
-                "total_deposit": float(total_deposit) if total_deposit is not None else 0.0,
-                "current_month": f"{month_name} {current_date.year}",
-                "favorite_currency": user.favorite_currency or 'USD',
-                "start_date": first_day.isoformat(),
-                "end_date": last_day.isoformat()
-            }
-            
-            # Save the report for this month
-            success, result = save_user_report(user, first_day, response_data)
-            
-            if success:
-                if result == "created":
-                    total_created += 1
-                    status_text = 'created'
-                else:
-                    total_updated += 1
-                    status_text = 'updated'
-                
-                processed_months.append({
-                    'month': current_date.month,
-                    'year': current_date.year,
-                    'month_name': f"{month_name} {current_date.year}",
-                    'total_transactions': len(user_withdraw_on_range) + len(user_deposit_on_range),
-                    'total_withdraw': float(total_withdraw) if total_withdraw else 0.0,
-                    'total_deposit': float(total_deposit) if total_deposit else 0.0,
-                    'status': status_text
-                })
-            else:
-                errors.append({
-                    'month': f"{month_name} {current_date.year}",
-                    'error': result
-                })
-            
-        except Exception as month_error:
-            print(f"Error processing {calendar.month_name[current_date.month]} {current_date.year}: {str(month_error)}")
-            errors.append({
-                'month': f"{calendar.month_name[current_date.month]} {current_date.year}",
-                'error': str(month_error)
-            })
-        
-        # Move to next month
+    while current_date <= last_date:
+        months.append(current_date)
         if current_date.month == 12:
             current_date = date(current_date.year + 1, 1, 1)
         else:
             current_date = date(current_date.year, current_date.month + 1, 1)
-    
+
+    try:
+        set_recalculation_progress(user, 'calculating', 0, len(months))
+        last_day_of_range = date(last_date.year, last_date.month, calendar.monthrange(last_date.year, last_date.month)[1])
+        monthly_values = calculate_monthly_reports(months[0], last_day_of_range, user)
+
+        existing_months = set(Reports.objects.filter(user=user).values_list('year', 'month'))
+
+        empty_values = ([], [], [], [], 0.0, 0.0)
+        lines = []
+        updated_months = []
+        to_create = []
+        processed_months = []
+        for first_day in months:
+            last_day = date(first_day.year, first_day.month, calendar.monthrange(first_day.year, first_day.month)[1])
+            values = monthly_values.get((first_day.year, first_day.month), empty_values)
+            lines.extend(report_lines_from_data(user, first_day.year, first_day.month, _report_response_data(user, first_day, last_day, values)))
+
+            if (first_day.year, first_day.month) in existing_months:
+                updated_months.append(first_day)
+                status_text = 'updated'
+            else:
+                to_create.append(Reports(user=user, month=first_day.month, year=first_day.year, data="{}", uses_lines=True))
+                status_text = 'created'
+
+            user_withdraw_on_range, user_deposit_on_range, _, _, total_withdraw, total_deposit = values
+            processed_months.append({
+                'month': first_day.month,
+                'year': first_day.year,
+                'month_name': f"{calendar.month_name[first_day.month]} {first_day.year}",
+                'total_transactions': len(user_withdraw_on_range) + len(user_deposit_on_range),
+                'total_withdraw': float(total_withdraw) if total_withdraw else 0.0,
+                'total_deposit': float(total_deposit) if total_deposit else 0.0,
+                'status': status_text
+            })
+
+        with db_transaction.atomic():
+            # Every month of the range is rewritten: its lines are replaced and its header flagged
+            ReportLine.objects.filter(user=user, year__range=(first_date.year, last_date.year)).delete()
+            for offset in range(0, len(lines), batch_size):
+                ReportLine.objects.bulk_create(lines[offset:offset + batch_size])
+            Reports.objects.filter(user=user, year__range=(first_date.year, last_date.year)).update(uses_lines=True, data="{}")
+            YearlyReport.objects.filter(user=user).update(is_stale=True)
+            set_recalculation_progress(user, 'saving', len(updated_months), len(months))
+            for offset in range(0, len(to_create), batch_size):
+                batch = to_create[offset:offset + batch_size]
+                Reports.objects.bulk_create(batch)
+                set_recalculation_progress(user, 'saving', len(updated_months) + offset + len(batch), len(months))
+    except Exception as e:
+        print(f"Error recalculating reports: {str(e)}")
+        set_recalculation_progress(user, 'failed', 0, len(months))
+        raise
+
+    set_recalculation_progress(user, 'completed', len(months), len(months))
+    bump_user_data_version(user)
     return {
         'message': 'Report recalculation completed',
         'summary': {
-            'total_months_processed': total_created + total_updated,
-            'months_created': total_created,
-            'months_updated': total_updated,
-            'errors_count': len(errors),
+            'total_months_processed': len(processed_months),
+            'months_created': len(to_create),
+            'months_updated': len(updated_months),
+            'errors_count': 0,
             'date_range': {
                 'from': f"{calendar.month_name[first_date.month]} {first_date.year}",
                 'to': f"{calendar.month_name[last_date.month]} {last_date.year}"
             }
         },
         'processed_months': processed_months,
-        'errors': errors if errors else None
+        'errors': None
     }
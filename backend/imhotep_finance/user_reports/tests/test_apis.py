@@ -100,6 +100,117 @@ class YearlyReportApiTest(TestCase):
         response = self.client.get(self.url)
         self.assertIn(response.status_code, [status.HTTP_200_OK, status.HTTP_404_NOT_FOUND, status.HTTP_400_BAD_REQUEST])
 
+class MultiYearReportApiTest(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('multi_year_report')
+
+    def test_get_multi_year_report_all_time(self):
+        """Test getting the all-time report via API"""
+        for year in (2022, 2023):
+            Reports.objects.create(user=self.user, month=1, year=year, data=json.dumps({'user_deposit_on_range': [{'category': 'Salary', 'converted_amount': 1000, 'percentage': 100}], 'user_withdraw_on_range': [], 'total_deposit': 1000, 'total_withdraw': 0}))
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['years'], [2022, 2023])
+        self.assertEqual(response.data['total_deposit'], 2000.0)
+
+    def test_get_multi_year_report_no_data(self):
+        """Test getting a multi-year report without reports"""
+        response = self.client.get(self.url, {'years': 2})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+class RangeReportApiTest(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('range_report')
+
+    def test_get_range_report_success(self):
+        """Test getting a date-range report via API"""
+        response = self.client.get(self.url, {'start_date': '2024-01-01', 'end_date': '2024-03-31'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_withdraw'], 0.0)
+        self.assertEqual(response.data['start_date'], '2024-01-01')
+
+    def test_get_range_report_reversed_dates(self):
+        """Test a range ending before it starts is rejected"""
+        response = self.client.get(self.url, {'start_date': '2024-03-31', 'end_date': '2024-01-01'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+class TimeSeriesApiTest(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('time_series')
+        NetWorth.objects.create(user=self.user, currency='USD', total=0)
+
+    def test_get_weekly_time_series(self):
+        """Test the weekly series buckets daily aggregates from Monday and fills empty weeks"""
+        create_transaction(user=self.user, amount=100, currency='USD', trans_status='deposit', category='Salary', trans_details='', transaction_date=date(2024, 1, 2), place='General')
+        create_transaction(user=self.user, amount=30, currency='USD', trans_status='withdraw', category='Food', trans_details='', transaction_date=date(2024, 1, 7), place='General')
+        create_transaction(user=self.user, amount=10, currency='USD', trans_status='withdraw', category='Food', trans_details='', transaction_date=date(2024, 1, 20), place='General')
+        response = self.client.get(self.url, {'start_date': '2024-01-01', 'end_date': '2024-01-21', 'bucket': 'week'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([point['period_start'] for point in response.data['series']], ['2024-01-01', '2024-01-08', '2024-01-15'])
+        self.assertEqual([point['net'] for point in response.data['series']], [70.0, 0.0, -10.0])
+        self.assertEqual(response.data['series'][0]['withdraw_count'], 1)
+
+    def test_get_time_series_rejects_spans_too_long_for_the_bucket(self):
+        """Test a day series over a century is rejected while a few years by week are served"""
+        response = self.client.get(self.url, {'start_date': '1900-01-01', 'end_date': '2024-01-01', 'bucket': 'day'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(self.url, {'start_date': '2020-01-01', 'end_date': '2024-01-01', 'bucket': 'week'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_get_time_series_at_the_end_of_the_calendar(self):
+        """Test a range ending on the last representable day doesn't overflow"""
+        response = self.client.get(self.url, {'start_date': '9999-11-01', 'end_date': '9999-12-31', 'bucket': 'month'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([point['period_start'] for point in response.data['series']], ['9999-11-01', '9999-12-01'])
+
+    def test_get_time_series_invalid_bucket(self):
+        """Test an unknown bucket is rejected"""
+        response = self.client.get(self.url, {'start_date': '2024-01-01', 'end_date': '2024-01-31', 'bucket': 'hour'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class NetWorthSeriesApiTest(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('networth_series')
+        NetWorth.objects.create(user=self.user, currency='USD', total=0)
+
+    def test_get_monthly_networth_series(self):
+        """Test the series opens from earlier snapshots and reports the balance at each month end"""
+        create_transaction(user=self.user, amount=100, currency='USD', trans_status='deposit', category='Salary', trans_details='', transaction_date=date(2023, 12, 20), place='General')
+        create_transaction(user=self.user, amount=40, currency='USD', trans_status='withdraw', category='Food', trans_details='', transaction_date=date(2024, 2, 10), place='General')
+        create_transaction(user=self.user, amount=15, currency='USD', trans_status='deposit', category='Gift', trans_details='', transaction_date=date(2024, 1, 5), place='Bank')
+        response = self.client.get(self.url, {'start_date': '2024-01-01', 'end_date': '2024-03-15', 'bucket': 'month'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([point['period_end'] for point in response.data['series']], ['2024-01-31', '2024-02-29', '2024-03-15'])
+        self.assertEqual([point['net_worth'] for point in response.data['series']], [115.0, 75.0, 75.0])
+
+    def test_get_networth_series_rejects_spans_too_long_for_the_bucket(self):
+        """Test the net worth series has the same span cap per bucket as the time series"""
+        response = self.client.get(self.url, {'start_date': '1900-01-01', 'end_date': '2024-01-01', 'bucket': 'day'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_get_networth_series_invalid_range(self):
+        """Test a start date after the end date is rejected"""
+        response = self.client.get(self.url, {'start_date': '2024-02-01', 'end_date': '2024-01-01'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
 class RecalculateReportsApiTest(TestCase):
 
     def setUp(self):
@@ -124,6 +235,15 @@ class RecalculateReportsApiTest(TestCase):
         self.assertIn('summary', response.data)
         self.assertGreaterEqual(response.data['summary']['total_months_processed'], 1)
 
+    def test_recalculate_progress_can_be_polled(self):
+        """Test the progress endpoint reports a finished recalculation"""
+        create_transaction(user=self.user, amount=1000, currency='USD', trans_status='deposit', category='Salary', trans_details='Test', transaction_date=date(2024, 1, 15), place='General')
+        create_transaction(user=self.user, amount=10, currency='USD', trans_status='withdraw', category='Food', trans_details='Test', transaction_date=date(2024, 3, 2), place='General')
+        self.client.post(self.url)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['stage'], response.data['done'], response.data['total']), ('completed', 3, 3))
+
 class NetWorthByPlaceApiTest(TestCase):
 
     def setUp(self):
@@ -1,6 +1,6 @@
 from django.test import TransactionTestCase
 from django.contrib.auth import get_user_model
-from user_reports.services import recalculate_all_reports_for_user, get_yearly_report_for_user
+from user_reports.services import recalculate_all_reports_for_user, get_yearly_report_for_user, get_monthly_report_for_user
 from transaction_management.services import create_transaction
 from transaction_management.models import NetWorth
 from user_reports.models import Reports
@@ -23,8 +23,9 @@ class ReportsIntegrationTest(TransactionTestCase):
         self.assertGreaterEqual(result['summary']['total_months_processed'], 2)
         jan_report = Reports.objects.filter(user=self.user, month=1, year=2024).first()
         self.assertIsNotNone(jan_report)
-        self.assertIn('total_deposit', jan_report.data)
-        self.assertIn('total_withdraw', jan_report.data)
+        jan_data = get_monthly_report_for_user(user=self.user, month=1, year=2024)['report_data']
+        self.assertEqual(jan_data['total_deposit'], 1000.0)
+        self.assertEqual(jan_data['total_withdraw'], 500.0)
         yearly_report = get_yearly_report_for_user(user=self.user, year=2024)
         self.assertEqual(yearly_report['year'], 2024)
         self.assertGreaterEqual(yearly_report['months_included'], 2)
\ No newline at end of file
@@ -1,12 +1,19 @@
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection, transaction as db_transaction
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from datetime import date
 import json
-from user_reports.services import get_report_history_months_for_user, get_monthly_report_for_user, get_report_history_years_for_user, get_yearly_report_for_user, recalculate_all_reports_for_user
-from user_reports.models import Reports
+from user_reports.services import get_report_history_months_for_user, get_monthly_report_for_user, get_report_history_years_for_user, get_yearly_report_for_user, get_multi_year_report_for_user, get_range_report_for_user, recalculate_all_reports_for_user
+from user_reports.models import Reports, YearlyReport
 from transaction_management.services import create_transaction
-from transaction_management.models import NetWorth
+from transaction_management.models import NetWorth, Transactions
+from user_reports.utils.calculate_user_report import calculate_user_report
+from user_reports.utils.save_user_report import save_user_report_with_transaction
+from user_reports.utils.report_buffer import coalesce_report_updates
+from user_reports.utils.report_rollups import apply_month_deltas
+from user_reports.utils.range_report import split_report_range
 User = get_user_model()
 
 class GetReportHistoryMonthsTest(TestCase):
@@ -83,6 +90,78 @@ class GetYearlyReportTest(TestCase):
         error_message = str(context.exception)
         self.assertTrue('not found' in error_message.lower() or 'no reports' in error_message.lower())
 
+class YearlyRollupTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        NetWorth.objects.create(user=self.user, currency='USD', place='General', total=1000)
+
+    def _deposit(self, amount, day):
+        create_transaction(user=self.user, amount=amount, currency='USD', trans_status='deposit', category='Salary', trans_details='', transaction_date=day, place='General')
+
+    def test_rollup_follows_new_transactions_without_rebuild(self):
+        """Test a built rollup takes later deltas and is read back without touching monthly reports"""
+        self._deposit(100, date(2024, 1, 10))
+        self.assertEqual(get_yearly_report_for_user(user=self.user, year=2024)['total_deposit'], 100.0)
+        self._deposit(50, date(2024, 2, 10))
+        self.assertFalse(YearlyReport.objects.get(user=self.user, year=2024).is_stale)
+        with CaptureQueriesContext(connection) as queries:
+            result = get_yearly_report_for_user(user=self.user, year=2024)
+        self.assertEqual(len(queries), 2)
+        self.assertEqual((result['total_deposit'], result['months_included']), (150.0, 2))
+        self.assertEqual(result['user_deposit_on_range'], [{'category': 'Salary', 'converted_amount': 150.0, 'percentage': 100.0}])
+
+    def test_clamped_month_line_marks_rollup_stale(self):
+        """Test a delta clamped at zero on a month line sends the rollup back to the month lines"""
+        self._deposit(100, date(2024, 1, 10))
+        self._deposit(50, date(2024, 2, 10))
+        get_yearly_report_for_user(user=self.user, year=2024)
+        apply_month_deltas(self.user, {(2024, 2): {('deposit', 'Salary', 'General'): -80.0}})
+        self.assertTrue(YearlyReport.objects.get(user=self.user, year=2024).is_stale)
+        result = get_yearly_report_for_user(user=self.user, year=2024)
+        self.assertEqual(result['total_deposit'], 100.0)
+        self.assertEqual(result['user_deposit_on_range'], [{'category': 'Salary', 'converted_amount': 100.0, 'percentage': 100.0}])
+
+    def test_unclamped_negative_delta_keeps_rollup_fresh(self):
+        """Test a negative delta that fits in the month lines still goes straight to the rollup"""
+        self._deposit(100, date(2024, 1, 10))
+        get_yearly_report_for_user(user=self.user, year=2024)
+        apply_month_deltas(self.user, {(2024, 1): {('deposit', 'Salary', 'General'): -40.0}})
+        self.assertFalse(YearlyReport.objects.get(user=self.user, year=2024).is_stale)
+        self.assertEqual(get_yearly_report_for_user(user=self.user, year=2024)['total_deposit'], 60.0)
+
+    def test_multi_year_report_sums_rollups(self):
+        """Test the all-time report adds up the rollups of every year with reports"""
+        self._deposit(100, date(2023, 6, 1))
+        self._deposit(200, date(2024, 6, 1))
+        result = get_multi_year_report_for_user(user=self.user)
+        self.assertEqual(result['years'], [2023, 2024])
+        self.assertEqual((result['total_deposit'], result['months_included']), (300.0, 2))
+
+
+class RangeReportTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        NetWorth.objects.create(user=self.user, currency='USD', place='General', total=1000)
+
+    def test_split_report_range(self):
+        """Test a range splits into its fully covered months and its partial edges"""
+        full_months, edges = split_report_range(date(2024, 1, 15), date(2024, 4, 10))
+        self.assertEqual(full_months, [(2024, 2), (2024, 3)])
+        self.assertEqual(edges, [(date(2024, 1, 15), date(2024, 1, 31)), (date(2024, 4, 1), date(2024, 4, 10))])
+
+    def test_range_report_matches_full_scan(self):
+        """Test a range composed from monthly reports and edge days equals scanning every transaction"""
+        for day, amount, category in ((date(2024, 1, 10), 5, 'Food'), (date(2024, 1, 20), 10, 'Food'), (date(2024, 2, 5), 20, 'Rent'), (date(2024, 3, 31), 40, 'Food'), (date(2024, 4, 2), 80, 'Rent'), (date(2024, 4, 20), 160, 'Food')):
+            create_transaction(user=self.user, amount=amount, currency='USD', trans_status='withdraw', category=category, trans_details='', transaction_date=day, place='General')
+        result = get_range_report_for_user(user=self.user, start_date=date(2024, 1, 15), end_date=date(2024, 4, 10))
+        expected = calculate_user_report(date(2024, 1, 15), date(2024, 4, 10), self.user)
+        self.assertEqual(result['total_withdraw'], 150.0)
+        self.assertEqual(result['user_withdraw_on_range'], expected[0])
+        self.assertEqual(result['user_withdraw_by_place'], expected[2])
+
+
 class RecalculateAllReportsTest(TestCase):
 
     def setUp(self):
@@ -129,4 +208,112 @@ class RecalculateAllReportsTest(TestCase):
         self.assertNotIn('Conversion', categories_deposit)
         
         categories_withdraw = [item['category'] for item in report_data['user_withdraw_on_range']]
-        self.assertNotIn('Transfer', categories_withdraw)
\ No newline at end of file
+        self.assertNotIn('Transfer', categories_withdraw)
+
+
+class RecalculateAllReportsSinglePassTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+
+    def test_rebuild_writes_every_month_with_constant_queries(self):
+        """Test a two year history is rebuilt in a fixed number of queries, updating existing months in place"""
+        for month in range(1, 25, 2):
+            Transactions.objects.create(user=self.user, amount=month, currency='USD', trans_status='withdraw', category='Food', date=date(2022 + (month - 1) // 12, (month - 1) % 12 + 1, 5), place='General')
+        existing = Reports.objects.create(user=self.user, month=1, year=2022, data=json.dumps({}))
+        with CaptureQueriesContext(connection) as queries:
+            result = recalculate_all_reports_for_user(user=self.user)
+        self.assertLess(len(queries), 15)
+        self.assertEqual((result['summary']['months_created'], result['summary']['months_updated']), (22, 1))
+        self.assertEqual(get_monthly_report_for_user(user=self.user, month=1, year=2022)['report_data']['total_withdraw'], 1.0)
+        march = get_monthly_report_for_user(user=self.user, month=3, year=2022)['report_data']
+        self.assertEqual(march['user_withdraw_on_range'], [{'category': 'Food', 'converted_amount': 3.0, 'percentage': 100.0}])
+        self.assertEqual(get_monthly_report_for_user(user=self.user, month=2, year=2022)['report_data']['total_withdraw'], 0.0)
+
+
+class ReportLinesTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+
+    def _add(self, amount, category, trans_status='withdraw'):
+        transaction = Transactions(user=self.user, amount=amount, currency='USD', trans_status=trans_status, category=category, date=date(2024, 3, 10), place='General')
+        with CaptureQueriesContext(connection) as queries:
+            save_user_report_with_transaction(self.user, transaction.date, transaction)
+        return len(queries)
+
+    def test_delta_write_cost_does_not_grow_with_categories(self):
+        """Test adding to a month costs the same number of queries however many categories it has"""
+        self._add(10, 'Category 0')
+        first_cost = self._add(10, 'Category 0')
+        for index in range(1, 30):
+            self._add(10, f'Category {index}')
+        self.assertEqual(self._add(10, 'Category 0'), first_cost)
+        report = get_monthly_report_for_user(user=self.user, month=3, year=2024)['report_data']
+        self.assertEqual(report['total_withdraw'], 320.0)
+        self.assertEqual(report['user_withdraw_on_range'][0], {'category': 'Category 0', 'converted_amount': 30.0, 'percentage': 9.4})
+
+    def test_legacy_blob_month_moves_to_lines_on_first_write(self):
+        """Test a month stored as JSON keeps its amounts when the first delta moves it to report lines"""
+        Reports.objects.create(user=self.user, month=3, year=2024, data=json.dumps({'user_deposit_on_range': [{'category': 'Salary', 'converted_amount': 1000, 'percentage': 100}], 'user_deposit_by_place': [{'place': 'General', 'converted_amount': 1000, 'percentage': 100}], 'user_withdraw_on_range': [], 'total_deposit': 1000, 'total_withdraw': 0}))
+        self._add(500, 'Bonus', trans_status='deposit')
+        self.assertTrue(Reports.objects.get(user=self.user, month=3, year=2024).uses_lines)
+        report = get_monthly_report_for_user(user=self.user, month=3, year=2024)['report_data']
+        self.assertEqual(report['total_deposit'], 1500.0)
+        self.assertEqual([item['category'] for item in report['user_deposit_on_range']], ['Salary', 'Bonus'])
+        self.assertEqual(report['user_deposit_by_place'], [{'place': 'General', 'converted_amount': 1500.0, 'percentage': 100.0}])
+
+
+class CoalesceReportUpdatesTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        NetWorth.objects.create(user=self.user, currency='USD', place='General', total=1000)
+
+    def _withdraw(self, amount):
+        return create_transaction(user=self.user, amount=amount, currency='USD', trans_status='withdraw', category='Rent', trans_details='', transaction_date=date(2024, 5, 1), place='General')
+
+    def test_rows_written_in_one_block_touch_each_line_once(self):
+        """Test twelve rows of one month in a coalesced block write the month's lines once"""
+        self._withdraw(1)
+        with CaptureQueriesContext(connection) as queries:
+            with db_transaction.atomic(), coalesce_report_updates():
+                for _ in range(12):
+                    self._withdraw(10)
+        line_writes = [query for query in queries if query['sql'].startswith('UPDATE "user_reports_reportline"')]
+        self.assertEqual(len(line_writes), 3)
+        self.assertEqual(get_monthly_report_for_user(user=self.user, month=5, year=2024)['report_data']['total_withdraw'], 121.0)
+
+    def test_failed_nested_block_drops_its_deltas(self):
+        """Test deltas queued in a nested block that raises are not applied"""
+        with db_transaction.atomic(), coalesce_report_updates():
+            self._withdraw(10)
+            try:
+                with db_transaction.atomic(), coalesce_report_updates():
+                    self._withdraw(20)
+                    raise ValidationError("rolled back")
+            except ValidationError:
+                pass
+        self.assertEqual(get_monthly_report_for_user(user=self.user, month=5, year=2024)['report_data']['total_withdraw'], 10.0)
+
+
+class CalculateUserReportTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+
+    def test_grouped_report_merges_indexed_and_legacy_rows(self):
+        """Test rows grouped through the blind index and legacy rows without one land in the same buckets"""
+        for amount, category, place in ((100, 'food', 'bank'), (50, ' Food ', 'Bank'), (30, 'Rent', None), (70, 'Transfer', 'Bank')):
+            Transactions.objects.create(user=self.user, amount=amount, currency='USD', trans_status='withdraw', category=category, date=date(2024, 1, 10), place=place)
+        Transactions.objects.create(user=self.user, amount=20, currency='USD', trans_status='Withdraw', category='FOOD', date=date(2024, 1, 11), place='Bank')
+        Transactions.objects.filter(amount=20).update(category_index=None)
+
+        withdraw, deposit, withdraw_by_place, deposit_by_place, total_withdraw, total_deposit = calculate_user_report(date(2024, 1, 1), date(2024, 1, 31), self.user)
+        self.assertEqual(total_withdraw, 200.0)
+        self.assertEqual(withdraw, [
+            {'category': 'Food', 'converted_amount': 170.0, 'percentage': 85.0},
+            {'category': 'Rent', 'converted_amount': 30.0, 'percentage': 15.0},
+        ])
+        self.assertEqual({item['place']: item['converted_amount'] for item in withdraw_by_place}, {'Bank': 170.0, 'General': 30.0})
+        self.assertEqual((deposit, deposit_by_place, total_deposit), ([], [], 0.0))
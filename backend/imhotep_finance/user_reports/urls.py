@@ -4,6 +4,10 @@ from .apis import (
     MonthlyReportHistoryApi,
     ReportHistoryYearsApi,
     YearlyReportApi,
+    MultiYearReportApi,
+    RangeReportApi,
+    TimeSeriesApi,
+    NetWorthSeriesApi,
     RecalculateReportsApi,
     NetWorthByPlaceApi
 )
@@ -13,6 +17,10 @@ urlpatterns = [
     path('get-monthly-report-history/', MonthlyReportHistoryApi.as_view(), name='monthly_report_history'),
     path('get-report-history-years/', ReportHistoryYearsApi.as_view(), name='report_history_years'),
     path('get-yearly-report/', YearlyReportApi.as_view(), name='yearly_report'),
+    path('get-multi-year-report/', MultiYearReportApi.as_view(), name='multi_year_report'),
+    path('get-range-report/', RangeReportApi.as_view(), name='range_report'),
+    path('get-time-series/', TimeSeriesApi.as_view(), name='time_series'),
+    path('get-networth-series/', NetWorthSeriesApi.as_view(), name='networth_series'),
     path('recalculate-reports/', RecalculateReportsApi.as_view(), name='recalculate_reports'),
     path('get-networth-by-place/', NetWorthByPlaceApi.as_view(), name='networth_by_place'),
 ]
\ No newline at end of file
@@ -1,150 +1,137 @@
-from django.db.models import Sum, Count, Case, When, Value, TextField  # Added TextField import
+from django.db.models import Sum, Max
 from transaction_management.models import Transactions
-from finance_management.utils.currencies import convert_to_fav_currency
+from finance_management.utils.currencies import convert_amounts_to_fav_currency
+from finance_management.utils.blind_index import REPORT_EXCLUDED_CATEGORIES, excluded_category_indexes, normalize_category
+
+REPORT_STATUSES = ('deposit', 'withdraw')
+
+
+def _category_label(category):
+    return normalize_category(category) or "Uncategorized"
+
+
+def place_label(place):
+    return place.strip().title() if place and str(place).strip() else "General"
+
+
+def _report_buckets(start_date, end_date, user):
+    """
+    Sum the user's report rows per (status, category, place, currency, date).
+
+    Rows with a category blind index are grouped in SQL and only one row per
+    category is decrypted for its name; rows written before the backfill are
+    decrypted and grouped in Python.
+    """
+    transactions = Transactions.objects.filter(
+        user=user,
+        trans_status__in=['Deposit', 'deposit', 'Withdraw', 'withdraw'],
+        date__range=(start_date, end_date)
+    )
+
+    grouped = list(
+        transactions.filter(category_index__isnull=False)
+        .exclude(category_index__in=excluded_category_indexes())
+        .values_list('trans_status', 'category_index', 'place', 'currency', 'date')
+        .annotate(total=Sum('amount'), sample_id=Max('id'))
+        .order_by()
+    )
+    sample_ids = {}
+    for _, category_index, _, _, _, _, sample_id in grouped:
+        sample_ids.setdefault(category_index, sample_id)
+    category_names = {
+        category_index: _category_label(category)
+        for category_index, category in Transactions.objects.filter(
+            id__in=sample_ids.values()
+        ).values_list('category_index', 'category')
+    }
+
+    buckets = {}
+    for trans_status, category_index, place, currency, day, total, _ in grouped:
+        key = (trans_status.lower(), category_names[category_index], place_label(place), currency, day)
+        buckets[key] = buckets.get(key, 0.0) + float(total or 0)
+
+    legacy_rows = transactions.filter(category_index__isnull=True).values_list(
+        'trans_status', 'category', 'place', 'currency', 'date', 'amount'
+    )
+    for trans_status, category, place, currency, day, amount in legacy_rows:
+        if normalize_category(category) in REPORT_EXCLUDED_CATEGORIES:
+            continue
+        key = (trans_status.lower(), _category_label(category), place_label(place), currency, day)
+        buckets[key] = buckets.get(key, 0.0) + float(amount)
+
+    return buckets
+
+
+def _breakdown(amounts, label, total):
+    """List of {label, converted_amount, percentage} sorted by percentage."""
+    items = [
+        {label: key, "converted_amount": amount, "percentage": round((amount / total) * 100, 1) if total > 0 else 0}
+        for key, amount in amounts.items()
+    ]
+    return sorted(items, key=lambda x: x['percentage'], reverse=True)
+
+
+def _convert_buckets(user, buckets):
+    """Convert every bucket in one batch at its day's rates: {key: converted_amount}."""
+    keys = list(buckets)
+    converted, _ = convert_amounts_to_fav_currency(
+        user,
+        [buckets[key] for key in keys],
+        [key[3] for key in keys],
+        [key[4] for key in keys],
+    )
+    return {key: converted_amount or 0 for key, converted_amount in zip(keys, converted)}
+
+
+def _summarize(converted_buckets):
+    """Build the six report values from (bucket key, converted amount) pairs."""
+    categories = {status: {} for status in REPORT_STATUSES}
+    places = {status: {} for status in REPORT_STATUSES}
+    totals = {status: 0.0 for status in REPORT_STATUSES}
+    for (trans_status, category, place, _, _), converted_amount in converted_buckets:
+        categories[trans_status][category] = categories[trans_status].get(category, 0) + converted_amount
+        places[trans_status][place] = places[trans_status].get(place, 0) + converted_amount
+        totals[trans_status] += converted_amount
+
+    total_withdraw = totals['withdraw']
+    total_deposit = totals['deposit']
+    return (
+        _breakdown(categories['withdraw'], "category", total_withdraw),
+        _breakdown(categories['deposit'], "category", total_deposit),
+        _breakdown(places['withdraw'], "place", total_withdraw),
+        _breakdown(places['deposit'], "place", total_deposit),
+        total_withdraw or 0.0,
+        total_deposit or 0.0,
+    )
+
 
 def calculate_user_report(start_date, end_date, user):
-    """Calculate user spending report with category breakdowns, percentages, and totals."""
+    """Calculate user spending report with category breakdowns, percentages, and totals.
+
+    All rows are summed per (status, category, place, currency, day) in one
+    grouped pass and every bucket is converted in one batch at that day's rates.
+    """
     if not user:
         return [], [], 0.0, 0.0  # Return empty lists and zero totals if invalid
-    
+
     try:
-        # Get withdrawal transactions
-        raw_withdrawals = list(
-            Transactions.objects.filter(
-                user=user,
-                trans_status__iexact='withdraw',
-                date__range=(start_date, end_date)
-            ).values('amount', 'currency', 'category', 'place')
-        )
-        user_withdraw_on_range = [
-            trans for trans in raw_withdrawals
-            if not (trans.get('category') and str(trans['category']).strip().title() in ['Transfer', 'Conversion'])
-        ]
-        
-        # Get deposit transactions
-        raw_deposits = list(
-            Transactions.objects.filter(
-                user=user,
-                trans_status__iexact='deposit',
-                date__range=(start_date, end_date)
-            ).values('amount', 'currency', 'category', 'place')
-        )
-        user_deposit_on_range = [
-            trans for trans in raw_deposits
-            if not (trans.get('category') and str(trans['category']).strip().title() in ['Transfer', 'Conversion'])
-        ]
-
-        total_withdraw = 0.0
-        # Convert withdrawals to favorite currency
-        for trans in user_withdraw_on_range:
-            withdraw_totals = {}
-            currency = trans["currency"]
-            amount = float(trans["amount"])
-            withdraw_totals[currency] = withdraw_totals.get(currency, 0) + amount
-            total_withdraw_trans, _ = convert_to_fav_currency(user, withdraw_totals) if withdraw_totals else (0.0, user.favorite_currency or 'USD')
-    
-            if withdraw_totals.get(currency, 0) > 0:
-                ratio = amount / withdraw_totals[currency]
-                trans["converted_amount"] = ratio * total_withdraw_trans
-            else:
-                trans["converted_amount"] = 0
-            total_withdraw += trans["converted_amount"]
-
-        # Concatenate Withdraw transactions on the categories and places
-        withdraw_categories = {}
-        withdraw_places = {}
-        for trans in user_withdraw_on_range:
-            raw_category = trans["category"]
-            category = raw_category.strip().title() if raw_category and str(raw_category).strip() else "Uncategorized"
-            raw_place = trans["place"]
-            place = raw_place.strip().title() if raw_place and str(raw_place).strip() else "General"
-            
-            if category not in withdraw_categories:
-                withdraw_categories[category] = trans["converted_amount"]
-            else:
-                withdraw_categories[category] += trans["converted_amount"]
-                
-            if place not in withdraw_places:
-                withdraw_places[place] = trans["converted_amount"]
-            else:
-                withdraw_places[place] += trans["converted_amount"]
-                
-        user_withdraw_on_range_formatted = [
-            {"category": category, "converted_amount": amount, "percentage": 0}
-            for category, amount in withdraw_categories.items()
-        ]
-        user_withdraw_by_place = [
-            {"place": place, "converted_amount": amount, "percentage": 0}
-            for place, amount in withdraw_places.items()
-        ]
-
-        total_deposit = 0.0
-        # Convert deposits to favorite currency
-        for trans in user_deposit_on_range:
-            deposit_totals = {}
-            currency = trans["currency"]
-            amount = float(trans["amount"])
-            deposit_totals[currency] = deposit_totals.get(currency, 0) + amount
-            total_deposit_trans, _ = convert_to_fav_currency(user, deposit_totals) if deposit_totals else (0.0, user.favorite_currency or 'USD')
-
-            if deposit_totals.get(currency, 0) > 0:
-                ratio = amount / deposit_totals[currency]
-                trans["converted_amount"] = ratio * total_deposit_trans
-            else:
-                trans["converted_amount"] = 0
-            total_deposit += trans["converted_amount"]
-
-        # Concatenate Deposit transactions on the categories and places
-        deposit_categories = {}
-        deposit_places = {}
-        for trans in user_deposit_on_range:
-            raw_category = trans["category"]
-            category = raw_category.strip().title() if raw_category and str(raw_category).strip() else "Uncategorized"
-            raw_place = trans["place"]
-            place = raw_place.strip().title() if raw_place and str(raw_place).strip() else "General"
-            
-            if category not in deposit_categories:
-                deposit_categories[category] = trans["converted_amount"]
-            else:
-                deposit_categories[category] += trans["converted_amount"]
-                
-            if place not in deposit_places:
-                deposit_places[place] = trans["converted_amount"]
-            else:
-                deposit_places[place] += trans["converted_amount"]
-                
-        user_deposit_on_range_formatted = [
-            {"category": category, "converted_amount": amount, "percentage": 0}
-            for category, amount in deposit_categories.items()
-        ]
-        user_deposit_by_place = [
-            {"place": place, "converted_amount": amount, "percentage": 0}
-            for place, amount in deposit_places.items()
-        ]
-        
-        #calculate percentages
-        if user_withdraw_on_range_formatted and total_withdraw > 0:
-            for trans in user_withdraw_on_range_formatted:
-                trans["percentage"] = round((trans["converted_amount"] / total_withdraw) * 100, 1)
-        if user_withdraw_by_place and total_withdraw > 0:
-            for trans in user_withdraw_by_place:
-                trans["percentage"] = round((trans["converted_amount"] / total_withdraw) * 100, 1)
-
-        if user_deposit_on_range_formatted and total_deposit > 0:
-            for trans in user_deposit_on_range_formatted:
-                trans["percentage"] = round((trans["converted_amount"] / total_deposit) * 100, 1)
-        if user_deposit_by_place and total_deposit > 0:
-            for trans in user_deposit_by_place:
-                trans["percentage"] = round((trans["converted_amount"] / total_deposit) * 100, 1)
-
-        user_withdraw_on_range_formatted = sorted(user_withdraw_on_range_formatted, key=lambda x: x['percentage'], reverse=True)
-        user_withdraw_by_place = sorted(user_withdraw_by_place, key=lambda x: x['percentage'], reverse=True)
-        
-        user_deposit_on_range_formatted = sorted(user_deposit_on_range_formatted, key=lambda x: x['percentage'], reverse=True)
-        user_deposit_by_place = sorted(user_deposit_by_place, key=lambda x: x['percentage'], reverse=True)
-
-        return user_withdraw_on_range_formatted, user_deposit_on_range_formatted, user_withdraw_by_place, user_deposit_by_place, total_withdraw or 0.0, total_deposit or 0.0
-        
+        converted = _convert_buckets(user, _report_buckets(start_date, end_date, user))
+        return _summarize(converted.items())
+
     except Exception as e:
         print(f"Error in calculate_user_report: {str(e)}")
         return [], [], [], [], 0.0, 0.0  # Return empty lists and zero totals on error
+
+
+def calculate_monthly_reports(start_date, end_date, user):
+    """
+    Calculate the report of every month between start_date and end_date from
+    one grouped pass over the range: {(year, month): calculate_user_report values}.
+    Months without report rows are left out.
+    """
+    converted = _convert_buckets(user, _report_buckets(start_date, end_date, user))
+    by_month = {}
+    for key, converted_amount in converted.items():
+        day = key[4]
+        by_month.setdefault((day.year, day.month), []).append((key, converted_amount))
+    return {month: _summarize(items) for month, items in by_month.items()}
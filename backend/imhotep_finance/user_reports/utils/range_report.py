@@ -0,0 +1,76 @@
+import calendar
+from datetime import date, timedelta
+from ..models import Reports
+from .calculate_user_report import REPORT_STATUSES, _breakdown, calculate_user_report
+from .report_lines import load_reports_data
+
+
+def split_report_range(start_date, end_date):
+    """
+    Split [start_date, end_date] into the (year, month) pairs it fully covers
+    and the (start, end) ranges of the partial months at its edges.
+    """
+    full_months = []
+    edges = []
+    day = start_date
+    while day <= end_date:
+        last_day = date(day.year, day.month, calendar.monthrange(day.year, day.month)[1])
+        if day.day == 1 and last_day <= end_date:
+            full_months.append((day.year, day.month))
+        else:
+            edges.append((day, min(last_day, end_date)))
+        day = last_day + timedelta(days=1)
+    return full_months, edges
+
+
+def _add_items(target, items, label):
+    for item in items:
+        target[item[label]] = target.get(item[label], 0.0) + float(item.get('converted_amount') or 0)
+
+
+def calculate_range_report(start_date, end_date, user):
+    """
+    Calculate the report of any date range with the values of calculate_user_report.
+
+    Fully covered months are read from their stored monthly reports; only the
+    partial months at the edges are calculated from transactions, so the cost
+    grows with months + edge days instead of with transactions.
+    """
+    full_months, edges = split_report_range(start_date, end_date)
+    categories = {trans_status: {} for trans_status in REPORT_STATUSES}
+    places = {trans_status: {} for trans_status in REPORT_STATUSES}
+    totals = {trans_status: 0.0 for trans_status in REPORT_STATUSES}
+
+    if full_months:
+        wanted = set(full_months)
+        # Newest report per month first, like Reports.objects.filter(...).first()
+        user_reports = [
+            user_report
+            for user_report in Reports.objects.filter(
+                user=user, year__range=(start_date.year, end_date.year)
+            ).order_by('-created_at')
+            if (user_report.year, user_report.month) in wanted
+        ]
+        for report_data in load_reports_data(user, user_reports).values():
+            for trans_status in REPORT_STATUSES:
+                totals[trans_status] += float(report_data.get(f"total_{trans_status}") or 0)
+                _add_items(categories[trans_status], report_data.get(f"user_{trans_status}_on_range") or [], "category")
+                _add_items(places[trans_status], report_data.get(f"user_{trans_status}_by_place") or [], "place")
+
+    for edge_start, edge_end in edges:
+        withdraw_categories, deposit_categories, withdraw_places, deposit_places, total_withdraw, total_deposit = calculate_user_report(edge_start, edge_end, user)
+        totals['withdraw'] += total_withdraw
+        totals['deposit'] += total_deposit
+        _add_items(categories['withdraw'], withdraw_categories, "category")
+        _add_items(categories['deposit'], deposit_categories, "category")
+        _add_items(places['withdraw'], withdraw_places, "place")
+        _add_items(places['deposit'], deposit_places, "place")
+
+    return (
+        _breakdown(categories['withdraw'], "category", totals['withdraw']),
+        _breakdown(categories['deposit'], "category", totals['deposit']),
+        _breakdown(places['withdraw'], "place", totals['withdraw']),
+        _breakdown(places['deposit'], "place", totals['deposit']),
+        totals['withdraw'],
+        totals['deposit'],
+    )
@@ -0,0 +1,58 @@
+import threading
+from contextlib import contextmanager
+from .report_rollups import apply_month_deltas
+
+# Report deltas buffered by the innermost active coalesce_report_updates() of this thread
+_state = threading.local()
+
+
+def _merge(target, deltas_by_month):
+    for month_key, deltas in deltas_by_month.items():
+        month_deltas = target.setdefault(month_key, {})
+        for line_key, amount in deltas.items():
+            month_deltas[line_key] = month_deltas.get(line_key, 0.0) + amount
+
+
+def queue_report_deltas(user, deltas_by_month):
+    """
+    Apply {(year, month): {(trans_status, category, place): amount}} to the
+    user's reports now, or buffer it while a coalesce_report_updates() block is open.
+    """
+    buffer = getattr(_state, 'buffer', None)
+    if buffer is None:
+        apply_month_deltas(user, deltas_by_month)
+    else:
+        buffer.append((user, deltas_by_month))
+
+
+@contextmanager
+def coalesce_report_updates():
+    """
+    Buffer the report deltas written inside the block and apply them when the
+    outermost block exits, merged so each month and line is written once.
+
+    Open it inside transaction.atomic() so the flush commits or rolls back with
+    the rows it describes. Deltas queued in a nested block that raises are
+    dropped, like the savepoint around them.
+    """
+    buffer = getattr(_state, 'buffer', None)
+    if buffer is not None:
+        mark = len(buffer)
+        try:
+            yield
+        except BaseException:
+            del buffer[mark:]
+            raise
+        return
+
+    _state.buffer = buffer = []
+    try:
+        yield
+    finally:
+        _state.buffer = None
+
+    merged = {}
+    for user, deltas_by_month in buffer:
+        _merge(merged.setdefault(user.pk, (user, {}))[1], deltas_by_month)
+    for user, deltas_by_month in merged.values():
+        apply_month_deltas(user, deltas_by_month)
@@ -0,0 +1,198 @@
+import calendar
+import json
+from django.db import IntegrityError, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from finance_management.utils.blind_index import keyed_hash
+from ..models import Reports, ReportLine, YearlyReport
+
+REPORT_STATUSES = ('deposit', 'withdraw')
+
+# dimension -> (report key of its breakdown list, label of each item)
+BREAKDOWNS = {
+    'category': ("user_{status}_on_range", "category"),
+    'place': ("user_{status}_by_place", "place"),
+}
+
+
+def line_key_index(dimension, key):
+    """Keyed hash a line is matched on, so the encrypted key never has to be compared in SQL."""
+    return keyed_hash(key, purpose=f"report-{dimension}") if key else ""
+
+
+def _apply_line_delta(user, year, month, trans_status, dimension, key, amount):
+    """
+    Add amount to one line with a conditional UPDATE, creating the line on the
+    first positive amount. Lines never go below zero, like the breakdown items
+    and totals of the JSON reports never did; returns True when the line had to
+    be clamped at zero.
+    """
+    lines = ReportLine.objects.filter(
+        user=user,
+        year=year,
+        month=month,
+        trans_status=trans_status,
+        dimension=dimension,
+        key_index=line_key_index(dimension, key),
+    )
+    if amount < 0:
+        if lines.filter(amount__gte=-amount).update(amount=F('amount') + amount):
+            return False
+        return bool(lines.update(amount=0.0))
+
+    new_amount = Greatest(F('amount') + amount, Value(0.0))
+    if lines.update(amount=new_amount) or amount == 0:
+        return False
+    try:
+        with transaction.atomic():
+            ReportLine.objects.create(
+                user=user,
+                year=year,
+                month=month,
+                trans_status=trans_status,
+                dimension=dimension,
+                key_index=line_key_index(dimension, key),
+                key=key,
+                amount=amount,
+            )
+    except IntegrityError:
+        # Another request created the line first
+        lines.update(amount=new_amount)
+    return False
+
+
+def apply_report_delta(user, year, month, trans_status, category, place, amount):
+    """Add an already converted amount to a month's total, category and place lines; True if any line was clamped."""
+    if trans_status not in REPORT_STATUSES:
+        return False
+    clamped = _apply_line_delta(user, year, month, trans_status, 'total', '', amount)
+    clamped = _apply_line_delta(user, year, month, trans_status, 'category', category, amount) or clamped
+    clamped = _apply_line_delta(user, year, month, trans_status, 'place', place, amount) or clamped
+    return clamped
+
+
+def report_lines_from_data(user, year, month, report_data):
+    """ReportLine rows holding the amounts of a report dict, ready for bulk_create."""
+    lines = []
+    for trans_status in REPORT_STATUSES:
+        lines.append(ReportLine(
+            user=user, year=year, month=month, trans_status=trans_status, dimension='total',
+            key_index='', key='', amount=float(report_data.get(f"total_{trans_status}") or 0),
+        ))
+        for dimension, (list_key, label) in BREAKDOWNS.items():
+            for item in report_data.get(list_key.format(status=trans_status)) or []:
+                key = item.get(label) or ''
+                lines.append(ReportLine(
+                    user=user, year=year, month=month, trans_status=trans_status, dimension=dimension,
+                    key_index=line_key_index(dimension, key), key=key,
+                    amount=float(item.get("converted_amount") or 0),
+                ))
+    return lines
+
+
+def replace_report_lines(user, year, month, report_data):
+    """Overwrite every line of a month with the amounts of a report dict; the year's rollup is rebuilt on its next read."""
+    with transaction.atomic():
+        ReportLine.objects.filter(user=user, year=year, month=month).delete()
+        ReportLine.objects.bulk_create(report_lines_from_data(user, year, month, report_data))
+        YearlyReport.objects.filter(user=user, year=year).update(is_stale=True)
+
+
+def _parse_report_blob(user, user_report):
+    '''Parse the stored report JSON of a month written before report lines, falling back to an empty structure'''
+    report_data = user_report.data
+    if isinstance(report_data, str):
+        try:
+            report_data = json.loads(report_data)
+        except json.JSONDecodeError:
+            report_data = None
+    if not isinstance(report_data, dict):
+        report_data = {
+            "total_deposit": 0.0,
+            "total_withdraw": 0.0,
+            "user_deposit_on_range": [],
+            "user_withdraw_on_range": [],
+            "favorite_currency": user.favorite_currency or 'USD'
+        }
+    return report_data
+
+
+def ensure_report_lines(user, user_report):
+    """Move a month still stored as a JSON blob into report lines, once."""
+    if user_report.uses_lines:
+        return
+    with transaction.atomic():
+        user_report = Reports.objects.select_for_update().get(pk=user_report.pk)
+        if user_report.uses_lines:
+            return
+        replace_report_lines(user, user_report.year, user_report.month, _parse_report_blob(user, user_report))
+        Reports.objects.filter(user=user, year=user_report.year, month=user_report.month).update(
+            uses_lines=True, data="{}"
+        )
+
+
+def report_data_from_lines(user, year, month, lines):
+    """Build the report dict of a month from its lines, with percentages and sorting done here."""
+    report_data = {
+        "current_month": f"{calendar.month_name[month]} {year}",
+        "total_withdraw": 0.0,
+        "total_deposit": 0.0,
+        "user_withdraw_on_range": [],
+        "user_deposit_on_range": [],
+        "user_withdraw_by_place": [],
+        "user_deposit_by_place": [],
+        "favorite_currency": user.favorite_currency or 'USD'
+    }
+    breakdown_lines = []
+    for line in lines:
+        if line.dimension == 'total':
+            report_data[f"total_{line.trans_status}"] = max(0.0, line.amount)
+        elif line.amount > 0:
+            breakdown_lines.append(line)
+
+    for line in breakdown_lines:
+        list_key, label = BREAKDOWNS[line.dimension]
+        total = report_data[f"total_{line.trans_status}"]
+        report_data[list_key.format(status=line.trans_status)].append({
+            label: line.key,
+            "converted_amount": line.amount,
+            "percentage": round((line.amount / total) * 100, 1) if total > 0 else 0,
+        })
+    for trans_status in REPORT_STATUSES:
+        for list_key, _ in BREAKDOWNS.values():
+            report_data[list_key.format(status=trans_status)].sort(key=lambda x: x['percentage'], reverse=True)
+    return report_data
+
+
+def load_reports_data(user, user_reports):
+    """
+    Report dict of every given month header: {(year, month): report dict}.
+
+    Lines of all line-backed months are read in one query; months still stored
+    as a JSON blob are parsed from it.
+    """
+    loaded = {}
+    line_months = set()
+    for user_report in user_reports:
+        key = (user_report.year, user_report.month)
+        if key in loaded or key in line_months:
+            continue
+        if user_report.uses_lines:
+            line_months.add(key)
+        else:
+            loaded[key] = _parse_report_blob(user, user_report)
+
+    if line_months:
+        lines_by_month = {key: [] for key in line_months}
+        lines = ReportLine.objects.filter(
+            user=user,
+            year__in={year for year, _ in line_months},
+            month__in={month for _, month in line_months},
+        ).order_by('id')
+        for line in lines:
+            if (line.year, line.month) in lines_by_month:
+                lines_by_month[(line.year, line.month)].append(line)
+        for (year, month), month_lines in lines_by_month.items():
+            loaded[(year, month)] = report_data_from_lines(user, year, month, month_lines)
+
+    return loaded
@@ -0,0 +1,30 @@
+from django.core.cache import cache
+from django.utils import timezone
+
+PROGRESS_KEY = "report-recalculation:{user_id}"
+# Long enough to poll a finished run, short enough that stale progress goes away
+PROGRESS_TIMEOUT = 60 * 60
+
+
+def set_recalculation_progress(user, stage, done=0, total=0):
+    """Record how far the user's report recalculation got, for RecalculateReportsApi.get to poll."""
+    cache.set(
+        PROGRESS_KEY.format(user_id=user.id),
+        {
+            "stage": stage,
+            "done": done,
+            "total": total,
+            "updated_at": timezone.now().isoformat(),
+        },
+        PROGRESS_TIMEOUT,
+    )
+
+
+def get_recalculation_progress(user):
+    """Latest recorded progress of the user's report recalculation, or an idle state."""
+    return cache.get(PROGRESS_KEY.format(user_id=user.id)) or {
+        "stage": "idle",
+        "done": 0,
+        "total": 0,
+        "updated_at": None,
+    }
@@ -0,0 +1,107 @@
+from django.db import transaction
+from django.db.models import F
+from ..models import Reports, ReportLine, YearlyReport
+from .report_lines import apply_report_delta, ensure_report_lines, report_data_from_lines
+
+# ReportLine.month of the lines holding a year's rollup
+ROLLUP_MONTH = 0
+
+
+def _month_report(user, year, month, amount):
+    '''Make sure a month can take a delta: returns False when there is no report and amount would not create one'''
+    user_report = Reports.objects.filter(user=user, month=month, year=year).first()
+    if user_report:
+        ensure_report_lines(user, user_report)
+        return True
+    # A month is only created by a positive amount
+    if amount <= 0:
+        return False
+    Reports.objects.create(user=user, month=month, year=year, data="{}", uses_lines=True)
+    YearlyReport.objects.filter(user=user, year=year).update(months_included=F('months_included') + 1)
+    return True
+
+
+def apply_month_deltas(user, deltas_by_month):
+    """
+    Apply {(year, month): {(trans_status, category, place): amount}} to the
+    user's report lines, and to the rollup of the year while it is fresh.
+
+    A clamped line no longer moves by the delta, so once one is clamped the
+    rollup is marked stale and rebuilt from the month lines on its next read.
+    """
+    for (year, month), deltas in deltas_by_month.items():
+        if not deltas:
+            continue
+        with transaction.atomic():
+            # Lock the rollup before touching the month so a concurrent rebuild cannot miss this delta
+            rollup_is_fresh = YearlyReport.objects.select_for_update().filter(
+                user=user, year=year, is_stale=False
+            ).exists()
+            if not _month_report(user, year, month, max(deltas.values())):
+                continue
+            for (trans_status, category, place), amount in deltas.items():
+                clamped = apply_report_delta(user, year, month, trans_status, category, place, amount)
+                if rollup_is_fresh and not clamped:
+                    clamped = apply_report_delta(user, year, ROLLUP_MONTH, trans_status, category, place, amount)
+                if rollup_is_fresh and clamped:
+                    YearlyReport.objects.filter(user=user, year=year).update(is_stale=True)
+                    rollup_is_fresh = False
+
+
+def _rebuild_rollup(user, year):
+    """Sum the year's monthly lines into its rollup lines."""
+    with transaction.atomic():
+        rollup, _ = YearlyReport.objects.select_for_update().get_or_create(user=user, year=year)
+        if not rollup.is_stale:
+            return rollup
+
+        months = set()
+        for user_report in Reports.objects.filter(user=user, year=year):
+            ensure_report_lines(user, user_report)
+            months.add(user_report.month)
+
+        amounts = {}
+        keys = {}
+        for line in ReportLine.objects.filter(user=user, year=year, month__gte=1).order_by('id'):
+            line_key = (line.trans_status, line.dimension, line.key_index)
+            amounts[line_key] = amounts.get(line_key, 0.0) + line.amount
+            keys.setdefault(line_key, line.key)
+
+        ReportLine.objects.filter(user=user, year=year, month=ROLLUP_MONTH).delete()
+        ReportLine.objects.bulk_create([
+            ReportLine(
+                user=user, year=year, month=ROLLUP_MONTH, trans_status=trans_status, dimension=dimension,
+                key_index=key_index, key=keys[(trans_status, dimension, key_index)], amount=amount,
+            )
+            for (trans_status, dimension, key_index), amount in amounts.items()
+        ])
+        rollup.months_included = len(months)
+        rollup.is_stale = False
+        rollup.save()
+    return rollup
+
+
+def load_rollup_report(user, years):
+    """
+    Report dict summing the rollups of the given years, and {year: months
+    included}. Fresh rollups are read as they are; stale or missing ones are
+    rebuilt first.
+    """
+    rollups = {rollup.year: rollup for rollup in YearlyReport.objects.filter(user=user, year__in=years)}
+    for year in years:
+        if year not in rollups or rollups[year].is_stale:
+            rollups[year] = _rebuild_rollup(user, year)
+
+    lines = ReportLine.objects.filter(user=user, year__in=years, month=ROLLUP_MONTH).order_by('id')
+    if len(years) > 1:
+        merged = {}
+        for line in lines:
+            line_key = (line.trans_status, line.dimension, line.key_index)
+            if line_key in merged:
+                merged[line_key].amount += line.amount
+            else:
+                merged[line_key] = line
+        lines = merged.values()
+
+    report_data = report_data_from_lines(user, min(years), ROLLUP_MONTH, lines)
+    return report_data, {year: rollup.months_included for year, rollup in rollups.items()}
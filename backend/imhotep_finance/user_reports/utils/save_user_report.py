@@ -1,7 +1,8 @@
-from unicodedata import category
 from ..models import Reports
-from finance_management.utils.currencies import convert_to_fav_currency
-import calendar
+from .report_lines import replace_report_lines
+from .report_buffer import queue_report_deltas
+from .calculate_user_report import place_label
+from finance_management.utils.currencies import get_conversion_factors
 import json
 from datetime import datetime, date
 
@@ -12,10 +13,9 @@ def save_user_report(user, start_date, response_data):
     if not user or not start_date or not response_data:
         return False, "Invalid parameters"
     
-    # Ensure response_data is a dict, and convert to JSON string for EncryptedTextField
+    # Ensure response_data is a dict
     if isinstance(response_data, str):
         try:
-            # If it's already a JSON string, parse and re-serialize to ensure it's valid
             response_data = json.loads(response_data)
         except json.JSONDecodeError:
             return False, "Invalid JSON data format"
@@ -23,27 +23,16 @@ def save_user_report(user, start_date, response_data):
     if not isinstance(response_data, dict):
         return False, "Response data must be a dictionary"
     
-    # Convert dict to JSON string for EncryptedTextField
-    data_json = json.dumps(response_data)
-    
     # Check if a report for the same month and year already exists
     try:
-        user_report = Reports.objects.filter(user=user, month=start_date.month, year=start_date.year).first()
-        if user_report:
-            # Always update the data to ensure it's current
-            user_report.data = data_json
-            user_report.save()
-            return True, "updated"  # Changed to return status
-        else:
-            # Create and save a new report if it doesn't exist for this month and year
-            user_report = Reports.objects.create(
-                user=user,
-                month=start_date.month,
-                year=start_date.year,
-                data=data_json
-            )
-            user_report.save()
-            return True, "created"  # Changed to return status
+        replace_report_lines(user, start_date.year, start_date.month, response_data)
+        updated = Reports.objects.filter(user=user, month=start_date.month, year=start_date.year).update(
+            uses_lines=True, data="{}"
+        )
+        if updated:
+            return True, "updated"
+        Reports.objects.create(user=user, month=start_date.month, year=start_date.year, data="{}", uses_lines=True)
+        return True, "created"
     except Exception as e:
         print(f"Error in save_user_report: {str(e)}")
         return False, str(e)
@@ -72,13 +61,12 @@ def save_user_report_with_transaction(user, start_date, transaction, parent_func
         return True, None
     currency = transaction.currency
 
-    # Convert to favorite currency if needed
+    # Convert to favorite currency at the transaction date's rates if needed
     try:
         if user.favorite_currency and user.favorite_currency != transaction.currency:
-            amount_not_fav_currency = {currency: amount}
-            converted_amount, _ = convert_to_fav_currency(user, amount_not_fav_currency)
-            if converted_amount is not None:
-                amount = converted_amount
+            factor = get_conversion_factors(user, [(currency, start_date)])[(currency, start_date)]
+            if factor is not None:
+                amount = amount * factor
     except Exception as e:
         print(f"Currency conversion error in save_user_report_with_transaction: {str(e)}")  # Log detailed error for debugging
         # Continue with original amount if conversion fails
@@ -87,221 +75,64 @@ def save_user_report_with_transaction(user, start_date, transaction, parent_func
     if parent_function == "delete_transaction":
         amount = -amount
 
-    # Check if a report for the same month and year already exists
-    user_report = Reports.objects.filter(user=user, month=start_date.month, year=start_date.year).first()
+    try:
+        queue_report_deltas(user, {
+            (start_date.year, start_date.month): {(trans_status, category, place_label(transaction.place)): amount}
+        })
+    except Exception as e:
+        return False, str(e)
     
-    if user_report:
-        # Parse encrypted data if it's a string (EncryptedTextField returns decrypted string)
-        report_data = user_report.data
-        if isinstance(report_data, str):
+    return True, None
+
+def save_user_report_with_transactions(user, transactions, parent_function=None):
+    '''This will be used for updating the reports when many transactions are created or deleted at once
+        Deltas are summed per month and line first, and each (currency, day) is converted once
+    '''
+    if not user:
+        return False, "Invalid parameters"
+
+    rows = []
+    for transaction in transactions:
+        category = transaction.category or "Uncategorized"
+        if category.strip().title() in ["Transfer", "Conversion"]:
+            continue
+
+        trans_date = transaction.date
+        if isinstance(trans_date, str):
             try:
-                report_data = json.loads(report_data)
-            except json.JSONDecodeError:
-                # If parsing fails, initialize with empty structure
-                report_data = {
-                    "total_deposit": 0.0,
-                    "total_withdraw": 0.0,
-                    "user_deposit_on_range": [],
-                    "user_withdraw_on_range": [],
-                    "favorite_currency": user.favorite_currency or 'USD'
-                }
-        elif not isinstance(report_data, dict):
-            # If it's neither string nor dict, initialize with empty structure
-            report_data = {
-                "total_deposit": 0.0,
-                "total_withdraw": 0.0,
-                "user_deposit_on_range": [],
-                "user_withdraw_on_range": [],
-                "favorite_currency": user.favorite_currency or 'USD'
-            }
-        
-        # Update existing report
-        if trans_status == "deposit":
-            report_data["total_deposit"] = report_data.get("total_deposit", 0) + amount
-            
-            # Update or add category breakdown
-            found = False
-            for item in report_data.get("user_deposit_on_range", []):
-                if item["category"] == category:
-                    item["converted_amount"] = item.get("converted_amount", 0) + amount
-                    found = True
-                    break
-            
-            if not found and amount > 0:  # Only add new category if amount is positive
-                if "user_deposit_on_range" not in report_data:
-                    report_data["user_deposit_on_range"] = []
-                report_data["user_deposit_on_range"].append({
-                    "category": category,
-                    "converted_amount": amount,
-                    "percentage": 0
-                })
-            
-            # Remove categories with zero or negative amounts
-            report_data["user_deposit_on_range"] = [
-                item for item in report_data.get("user_deposit_on_range", [])
-                if item.get("converted_amount", 0) > 0
-            ]
-            
-            # Recalculate percentages
-            total = report_data.get("total_deposit", 0)
-            if total > 0:
-                for item in report_data.get("user_deposit_on_range", []):
-                    item["percentage"] = round((item.get("converted_amount", 0) / total) * 100, 1)
+                trans_date = datetime.strptime(trans_date, '%Y-%m-%d').date()
+            except ValueError:
+                return False, "Invalid date format"
+        elif isinstance(trans_date, datetime):
+            trans_date = trans_date.date()
+        rows.append((transaction, category, trans_date))
 
-            # Update or add place breakdown
-            place_val = transaction.place
-            actual_place = place_val.strip().title() if place_val and str(place_val).strip() else "General"
-            found_place = False
-            if "user_deposit_by_place" not in report_data:
-                report_data["user_deposit_by_place"] = []
-            for item in report_data["user_deposit_by_place"]:
-                if item["place"] == actual_place:
-                    item["converted_amount"] = item.get("converted_amount", 0) + amount
-                    found_place = True
-                    break
-            
-            if not found_place and amount > 0:
-                report_data["user_deposit_by_place"].append({
-                    "place": actual_place,
-                    "converted_amount": amount,
-                    "percentage": 0
-                })
-            
-            report_data["user_deposit_by_place"] = [
-                item for item in report_data["user_deposit_by_place"]
-                if item.get("converted_amount", 0) > 0
-            ]
-            
-            if total > 0:
-                for item in report_data["user_deposit_by_place"]:
-                    item["percentage"] = round((item.get("converted_amount", 0) / total) * 100, 1)
-        
-        elif trans_status == "withdraw":
-            report_data["total_withdraw"] = report_data.get("total_withdraw", 0) + amount
-            
-            # Update or add category breakdown
-            found = False
-            for item in report_data.get("user_withdraw_on_range", []):
-                if item["category"] == category:
-                    item["converted_amount"] = item.get("converted_amount", 0) + amount
-                    found = True
-                    break
-            
-            if not found and amount > 0:  # Only add new category if amount is positive
-                if "user_withdraw_on_range" not in report_data:
-                    report_data["user_withdraw_on_range"] = []
-                report_data["user_withdraw_on_range"].append({
-                    "category": category,
-                    "converted_amount": amount,
-                    "percentage": 0
-                })
-            
-            # Remove categories with zero or negative amounts
-            report_data["user_withdraw_on_range"] = [
-                item for item in report_data.get("user_withdraw_on_range", [])
-                if item.get("converted_amount", 0) > 0
-            ]
-            
-            # Recalculate percentages
-            total = report_data.get("total_withdraw", 0)
-            if total > 0:
-                for item in report_data.get("user_withdraw_on_range", []):
-                    item["percentage"] = round((item.get("converted_amount", 0) / total) * 100, 1)
+    # Resolve one conversion factor per (currency, day) instead of one lookup per transaction
+    factors = {}
+    try:
+        if user.favorite_currency:
+            factors = get_conversion_factors(user, {(transaction.currency, trans_date) for transaction, _, trans_date in rows})
+    except Exception as e:
+        print(f"Currency conversion error in save_user_report_with_transactions: {str(e)}")
+
+    # (year, month) -> {(trans_status, category, place): summed amount}, in first-seen order
+    deltas_by_month = {}
+    for transaction, category, trans_date in rows:
+        factor = factors.get((transaction.currency, trans_date))
+        amount = float(transaction.amount) * (factor if factor is not None else 1.0)
+        if parent_function == "delete_transaction":
+            amount = -amount
+
+        deltas = deltas_by_month.setdefault((trans_date.year, trans_date.month), {})
+        key = (transaction.trans_status.lower(), category, place_label(transaction.place))
+        deltas[key] = deltas.get(key, 0.0) + amount
+
+    try:
+        queue_report_deltas(user, deltas_by_month)
+    except Exception as e:
+        print(f"Error in save_user_report_with_transactions: {str(e)}")
+        return False, str(e)
 
-            # Update or add place breakdown
-            place_val = transaction.place
-            actual_place = place_val.strip().title() if place_val and str(place_val).strip() else "General"
-            found_place = False
-            if "user_withdraw_by_place" not in report_data:
-                report_data["user_withdraw_by_place"] = []
-            for item in report_data["user_withdraw_by_place"]:
-                if item["place"] == actual_place:
-                    item["converted_amount"] = item.get("converted_amount", 0) + amount
-                    found_place = True
-                    break
-            
-            if not found_place and amount > 0:
-                report_data["user_withdraw_by_place"].append({
-                    "place": actual_place,
-                    "converted_amount": amount,
-                    "percentage": 0
-                })
-            
-            report_data["user_withdraw_by_place"] = [
-                item for item in report_data["user_withdraw_by_place"]
-                if item.get("converted_amount", 0) > 0
-            ]
-            
-            if total > 0:
-                for item in report_data["user_withdraw_by_place"]:
-                    item["percentage"] = round((item.get("converted_amount", 0) / total) * 100, 1)
-        
-        # Ensure totals don't go negative
-        report_data["total_deposit"] = max(0, report_data.get("total_deposit", 0))
-        report_data["total_withdraw"] = max(0, report_data.get("total_withdraw", 0))
-        
-        # Ensure current_month is set if not present
-        if "current_month" not in report_data:
-            month_name = calendar.month_name[start_date.month]
-            report_data["current_month"] = f"{month_name} {start_date.year}"
-        
-        # Save the updated data back (EncryptedTextField will handle serialization)
-        user_report.data = json.dumps(report_data)
-        user_report.save()
-        return True, None
-    
-    # Create new report if it doesn't exist and amount is positive
-    elif amount > 0:
-        month_name = calendar.month_name[start_date.month]
-        place_val = transaction.place
-        actual_place = place_val.strip().title() if place_val and str(place_val).strip() else "General"
-        report_data = {
-            "current_month": f"{month_name} {start_date.year}",
-            "total_withdraw": float(amount) if trans_status == "withdraw" else 0.0,
-            "total_deposit": float(amount) if trans_status == "deposit" else 0.0,
-            "user_withdraw_on_range": [
-                {
-                    "category": category,
-                    "converted_amount": float(amount),
-                    "percentage": 100.0
-                }
-            ] if trans_status == "withdraw" else [],
-            "user_deposit_on_range": [
-                {
-                    "category": category,
-                    "converted_amount": float(amount),
-                    "percentage": 100.0
-                }
-            ] if trans_status == "deposit" else [],
-            "user_withdraw_by_place": [
-                {
-                    "place": actual_place,
-                    "converted_amount": float(amount),
-                    "percentage": 100.0
-                }
-            ] if trans_status == "withdraw" else [],
-            "user_deposit_by_place": [
-                {
-                    "place": actual_place,
-                    "converted_amount": float(amount),
-                    "percentage": 100.0
-                }
-            ] if trans_status == "deposit" else [],
-            "favorite_currency": user.favorite_currency or 'USD'
-        }
-        
-        try:
-            user_report = Reports.objects.create(
-                user=user,
-                month=start_date.month,
-                year=start_date.year,
-                data=json.dumps(report_data)
-            )
-            user_report.save()
-            return True, None
-        except Exception as e:
-            return False, str(e)
-    
     return True, None
 
 def save_user_report_with_transaction_update(user, old_transaction, new_transaction):
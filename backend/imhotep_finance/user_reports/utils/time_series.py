@@ -0,0 +1,122 @@
+from datetime import date, timedelta
+from django.db.models import OuterRef, Subquery
+from transaction_management.models import DailyAggregate, NetWorthSnapshot
+from finance_management.utils.currencies import get_conversion_factors
+
+TIME_SERIES_BUCKETS = ('day', 'week', 'month')
+# Longest range served per bucket size, so one request can't ask for millions of points
+TIME_SERIES_MAX_SPAN_DAYS = {'day': 366 * 2, 'week': 366 * 10, 'month': 366 * 50}
+
+
+def bucket_start(day, bucket):
+    """First day of the bucket holding day; weeks start on Monday."""
+    if bucket == 'week':
+        return day - timedelta(days=day.weekday())
+    if bucket == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def _next_bucket(start, bucket):
+    """First day of the bucket after start, or None when it would fall past date.max."""
+    try:
+        if bucket == 'week':
+            return start + timedelta(days=7)
+        if bucket == 'month':
+            return date(start.year + 1, 1, 1) if start.month == 12 else date(start.year, start.month + 1, 1)
+        return start + timedelta(days=1)
+    except (OverflowError, ValueError):
+        return None
+
+
+def build_time_series(user, start_date, end_date, bucket):
+    """
+    Deposits and withdrawals per bucket between start_date and end_date in the
+    user's favorite currency, read from the daily aggregates with one range
+    scan and converted at each day's rates. Empty buckets are included as zeros.
+    """
+    rows = list(
+        DailyAggregate.objects.filter(user=user, date__range=(start_date, end_date))
+        .values_list('date', 'currency', 'trans_status', 'total', 'count')
+    )
+    factors = get_conversion_factors(user, {(currency, day) for day, currency, _, _, _ in rows}) if rows else {}
+
+    series = {}
+    start = bucket_start(start_date, bucket)
+    while start is not None and start <= end_date:
+        series[start] = {
+            "period_start": start.isoformat(),
+            "deposit": 0.0,
+            "withdraw": 0.0,
+            "deposit_count": 0,
+            "withdraw_count": 0,
+        }
+        start = _next_bucket(start, bucket)
+
+    for day, currency, trans_status, total, count in rows:
+        factor = factors.get((currency, day))
+        point = series[bucket_start(day, bucket)]
+        point[trans_status] += total * (factor if factor is not None else 1.0)
+        point[f"{trans_status}_count"] += count
+
+    for point in series.values():
+        point["net"] = point["deposit"] - point["withdraw"]
+    return list(series.values())
+
+
+def build_networth_series(user, start_date, end_date, bucket):
+    """
+    Net worth at the end of each bucket between start_date and end_date in the
+    user's favorite currency. Balances open from the last snapshot before
+    start_date of each (currency, place), move with the snapshots in the range
+    and are converted at the rates of each bucket's last day.
+    """
+    latest_before = (
+        NetWorthSnapshot.objects.filter(
+            user=user, currency=OuterRef('currency'), place=OuterRef('place'), date__lt=start_date
+        )
+        .order_by('-date')
+        .values('date')[:1]
+    )
+    balances = {
+        (currency, place): balance
+        for currency, place, balance in NetWorthSnapshot.objects.filter(
+            user=user, date__lt=start_date, date=Subquery(latest_before)
+        ).values_list('currency', 'place', 'balance')
+    }
+    rows = list(
+        NetWorthSnapshot.objects.filter(user=user, date__range=(start_date, end_date))
+        .order_by('date')
+        .values_list('date', 'currency', 'place', 'balance')
+    )
+
+    periods = []
+    start = bucket_start(start_date, bucket)
+    while start is not None and start <= end_date:
+        next_start = _next_bucket(start, bucket)
+        periods.append((start, end_date if next_start is None else min(next_start - timedelta(days=1), end_date)))
+        start = next_start
+
+    currencies = {currency for currency, _ in balances} | {currency for _, currency, _, _ in rows}
+    factors = get_conversion_factors(
+        user, {(currency, period_end) for currency in currencies for _, period_end in periods}
+    ) if currencies else {}
+
+    series = []
+    position = 0
+    for period_start, period_end in periods:
+        while position < len(rows) and rows[position][0] <= period_end:
+            _, currency, place, balance = rows[position]
+            balances[(currency, place)] = balance
+            position += 1
+
+        net_worth = 0.0
+        for (currency, _), balance in balances.items():
+            factor = factors.get((currency, period_end))
+            net_worth += balance * (factor if factor is not None else 1.0)
+        series.append({
+            "period_start": period_start.isoformat(),
+            "period_end": period_end.isoformat(),
+            "net_worth": net_worth,
+        })
+    return series
@@ -1,11 +1,13 @@
 from django.shortcuts import get_object_or_404
 from django.core.exceptions import ValidationError
 from finance_management.utils.currencies import get_allowed_currencies
+from finance_management.utils.user_cache import bump_user_data_version
 from datetime import date
 from django.utils import timezone  # Fixed import
 from django.db import transaction
 from wishlist_management.models import Wishlist
 from transaction_management.services import create_transaction, delete_transaction
+from user_reports.utils.report_buffer import coalesce_report_updates
 
 def create_wish(*,user, price, currency, year, wish_details, link, place):
     """Create a transaction and update networth."""
@@ -41,6 +43,7 @@ def create_wish(*,user, price, currency, year, wish_details, link, place):
             place=place
         )
                      
+    bump_user_data_version(user)
     return wish
 
 def delete_wish(*, user, wish_id):
@@ -62,6 +65,7 @@ def delete_wish(*, user, wish_id):
     except Exception as e:
         raise ValidationError(f'Error happened while deleting: {str(e)}')
 
+    bump_user_data_version(user)
     return
 
 def update_wish(*, user, wish_id, price, currency, year, wish_details, link, place):
@@ -104,6 +108,7 @@ def update_wish(*, user, wish_id, price, currency, year, wish_details, link, pla
     except Exception as e:
         raise ValidationError(f'Error happened while saving: {str(e)}')
 
+    bump_user_data_version(user)
     return wish
 
 def update_wish_status(*, user, wish_id):
@@ -121,7 +126,7 @@ def update_wish_status(*, user, wish_id):
     wish_details = wish.wish_details #get wish details
     current_date = date.today() #get current date
 
-    with transaction.atomic():
+    with transaction.atomic(), coalesce_report_updates():
         if not wish_status:
             # Wish is being marked as purchased - create transaction
             trans = create_transaction(
@@ -156,4 +161,5 @@ def update_wish_status(*, user, wish_id):
             else:
                 raise ValidationError("No transaction associated with this wish")
     
+    bump_user_data_version(user)
     return wish
\ No newline at end of file
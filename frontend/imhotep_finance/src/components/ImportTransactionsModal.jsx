@@ -132,7 +132,7 @@ const ImportTransactionsModal = ({ onClose, onSuccess }) => {
                 <li><strong>Optional columns:</strong> category, place, trans_details</li>
                 <li><strong>Date format:</strong> YYYY-MM-DD (e.g., 2025-01-15)</li>
                 <li><strong>trans_status:</strong> deposit or withdraw</li>
-                <li><strong>Max file size:</strong> 5MB | <strong>Max rows:</strong> 1000</li>
+                <li><strong>Max file size:</strong> 5MB | <strong>Max rows:</strong> 50,000</li>
               </ul>
               <button
                 type="button"